@@ -0,0 +1,59 @@
+from filecache import CachedTable
+
+# =========================
+# Account stores (admin.txt, seller.txt, customer.txt)
+# =========================
+# Rows are Admin / Seller / Customer records (records.py). Hash indexes over them:
+#   by_name: login name (column 1) -> rows with that name, in file order
+#   unique:  column -> {value: (row position, row)} for signup uniqueness checks
+
+
+class AccountStore(CachedTable):
+    def __init__(self, path, header, record, unique=()):
+        super().__init__(path, header, record)
+        self.unique_cols = tuple(unique)
+        self.name_field = record.FIELDS[1]
+        self.unique_fields = {col: record.FIELDS[col] for col in self.unique_cols}
+        self.by_name = {}
+        self.unique = {}
+
+    def on_reload(self):
+        self.by_name = {}
+        self.unique = {col: {} for col in self.unique_cols}
+        for i, row in enumerate(self.rows):
+            self._track(row, i)
+
+    def on_append(self, row):
+        self._track(row, len(self.rows) - 1)
+
+    def _track(self, row, i):
+        self.by_name.setdefault(getattr(row, self.name_field), []).append(row)
+        for col, field in self.unique_fields.items():
+            self.unique[col].setdefault(getattr(row, field), (i, row))
+
+    def login(self, name, password):
+        with self.mutex:
+            for row in self.fresh().by_name.get(name, ()):
+                if row.password == password:
+                    return row
+        return None
+
+    def find(self, col, value):
+        with self.mutex:
+            hit = self.fresh().unique[col].get(value)
+        return hit[1] if hit else None
+
+    def conflict(self, row):
+        # first clashing column, as a top-to-bottom scan checking columns in
+        # unique_cols order would report it; None if the row is new
+        best = None
+        with self.mutex:
+            self.fresh()
+            for order, col in enumerate(self.unique_cols):
+                hit = self.unique[col].get(getattr(row, self.unique_fields[col]))
+                if hit is not None and (best is None or (hit[0], order) < best[:2]):
+                    best = (hit[0], order, col)
+        return best[2] if best else None
+
+    def next_no(self):
+        return self.fresh().line_count  # header already included
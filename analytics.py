@@ -0,0 +1,185 @@
+import io
+import json
+import os
+import threading
+
+import parallel_scan
+from locks import FileLock
+
+# =========================
+# Checkpointed ledger aggregates (economics.txt)
+# =========================
+# economics.txt is append-only, so revenue sums are kept in a state file next to
+# it together with the byte offset they cover. refresh() only parses the rows
+# appended after that offset. If the ledger shrank or the bytes just before the
+# checkpoint changed (file rewritten), everything is rebuilt from the start.
+# The state file is rewritten whole, so it is only saved once enough new rows
+# have been read (checkpoint()); a restart re-reads the rows after it.
+# Hold self.lock while reading the sums if other threads may refresh them;
+# refresh() also holds a file lock on the state file, so processes sharing the
+# ledger take turns catching up and writing the checkpoint.
+#
+# order_id, date_time, customer_id, customer_name, seller_id, seller_name,
+# product_id, product_name, unit_price, quantity, total_price
+
+TAIL_BYTES = 64
+CHECKPOINT_BYTES = 1 << 20  # save after at least this much new ledger...
+CHECKPOINT_FRACTION = 8     # ...and at least 1/8 of what the saved checkpoint covers
+
+
+class LedgerAggregates:
+    FIELDS = ("seller_rev", "product_rev", "seller_total", "seller_products")  # saved with the checkpoint
+    PARALLEL = True  # a full rebuild of a big ledger may use parallel_scan
+
+    def __init__(self, path, state_path=None):
+        self.path = path
+        self.state_path = state_path or os.path.splitext(path)[0] + ".agg.json"
+        self.lock = threading.RLock()
+        self.file_lock = FileLock(self.state_path + ".lock")
+        self.reset()
+        self.load()
+
+    def reset(self):
+        self.offset = 0
+        self.tail = ""
+        self.saved_offset = 0  # offset of the checkpoint on disk
+        self.clear()
+
+    def clear(self):
+        self.seller_rev = {}       # "seller_id | seller_name" -> revenue
+        self.product_rev = {}      # "product_id | product_name | seller seller_id" -> revenue
+        self.seller_total = {}     # seller_id -> revenue
+        self.seller_products = {}  # seller_id -> {"product_id | product_name": revenue}
+
+    def load(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                st = json.load(f)
+            self.offset = st["offset"]
+            self.tail = st["tail"]
+            for name in self.FIELDS:
+                setattr(self, name, st[name])
+            self.saved_offset = self.offset
+        except (OSError, ValueError, KeyError, TypeError):
+            self.reset()
+
+    def save(self):
+        st = {"offset": self.offset, "tail": self.tail}
+        for name in self.FIELDS:
+            st[name] = getattr(self, name)
+        tmp = f"{self.state_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(st, f)
+        os.replace(tmp, self.state_path)
+        self.saved_offset = self.offset
+
+    def checkpoint(self):
+        # the first build is always saved; after that, saving costs as much as
+        # the whole state, so the rows since the last save must be worth it. The
+        # threshold grows with the ledger, which keeps the cost per new row flat
+        # and bounds what a restart has to re-read.
+        due = max(CHECKPOINT_BYTES, self.saved_offset // CHECKPOINT_FRACTION)
+        if not self.saved_offset or self.offset - self.saved_offset >= due:
+            self.save()
+
+    def refresh(self):
+        with self.lock, self.file_lock:
+            return self._refresh()
+
+    def _refresh(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            size = 0
+
+        with open(self.path, "rb") as f:
+            if size < self.offset or self._read_tail(f, self.offset) != self.tail:
+                self.reset()
+            if size == self.offset:
+                return self
+
+            if self.PARALLEL and self.offset == 0 and size >= parallel_scan.MIN_PARALLEL_BYTES:
+                # first boot or rebuild of a big ledger: aggregate it in worker processes
+                state, end = parallel_scan.scan(self.path, type(self), end=size)
+                for name in self.FIELDS:
+                    setattr(self, name, state[name])
+                self.offset = end
+                self.tail = self._read_tail(f, self.offset)
+                self.save()
+                return self
+
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+            end = data.rfind(b"\n") + 1  # a half-written last row waits for the next refresh
+            if end == 0:
+                return self
+
+            self.add_chunk(data[:end], self.offset)
+            self.offset += end
+            self.tail = self._read_tail(f, self.offset)
+
+        self.checkpoint()
+        return self
+
+    def add_chunk(self, data, start):
+        # data: whole lines read from byte offset start
+        lines = data.decode("utf-8").splitlines()
+        if start == 0:
+            lines = lines[1:]  # header
+        for line in lines:
+            if not line.strip():
+                continue
+            self.add(line.strip().split(","))
+
+    def _read_tail(self, f, offset):
+        start = max(0, offset - TAIL_BYTES)
+        f.seek(start)
+        return f.read(offset - start).hex()
+
+    def add(self, c):
+        total = float(c[10]) if c[10] else 0.0
+        seller_key = f"{c[4]} | {c[5]}"
+        prod_key = f"{c[6]} | {c[7]} | seller {c[4]}"
+        self.seller_rev[seller_key] = self.seller_rev.get(seller_key, 0.0) + total
+        self.product_rev[prod_key] = self.product_rev.get(prod_key, 0.0) + total
+
+        self.seller_total[c[4]] = self.seller_total.get(c[4], 0.0) + total
+        prods = self.seller_products.setdefault(c[4], {})
+        key = f"{c[6]} | {c[7]}"
+        prods[key] = prods.get(key, 0.0) + total
+
+
+# =========================
+# Report text (shared by every analytics engine)
+# =========================
+def rank(d):
+    # (best, lowest, all items high->low), ties ordered like the original sorted() calls
+    if not d:
+        return ("N/A", 0.0), ("N/A", 0.0), []
+    items = sorted(d.items(), key=lambda x: x[1])
+    return items[-1], items[0], sorted(d.items(), key=lambda x: x[1], reverse=True)
+
+
+def admin_report(sellers, products):
+    out = io.StringIO()
+    write_admin_report(out, sellers, products)
+    return out.getvalue()
+
+
+def write_admin_report(out, sellers, products):
+    # the report text, written line by line to a text stream
+    best_seller, low_seller, seller_items = sellers
+    best_prod, low_prod, product_items = products
+
+    out.write(f"Best Seller (Revenue): {best_seller[0]} -> {best_seller[1]:.2f}\n")
+    out.write(f"Lowest Seller (Revenue): {low_seller[0]} -> {low_seller[1]:.2f}\n\n")
+    out.write(f"Best Product (Revenue): {best_prod[0]} -> {best_prod[1]:.2f}\n")
+    out.write(f"Lowest Product (Revenue): {low_prod[0]} -> {low_prod[1]:.2f}\n\n")
+
+    out.write("Revenue by Seller:\n")
+    for k, v in seller_items:
+        out.write(f"  {k} -> {v:.2f}\n")
+
+    out.write("\nRevenue by Product:\n")
+    for k, v in product_items:
+        out.write(f"  {k} -> {v:.2f}\n")
@@ -0,0 +1,211 @@
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import metrics
+from marketplace import Marketplace, parse_quantity
+
+# =========================
+# Local HTTP/JSON API
+# =========================
+# python api.py [--port 8765] [--data-dir .]
+#
+#   GET  /products?q=...&limit=50       shop search (active, in stock)
+#   GET  /products/<product_id>
+#   GET  /metrics                       timings per operation (ECOM_METRICS=1, see metrics.py)
+#   POST /login     {"role", "name", "password"}
+#   POST /signup    {"role": "seller"|"customer", "name", "password", "id", "email", ...}
+#   POST /products  {"name", "password"} of a seller + {"product_name", "description",
+#                   "category", "brand", "price", "stock"}
+#   POST /checkout  {"name", "password"} of a customer + {"items": [{"product_id", "quantity"}]}
+#   POST /orders    {"name", "password"} of a customer [+ "order_id"] -> their order lines
+#   POST /analytics {"role": "admin"|"seller", "name", "password"[, "from", "to"]}
+#                   from/to: "YYYY-MM-DD" (inclusive), answered from the time rollups
+#
+# Writes carry the caller's credentials (checked through the hashed account
+# indexes, so it is cheap). Binds to localhost only; there is no TLS.
+
+ORDER_KEYS = ("order_id", "date_time", "customer_id", "customer_name", "seller_id", "seller_name",
+              "product_id", "product_name", "unit_price", "quantity", "total_price")
+PRODUCT_KEYS = ("product_id", "seller_id", "seller_name", "product_name", "description", "category",
+                "brand", "price", "stock", "status", "rating", "created_at")
+
+
+def product_json(p):
+    return dict(zip(PRODUCT_KEYS, p.to_row()))
+
+
+def public_user(user):
+    return {k: v for k, v in user.items() if k != "password"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so clients can reuse connections
+    disable_nagle_algorithm = True  # headers and body are separate writes
+    market = None  # set by make_server()
+
+    def log_message(self, *args):
+        pass  # one line per request would dominate at high request rates
+
+    # ---- plumbing ----
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def _dispatch(self, method):
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        try:
+            body = self._body() if method == "POST" else {}
+            route = getattr(self, f"{method.lower()}_{parts[0]}" if parts else "", None)
+            if route is None:
+                raise ApiError(404, "Not found.")
+            status, out = route(parts[1:], parse_qs(url.query), body)
+        except ApiError as e:
+            status, out = e.status, {"error": str(e)}
+        except ValueError as e:
+            status, out = 400, {"error": str(e)}
+        except Exception as e:
+            status, out = 500, {"error": f"{type(e).__name__}: {e}"}
+        self._send(status, out)
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        if not n:
+            return {}
+        try:
+            body = json.loads(self.rfile.read(n))
+        except ValueError:
+            raise ApiError(400, "Body must be JSON.")
+        if not isinstance(body, dict):
+            raise ApiError(400, "Body must be a JSON object.")
+        return body
+
+    def _send(self, status, out):
+        data = json.dumps(out).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _user(self, role, body):
+        user = self.market.login(role, str(body.get("name", "")), str(body.get("password", "")))
+        if user is None:
+            raise ApiError(401, f"Invalid {role} credentials.")
+        return user
+
+    # ---- routes: (path parts after the first, query, body) -> (status, json) ----
+    def get_products(self, parts, query, body):
+        if parts:
+            c = self.market.product(parts[0])
+            if c is None:
+                raise ApiError(404, f"Product {parts[0]} not found.")
+            return 200, product_json(c)
+        q = query.get("q", [""])[0]
+        limit = int(query.get("limit", ["50"])[0])
+        rows = self.market.shop_products(q)
+        return 200, {"count": len(rows), "products": [product_json(c) for c in rows[:limit]]}
+
+    def get_metrics(self, parts, query, body):
+        return 200, {"enabled": metrics.ENABLED, "metrics": metrics.snapshot()}
+
+    def post_login(self, parts, query, body):
+        role = body.get("role")
+        if role not in ("admin", "seller", "customer"):
+            raise ApiError(400, "role must be admin, seller or customer.")
+        return 200, public_user(self._user(role, body))
+
+    def post_signup(self, parts, query, body):
+        role = body.get("role")
+        if role not in ("seller", "customer"):
+            raise ApiError(400, "role must be seller or customer.")
+        return 201, public_user(self.market.signup(role, body))
+
+    def post_products(self, parts, query, body):
+        seller = self._user("seller", body)
+        pid = self.market.add_product(seller, str(body.get("product_name", "")), str(body.get("description", "")),
+                                      str(body.get("category", "")), str(body.get("brand", "")),
+                                      body.get("price", ""), body.get("stock", ""))
+        return 201, {"product_id": str(pid)}
+
+    def post_checkout(self, parts, query, body):
+        cust = self._user("customer", body)
+        items = body.get("items")
+        if not isinstance(items, list) or not items:
+            raise ApiError(400, "Cart is empty.")
+
+        # merge repeated products like the shop's cart does
+        qty = {}
+        for it in items:
+            if not isinstance(it, dict):
+                raise ApiError(400, "Each item must be an object with product_id and quantity.")
+            pid = str(it.get("product_id", ""))
+            qty[pid] = qty.get(pid, 0) + parse_quantity(it.get("quantity", 0))
+        cart = [self.market.cart_item(pid, q) for pid, q in qty.items()]
+        return 201, {"order_id": self.market.place_order(cust, cart)}
+
+    def post_orders(self, parts, query, body):
+        cust = self._user("customer", body)
+        if body.get("order_id") is not None:
+            rows = [c for c in self.market.order_lines(body["order_id"]) if c[2] == cust["id"]]
+        else:
+            rows = self.market.customer_orders(cust["id"])
+        return 200, {"orders": [dict(zip(ORDER_KEYS, c)) for c in rows]}
+
+    def post_analytics(self, parts, query, body):
+        role = body.get("role")
+        start, end = str(body.get("from", "")), str(body.get("to", ""))
+        ranged = bool(start.strip() or end.strip())
+        if role == "admin":
+            self._user("admin", body)
+            if ranged:
+                return 200, {"report": self.market.admin_range_text(start, end)}
+            return 200, {"report": self.market.admin_analytics_text()}
+        if role == "seller":
+            seller = self._user("seller", body)
+            if ranged:
+                (total_rev, units, orders), best, lowest = self.market.seller_range(seller["id"], start, end)
+                return 200, {"total_revenue": total_rev, "units": units, "orders": orders,
+                             "best_product": list(best), "lowest_product": list(lowest)}
+            total_rev, best, lowest = self.market.seller_analytics(seller["id"])
+            return 200, {"total_revenue": total_rev, "best_product": list(best), "lowest_product": list(lowest)}
+        raise ApiError(400, "role must be admin or seller.")
+
+
+def make_server(market, host="127.0.0.1", port=8765):
+    handler = type("MarketHandler", (Handler,), {"market": market})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve the marketplace as a local JSON API.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--data-dir", default=".")
+    ap.add_argument("--storage", choices=("text", "sqlite"), default=None, help="default: $ECOM_STORAGE or text")
+    args = ap.parse_args()
+
+    server = make_server(Marketplace(args.data_dir, kind=args.storage), args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from marketplace import Marketplace
+from sqlite_storage import SqliteStorage
+from storage import (SELLER_HEADER, CUSTOMER_HEADER, PRODUCT_HEADER, ECON_HEADER,
+                     SELLER_FILE, CUSTOMER_FILE, PRODUCT_FILE, ECON_FILE, DB_FILE)
+
+# =========================
+# Benchmarks
+# =========================
+# python bench.py --products 100000 --orders 1000000 [--storage sqlite] [--out results.json]
+#
+# Generates synthetic data files in a temp directory, then times the hot paths
+# through the Marketplace service. Prints one JSON document: per operation the
+# first (cold) call, latency percentiles and throughput.
+#
+# python bench.py --cold-start-only   just the cold-start check: a fresh interpreter
+# importing the headless entry points must stay under COLD_START_BUDGET_MS, load
+# none of HEAVY_MODULES and create no files (exit status 1 otherwise).
+#
+# python bench.py --checkout-check [--stock-mode journal] [--procs 6]
+# regression check for concurrent checkout: PROCS processes start together on a
+# fresh data directory (no journal / sequence files yet) and each places
+# --iterations orders for a few low-stock products. Every unit sold must be
+# missing from stock, no stock may go negative and no order id may be used
+# twice (exit status 1 otherwise).
+
+WORDS = ("phone", "laptop", "mouse", "keyboard", "monitor", "charger", "cable", "speaker", "watch",
+         "camera", "tablet", "router", "printer", "headset", "drive", "lamp", "fan", "blender",
+         "kettle", "shirt", "shoes", "bag", "bottle", "desk", "chair", "pro", "max", "mini", "ultra", "lite")
+BRANDS = ("Apple", "Samsung", "Dell", "HP", "Lenovo", "Sony", "Xiaomi", "Anker", "Logitech", "Philips")
+CATEGORIES = ("electronics", "computers", "accessories", "home", "fashion", "kitchen", "audio")
+CHUNK = 50000  # rows per write while generating
+
+COLD_START_BUDGET_MS = 50
+HEAVY_MODULES = ("tkinter", "numpy", "sqlite3", "multiprocessing", "concurrent.futures")
+COLD_START_CODE = (
+    "import json, sys, time\n"
+    "t = time.perf_counter()\n"
+    "import main, marketplace\n"
+    "ms = (time.perf_counter() - t) * 1000\n"
+    f"print(json.dumps([ms, [m for m in {HEAVY_MODULES!r} if m in sys.modules]]))\n"
+)
+
+
+def _write(path, header, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header)
+        buf = []
+        for row in rows:
+            buf.append(row)
+            if len(buf) >= CHUNK:
+                f.write("".join(buf))
+                buf = []
+        f.write("".join(buf))
+
+
+def generate(data_dir, sellers, customers, products, orders, seed=1, stock=None):
+    rnd = random.Random(seed)
+    _write(os.path.join(data_dir, SELLER_FILE), SELLER_HEADER, (
+        f"{i},Seller {i},pass{i},S{i},seller{i}@mail.com,City {i % 50},0300{i:07d},{i:05d}-{i:07d}-1\n"
+        for i in range(1, sellers + 1)))
+    _write(os.path.join(data_dir, CUSTOMER_FILE), CUSTOMER_HEADER, (
+        f"{i},Customer {i},pass{i},C{i},cust{i}@mail.com,City {i % 50},0310{i:07d}\n"
+        for i in range(1, customers + 1)))
+
+    def product_rows():
+        for i in range(1, products + 1):
+            s = rnd.randint(1, sellers)
+            name = " ".join(rnd.sample(WORDS, 2)) + f" {i % 1000}"
+            yield (f"{i},S{s},Seller {s},{name},{' '.join(rnd.sample(WORDS, 3))},{rnd.choice(CATEGORIES)},"
+                   f"{rnd.choice(BRANDS)},{rnd.randint(100, 200000)}.00,{stock or rnd.randint(1000, 100000)},active,"
+                   f"{rnd.randint(30, 50) / 10},2026-01-10 11:20:00\n")
+    _write(os.path.join(data_dir, PRODUCT_FILE), PRODUCT_HEADER, product_rows())
+
+    def order_rows():
+        for o in range(1, orders + 1):
+            c = rnd.randint(1, customers)
+            p = rnd.randint(1, products)
+            s = (p * 7919) % sellers + 1
+            q = rnd.randint(1, 5)
+            unit = (p % 2000) * 100 + 100
+            day = 1 + o % 28
+            yield (f"{o},2026-02-{day:02d} {o % 24:02d}:{o % 60:02d}:00,C{c},Customer {c},S{s},Seller {s},"
+                   f"{p},Product {p},{unit:.2f},{q},{unit * q:.2f}\n")
+    _write(os.path.join(data_dir, ECON_FILE), ECON_HEADER, order_rows())
+
+
+def measure(fn, n):
+    # (cold seconds, [warm seconds])
+    t = time.perf_counter()
+    fn(0)
+    cold = time.perf_counter() - t
+    times = []
+    for i in range(1, n + 1):
+        t = time.perf_counter()
+        fn(i)
+        times.append(time.perf_counter() - t)
+    return cold, times
+
+
+def summarize(cold, times):
+    times = sorted(times)
+    n = len(times)
+
+    def pct(p):
+        return times[min(n - 1, int(p / 100 * n))] * 1000 if n else 0.0
+
+    total = sum(times)
+    return {
+        "n": n,
+        "cold_ms": round(cold * 1000, 3),
+        "p50_ms": round(pct(50), 3),
+        "p90_ms": round(pct(90), 3),
+        "p99_ms": round(pct(99), 3),
+        "max_ms": round(times[-1] * 1000, 3) if n else 0.0,
+        "mean_ms": round(total / n * 1000, 3) if n else 0.0,
+        "ops_per_s": round(n / total, 1) if total else 0.0,
+    }
+
+
+def cold_start(runs):
+    # import time of main + marketplace in fresh interpreters, run in an empty directory
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, (here, os.environ.get("PYTHONPATH")))))
+    cwd = tempfile.mkdtemp(prefix="ecom-cold-")
+    try:
+        times, heavy = [], set()
+        for i in range(runs + 1):  # the first run only warms the bytecode / OS caches
+            out = subprocess.run([sys.executable, "-c", COLD_START_CODE], cwd=cwd, env=env,
+                                 capture_output=True, text=True, check=True).stdout
+            ms, loaded = json.loads(out)
+            heavy.update(loaded)
+            if i:
+                times.append(ms)
+        files = sorted(os.listdir(cwd))
+    finally:
+        shutil.rmtree(cwd, ignore_errors=True)
+    times.sort()
+    median = times[len(times) // 2]
+    return {
+        "median_ms": round(median, 3),
+        "max_ms": round(times[-1], 3),
+        "budget_ms": COLD_START_BUDGET_MS,
+        "heavy_modules": sorted(heavy),
+        "files_created": files,
+        "ok": median <= COLD_START_BUDGET_MS and not heavy and not files,
+    }
+
+
+def _checkout_worker(data_dir, stock_mode, seed, n, products, start):
+    m = Marketplace(data_dir, stock_mode=stock_mode)
+    rnd = random.Random(seed)
+    cust = {"id": f"C{seed + 1}", "name": f"Customer {seed + 1}"}
+    start.wait()
+    for i in range(n):
+        pids = rnd.sample(range(1, products + 1), rnd.randint(1, 2))
+        try:
+            m.place_order(cust, [m.cart_item(pid, rnd.randint(1, 3)) for pid in pids])
+        except ValueError:
+            pass  # sold out
+
+
+def checkout_check(procs, n, stock_mode, products=4, stock=100):
+    import multiprocessing
+
+    data_dir = tempfile.mkdtemp(prefix="ecom-checkout-")
+    old_env = os.environ.get("ECOM_STOCK_COMPACT_EVERY")
+    os.environ["ECOM_STOCK_COMPACT_EVERY"] = "37"  # compact the journal while others append
+    try:
+        generate(data_dir, 5, procs, products, 0, stock=stock)
+        ctx = multiprocessing.get_context("spawn")
+        start = ctx.Event()
+        workers = [ctx.Process(target=_checkout_worker, args=(data_dir, stock_mode, i, n, products, start))
+                   for i in range(procs)]
+        for w in workers:
+            w.start()
+        t = time.perf_counter()
+        start.set()
+        for w in workers:
+            w.join()
+        seconds = time.perf_counter() - t
+
+        m = Marketplace(data_dir, stock_mode=stock_mode)
+        sold, customers = {}, {}
+        with open(os.path.join(data_dir, ECON_FILE), encoding="utf-8") as f:
+            next(f)
+            for line in f:
+                c = line.rstrip("\n").split(",")
+                sold[c[6]] = sold.get(c[6], 0) + int(c[9])
+                customers.setdefault(c[0], set()).add(c[2])
+        left = {str(pid): m.product(pid).stock for pid in range(1, products + 1)}
+    finally:
+        if old_env is None:
+            os.environ.pop("ECOM_STOCK_COMPACT_EVERY", None)
+        else:
+            os.environ["ECOM_STOCK_COMPACT_EVERY"] = old_env
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+    return {
+        "stock_mode": stock_mode,
+        "procs": procs,
+        "orders": len(customers),
+        "seconds": round(seconds, 3),
+        "sold": sold,
+        "stock_left": left,
+        "workers_ok": all(w.exitcode == 0 for w in workers),
+        "lost_updates": sorted(pid for pid in left if left[pid] + sold.get(pid, 0) != stock),
+        "oversold": sorted(pid for pid in left if left[pid] < 0),
+        "duplicate_order_ids": sorted(oid for oid, c in customers.items() if len(c) > 1),
+    }
+
+
+def run(args, data_dir):
+    rnd = random.Random(args.seed + 1)
+    t = time.perf_counter()
+    generate(data_dir, args.sellers, args.customers, args.products, args.orders, args.seed)
+    gen_s = time.perf_counter() - t
+
+    import_s = None
+    if args.storage == "sqlite":
+        t = time.perf_counter()
+        SqliteStorage(os.path.join(data_dir, DB_FILE)).import_text(data_dir)
+        import_s = round(time.perf_counter() - t, 3)
+
+    t = time.perf_counter()
+    m = Marketplace(data_dir, kind=args.storage, analytics_engine=args.analytics, stock_mode=args.stock_mode,
+                    ledger_format=args.ledger_format).bootstrap()
+    init_s = time.perf_counter() - t
+    n = args.iterations
+    results = {}
+
+    def login(i):
+        k = rnd.randint(1, args.customers)
+        assert m.login("customer", f"Customer {k}", f"pass{k}")
+    results["login"] = summarize(*measure(login, n))
+
+    def signup(i):
+        k = args.customers + 1000 + i
+        m.signup("customer", {"name": f"New {k}", "password": "x", "id": f"CN{k}", "email": f"new{k}@mail.com",
+                              "address": "City", "phone": f"0320{k:07d}"})
+    results["signup"] = summarize(*measure(signup, n))
+
+    def signup_conflict(i):
+        k = rnd.randint(1, args.sellers)
+        try:
+            m.signup("seller", {"name": "Dup", "password": "x", "id": f"S{k}", "email": "dup@mail.com",
+                                "address": "City", "phone": "0", "cnic": "0"})
+        except ValueError:
+            return
+        raise AssertionError("duplicate seller id accepted")
+    results["signup_conflict"] = summarize(*measure(signup_conflict, n))
+
+    def search(i):
+        m.shop_products(" ".join(rnd.sample(WORDS, rnd.randint(1, 2))))
+    results["search"] = summarize(*measure(search, n))
+
+    seller = {"id": "S1", "name": "Seller 1"}
+
+    def add_product(i):
+        m.add_product(seller, f"Bench {i}", "bench item", "bench", "Bench", "10", "5")
+    results["add_product"] = summarize(*measure(add_product, n))
+
+    def checkout(i):
+        cust = {"id": f"C{i + 1}", "name": f"Customer {i + 1}"}
+        pids = rnd.sample(range(1, args.products + 1), min(args.cart_size, args.products))
+        m.place_order(cust, [m.cart_item(pid, 1) for pid in pids])
+    results["checkout"] = summarize(*measure(checkout, n))
+
+    def admin_analytics(i):
+        m.admin_analytics_text()
+    results["admin_analytics"] = summarize(*measure(admin_analytics, max(1, n // 10)))
+
+    def seller_analytics(i):
+        m.seller_analytics(f"S{rnd.randint(1, args.sellers)}")
+    results["seller_analytics"] = summarize(*measure(seller_analytics, n))
+
+    def seller_dashboard(i):
+        sid = f"S{rnd.randint(1, args.sellers)}"
+        m.seller_products(sid)
+        m.seller_orders(sid)
+    results["seller_dashboard"] = summarize(*measure(seller_dashboard, n))
+
+    def customer_orders(i):
+        m.customer_orders(f"C{rnd.randint(1, args.customers)}")
+    results["customer_orders"] = summarize(*measure(customer_orders, max(1, n // 10)))
+
+    # bulk import of args.products new rows for one seller (last: it grows the catalog)
+    path = os.path.join(data_dir, "import.csv")
+    _write(path, "product_name,description,category,brand,price,stock\n", (
+        f"Import {i},{' '.join(rnd.sample(WORDS, 3))},{rnd.choice(CATEGORIES)},{rnd.choice(BRANDS)},"
+        f"{rnd.randint(100, 200000)}.00,{rnd.randint(1, 1000)}\n" for i in range(args.products)))
+    t = time.perf_counter()
+    res = m.import_products(seller, path)
+    import_rows_s = time.perf_counter() - t
+    assert res["added"] == args.products and not res["error_count"], res
+
+    return {
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "keep")},
+        "python": sys.version.split()[0],
+        "generate_s": round(gen_s, 3),
+        "import_s": import_s,
+        "init_s": round(init_s, 3),
+        "cold_start": cold_start(args.cold_start_runs),
+        "bulk_import": {"rows": args.products, "seconds": round(import_rows_s, 3),
+                        "rows_per_s": round(args.products / import_rows_s, 1)},
+        "results": results,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Time marketplace hot paths on synthetic data.")
+    ap.add_argument("--size", type=int, default=None, help="shortcut: products=orders=SIZE, sellers/customers=SIZE/10")
+    ap.add_argument("--sellers", type=int, default=1000)
+    ap.add_argument("--customers", type=int, default=10000)
+    ap.add_argument("--products", type=int, default=10000)
+    ap.add_argument("--orders", type=int, default=10000)
+    ap.add_argument("--iterations", type=int, default=200)
+    ap.add_argument("--cart-size", type=int, default=3)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--storage", choices=("text", "sqlite"), default="text")
+    ap.add_argument("--analytics", choices=("incremental", "columnar", "streaming"), default="incremental")
+    ap.add_argument("--ledger-format", choices=("text", "binary", "partitioned"), default="text")
+    ap.add_argument("--stock-mode", choices=("rewrite", "journal"), default="rewrite")
+    ap.add_argument("--cold-start-runs", type=int, default=5)
+    ap.add_argument("--cold-start-only", action="store_true", help="only check the cold-start budget")
+    ap.add_argument("--checkout-check", action="store_true",
+                    help="only check concurrent checkout consistency (uses --procs, --iterations, --stock-mode)")
+    ap.add_argument("--procs", type=int, default=6)
+    ap.add_argument("--out", help="also write the JSON here")
+    ap.add_argument("--keep", action="store_true", help="keep the generated data directory")
+    args = ap.parse_args()
+    if args.size:
+        args.products = args.orders = args.size
+        args.sellers = args.customers = max(10, args.size // 10)
+
+    if args.cold_start_only:
+        report = cold_start(args.cold_start_runs)
+        print(json.dumps(report, indent=2))
+        sys.exit(0 if report["ok"] else 1)
+
+    if args.checkout_check:
+        report = checkout_check(args.procs, args.iterations, args.stock_mode)
+        report["ok"] = report["workers_ok"] and not (report["lost_updates"] or report["oversold"] or
+                                                     report["duplicate_order_ids"])
+        print(json.dumps(report, indent=2))
+        sys.exit(0 if report["ok"] else 1)
+
+    data_dir = tempfile.mkdtemp(prefix="ecom-bench-")
+    try:
+        report = run(args, data_dir)
+    finally:
+        if args.keep:
+            print(f"data kept in {data_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import argparse
+import mmap
+import os
+import struct
+import threading
+from datetime import datetime, timedelta
+
+from filecache import file_signature
+from ledger import append_bytes
+from locks import FileLock
+from rollups import BinaryRollups
+
+try:
+    import numpy as np
+except ImportError:  # records are unpacked with struct instead
+    np = None
+
+# =========================
+# Binary ledger (economics.bin + economics.strings)
+# =========================
+# Same rows as economics.txt, stored as fixed-size little-endian records after an
+# 8-byte magic:
+#   order_id int64, date_time int64 (seconds since 1970-01-01, wall clock as
+#   written), customer_id, customer_name, seller_id, seller_name, product_id,
+#   product_name uint32 (line numbers in the string table), unit_price int64
+#   (cents), quantity int32, total_price int64 (cents)
+# economics.strings holds each distinct string once, one per line, append-only.
+# Readers mmap the record file and look at it in place (a numpy view when numpy
+# is installed, struct.iter_unpack over a memoryview otherwise). Revenue sums are
+# kept per record count, so refresh() only reads records appended since the last
+# call. Cents are summed as integers.
+#
+# python binledger.py to-binary [economics.txt] [economics.bin]
+# python binledger.py to-csv [economics.bin] [economics.txt]
+
+MAGIC = b"ECOMLED1"
+RECORD = struct.Struct("<qqIIIIIIqiq")
+FIELDS = ("order_id", "date_time", "customer_id", "customer_name", "seller_id", "seller_name",
+          "product_id", "product_name", "unit_price", "quantity", "total_price")
+STRING_COLS = (2, 3, 4, 5, 6, 7)
+EPOCH = datetime(1970, 1, 1)
+SECOND = timedelta(seconds=1)
+DT_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+if np is not None:
+    DTYPE = np.dtype([(name, kind) for name, kind in zip(FIELDS, (
+        "<i8", "<i8", "<u4", "<u4", "<u4", "<u4", "<u4", "<u4", "<i8", "<i4", "<i8"))])
+    assert DTYPE.itemsize == RECORD.size
+
+
+def strings_path_for(path):
+    return os.path.splitext(path)[0] + ".strings"
+
+
+def to_cents(s):
+    return round(float(s) * 100) if s else 0
+
+
+def from_cents(v):
+    return f"{v / 100:.2f}"
+
+
+def to_epoch(s):
+    return (datetime.fromisoformat(s) - EPOCH) // SECOND
+
+
+def from_epoch(ts):
+    return (EPOCH + timedelta(seconds=ts)).strftime(DT_FORMAT)
+
+
+def encode(c, code):
+    # economics.txt columns -> RECORD fields; code(str) gives the string table index.
+    # Numbers are parsed first so a bad row adds nothing to the string table.
+    if len(c) != len(FIELDS):
+        raise ValueError(f"Expected {len(FIELDS)} columns, got {len(c)}.")
+    order_id, ts = int(c[0]), to_epoch(c[1])
+    unit, qty, total = to_cents(c[8]), int(c[9]), to_cents(c[10])
+    return (order_id, ts, *[code(c[i]) for i in STRING_COLS], unit, qty, total)
+
+
+class BinaryLedger:
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.strings_path = strings_path_for(path)
+        self.fsync = fsync
+        self.lock = FileLock(path + ".lock")  # appends from several processes
+        self.mutex = threading.RLock()
+        self._map = None  # (signature, mmap)
+        self._rollups = None
+        self._reset()
+        self.ensure()
+
+    def _reset(self):
+        self.strings = []
+        self.codes = {}
+        self._strings_end = 0
+        self._strings_ino = None
+        # revenue sums in cents over the first self.done records, keyed by string codes
+        self.done = 0
+        self.seller_rev = {}       # (seller_id, seller_name) -> cents
+        self.product_rev = {}      # (product_id, product_name, seller_id) -> cents
+        self.seller_products = {}  # seller_id -> {(product_id, product_name): cents}
+
+    def ensure(self):
+        with self.lock:
+            if not os.path.exists(self.path):
+                append_bytes(self.path, MAGIC)
+            if not os.path.exists(self.strings_path):
+                append_bytes(self.strings_path, b"")
+
+    # ---- string table ----
+    def _sync(self):
+        # pick up strings appended by other writers; start over if the files were replaced
+        sig = file_signature(self.strings_path)
+        if sig is None or sig[2] != self._strings_ino or sig[1] < self._strings_end:
+            if self._strings_ino is not None:
+                self._reset()
+            self._strings_ino = sig[2] if sig else None
+        if sig is None or sig[1] == self._strings_end:
+            return
+        with open(self.strings_path, "rb") as f:
+            f.seek(self._strings_end)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        for s in data[:end].decode("utf-8").split("\n")[:-1]:
+            self.codes.setdefault(s, len(self.strings))
+            self.strings.append(s)
+        self._strings_end += end
+
+    def _code(self, s):
+        code = self.codes.get(s)
+        if code is None:
+            code = self.codes[s] = len(self.strings)
+            self.strings.append(s)
+        return code
+
+    def decode(self, r):
+        # RECORD fields -> economics.txt columns
+        s = self.strings
+        return [str(r[0]), from_epoch(r[1]), s[r[2]], s[r[3]], s[r[4]], s[r[5]], s[r[6]], s[r[7]],
+                from_cents(r[8]), str(r[9]), from_cents(r[10])]
+
+    # ---- writes ----
+    def append(self, rows):
+        # rows: economics.txt lines (or column lists) of one order
+        with self.mutex, self.lock:
+            self._sync()
+            mark = len(self.strings)
+            try:
+                data = b"".join(RECORD.pack(*encode(r.rstrip("\n").split(",") if isinstance(r, str) else r,
+                                                    self._code)) for r in rows)
+                new = "".join(s + "\n" for s in self.strings[mark:]).encode("utf-8")
+                if new:
+                    append_bytes(self.strings_path, new, self.fsync)
+            except:
+                for s in self.strings[mark:]:
+                    del self.codes[s]
+                del self.strings[mark:]
+                raise
+            self._strings_end += len(new)
+            # strings first: a record never points past the end of the string table
+            append_bytes(self.path, data, self.fsync)
+
+    # ---- reads ----
+    def records(self):
+        # every complete record, without copying: numpy array or memoryview of raw records
+        with self.mutex:
+            self._sync()
+            sig = file_signature(self.path)
+            if self._map is None or self._map[0] != sig:
+                with open(self.path, "rb") as f:
+                    mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                if mm[:len(MAGIC)] != MAGIC:
+                    raise ValueError(f"{self.path} is not a binary ledger.")
+                if self._map is not None and self._map[0][2] != sig[2]:
+                    self._reset()  # replaced by a converter run
+                    self._sync()
+                self._map = (sig, mm)
+            mm = self._map[1]
+        n = (len(mm) - len(MAGIC)) // RECORD.size  # a half-written last record waits
+        if np is not None:
+            return np.frombuffer(mm, dtype=DTYPE, count=n, offset=len(MAGIC))
+        return memoryview(mm)[len(MAGIC):len(MAGIC) + n * RECORD.size]
+
+    def __len__(self):
+        recs = self.records()
+        return len(recs) if np is not None else len(recs) // RECORD.size
+
+    def rows(self, start=0, stop=None):
+        # decoded rows for record numbers start..stop
+        recs = self.records()
+        if np is not None:
+            return [self.decode(r) for r in recs[start:stop].tolist()]
+        stop = len(recs) // RECORD.size if stop is None else stop
+        return [self.decode(r) for r in RECORD.iter_unpack(recs[start * RECORD.size:stop * RECORD.size])]
+
+    def iter_rows(self, chunk=65536):
+        # all decoded rows, chunk records at a time
+        n = len(self)
+        for i in range(0, n, chunk):
+            yield from self.rows(i, min(i + chunk, n))
+
+    def max_order_id(self):
+        recs = self.records()
+        if np is not None:
+            return int(recs["order_id"].max()) if len(recs) else 0
+        return max((r[0] for r in RECORD.iter_unpack(recs)), default=0)
+
+    def customer_orders(self, customer_id):
+        recs = self.records()
+        code = self.codes.get(customer_id)
+        if code is None:
+            return []
+        if np is not None:
+            return [self.decode(r) for r in recs[recs["customer_id"] == code].tolist()]
+        return [self.decode(r) for r in RECORD.iter_unpack(recs) if r[2] == code]
+
+    def seller_orders(self, seller_id):
+        recs = self.records()
+        code = self.codes.get(seller_id)
+        if code is None:
+            return []
+        if np is not None:
+            return [self.decode(r) for r in recs[recs["seller_id"] == code].tolist()]
+        return [self.decode(r) for r in RECORD.iter_unpack(recs) if r[4] == code]
+
+    def order_lines(self, order_id):
+        recs = self.records()
+        oid = int(order_id)
+        if np is not None:
+            return [self.decode(r) for r in recs[recs["order_id"] == oid].tolist()]
+        return [self.decode(r) for r in RECORD.iter_unpack(recs) if r[0] == oid]
+
+    # ---- revenue ----
+    def refresh(self):
+        with self.mutex:
+            recs = self.records()
+            if np is not None:
+                self._add_chunk(recs[self.done:])
+                self.done = len(recs)
+            else:
+                for r in RECORD.iter_unpack(recs[self.done * RECORD.size:]):
+                    self._add(r[4], r[5], r[6], r[7], r[10])
+                self.done = len(recs) // RECORD.size
+        return self
+
+    def _add(self, sid, sname, pid, pname, cents):
+        key = (sid, sname)
+        self.seller_rev[key] = self.seller_rev.get(key, 0) + cents
+        key = (pid, pname, sid)
+        self.product_rev[key] = self.product_rev.get(key, 0) + cents
+        prods = self.seller_products.setdefault(sid, {})
+        key = (pid, pname)
+        prods[key] = prods.get(key, 0) + cents
+
+    def _add_chunk(self, chunk):
+        # group the chunk with numpy, then fold the groups in by first appearance
+        if not len(chunk):
+            return
+        sid = chunk["seller_id"].astype(np.uint64)
+        cents = chunk["total_price"]
+
+        keys, sums = _group((sid << 32) | chunk["seller_name"], cents)
+        for k, v in zip(keys, sums):
+            key = (k >> 32, k & 0xFFFFFFFF)
+            self.seller_rev[key] = self.seller_rev.get(key, 0) + v
+
+        pairs, pair_code = np.unique((chunk["product_id"].astype(np.uint64) << 32) | chunk["product_name"],
+                                     return_inverse=True)
+        keys, sums = _group((pair_code.reshape(-1).astype(np.uint64) << 32) | sid, cents)
+        pairs = pairs.tolist()
+        for k, v in zip(keys, sums):
+            pair = pairs[k >> 32]
+            pid, pname, s = pair >> 32, pair & 0xFFFFFFFF, k & 0xFFFFFFFF
+            key = (pid, pname, s)
+            self.product_rev[key] = self.product_rev.get(key, 0) + v
+            prods = self.seller_products.setdefault(s, {})
+            prods[(pid, pname)] = prods.get((pid, pname), 0) + v
+
+    def revenue(self):
+        # ({"seller_id | seller_name": revenue}, {"product_id | product_name | seller seller_id": revenue})
+        with self.mutex:
+            self.refresh()
+            s = self.strings
+            seller_rev = {f"{s[a]} | {s[b]}": v / 100 for (a, b), v in self.seller_rev.items()}
+            product_rev = {f"{s[p]} | {s[n]} | seller {s[i]}": v / 100
+                           for (p, n, i), v in self.product_rev.items()}
+        return seller_rev, product_rev
+
+    def seller_revenue(self, seller_id):
+        # (total, {"product_id | product_name": revenue}) for one seller
+        with self.mutex:
+            self.refresh()
+            prods = self.seller_products.get(self.codes.get(seller_id), {})
+            s = self.strings
+            return sum(prods.values()) / 100, {f"{s[p]} | {s[n]}": v / 100 for (p, n), v in prods.items()}
+
+
+    def rollup(self, start, stop, seller_id=None):
+        # hour/day/month rollups (rollups.py), kept in memory and folded in by record count
+        with self.mutex:
+            return self._fresh_rollups().select(start, stop, seller_id)
+
+    def rollup_span(self):
+        with self.mutex:
+            return self._fresh_rollups().span()
+
+    def _fresh_rollups(self):
+        if self._rollups is None:
+            self._rollups = BinaryRollups(self)
+        return self._rollups.refresh()
+
+
+def _group(keys, cents):
+    # (unique keys in order of first appearance, integer sums)
+    uniq, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    sums = np.bincount(inverse.reshape(-1), weights=cents)  # exact while totals stay below 2**53 cents
+    order = np.argsort(first, kind="stable")
+    return uniq[order].tolist(), sums[order].astype(np.int64).tolist()
+
+
+# =========================
+# Converters
+# =========================
+def csv_to_binary(src, dst):
+    # economics.txt -> economics.bin + economics.strings; returns (rows, skipped rows)
+    strings_dst = strings_path_for(dst)
+    codes = {}
+    new = []
+
+    def code(s):
+        c = codes.get(s)
+        if c is None:
+            c = codes[s] = len(codes)
+            new.append(s)
+        return c
+
+    rows = skipped = 0
+    with FileLock(dst + ".lock"):
+        with open(src, "r", encoding="utf-8") as f, open(dst + ".tmp", "wb") as out, \
+                open(strings_dst + ".tmp", "w", encoding="utf-8", newline="\n") as sout:
+            f.readline()
+            out.write(MAGIC)
+            buf = []
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    buf.append(RECORD.pack(*encode(line.split(","), code)))
+                    rows += 1
+                except (ValueError, struct.error):
+                    skipped += 1
+                if len(buf) >= 50000:
+                    sout.write("".join(s + "\n" for s in new))
+                    del new[:]
+                    out.write(b"".join(buf))
+                    del buf[:]
+            sout.write("".join(s + "\n" for s in new))
+            out.write(b"".join(buf))
+        os.replace(strings_dst + ".tmp", strings_dst)
+        os.replace(dst + ".tmp", dst)
+    return rows, skipped
+
+
+def binary_to_csv(src, dst, header):
+    # economics.bin -> economics.txt; returns rows written
+    ledger = BinaryLedger(src)
+    n = len(ledger)
+    with open(dst + ".tmp", "w", encoding="utf-8") as out:
+        out.write(header)
+        for start in range(0, n, 50000):
+            rows = ledger.rows(start, min(start + 50000, n))
+            out.write("".join(",".join(c) + "\n" for c in rows))
+    os.replace(dst + ".tmp", dst)
+    return n
+
+
+def _size(*paths):
+    return sum(os.path.getsize(p) for p in paths if os.path.exists(p))
+
+
+def main():
+    from storage import ECON_FILE, ECON_BIN_FILE, ECON_HEADER
+
+    ap = argparse.ArgumentParser(description="Convert the order ledger between CSV and the binary format.")
+    ap.add_argument("action", choices=("to-binary", "to-csv"))
+    ap.add_argument("src", nargs="?")
+    ap.add_argument("dst", nargs="?")
+    args = ap.parse_args()
+
+    if args.action == "to-binary":
+        src, dst = args.src or ECON_FILE, args.dst or ECON_BIN_FILE
+        rows, skipped = csv_to_binary(src, dst)
+        print(f"{rows} rows ({skipped} skipped): {_size(src)} bytes -> {_size(dst, strings_path_for(dst))} bytes")
+    else:
+        src, dst = args.src or ECON_BIN_FILE, args.dst or ECON_FILE
+        rows = binary_to_csv(src, dst, ECON_HEADER)
+        print(f"{rows} rows: {_size(src, strings_path_for(src))} bytes -> {_size(dst)} bytes")
+
+
+if __name__ == "__main__":
+    main()
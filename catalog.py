@@ -0,0 +1,261 @@
+import contextlib
+import os
+import threading
+
+from filecache import CachedTable, file_signature
+from locks import FileLock, SlotLock
+from records import Product
+from search_index import SearchIndex
+
+# =========================
+# Product catalog (product.txt)
+# =========================
+# Rows are Product records (records.py): product_id, seller_id, seller_name,
+# product_name, description, category, brand, price, stock, status, rating,
+# created_at; price and stock are parsed once, when product.txt is read.
+#
+# Stock changes are either written by rewriting product.txt (journal=None) or
+# appended to a StockJournal and folded back into product.txt by compact(),
+# which swaps the file in with an atomic rename.
+#
+# Checkouts from several processes take stock optimistically (take_stock): the
+# cart is checked against this process's rows without any file lock, then the
+# change is committed under a cross-process lock only if none of its products
+# changed meanwhile (per-product version counters), else it is checked again.
+# In journal mode that lock covers just the cart's products (SlotLock), so
+# checkouts of different products commit at the same time; in rewrite mode
+# every commit rewrites product.txt and takes the whole-file lock.
+
+CAS_RETRIES = 8  # optimistic attempts before checking and committing under the lock
+
+
+class CatalogStore(CachedTable):
+    def __init__(self, path, header, journal=None, compact_every=5000):
+        super().__init__(path, header, Product)
+        self.by_id = {}
+        self.pos = {}  # product_id -> index in rows (file order)
+        self.by_seller = {}  # seller_id -> indexes in rows of its products (file order)
+        self.max_id = 0
+        self.index = SearchIndex()
+        self._index_gen = None  # generation the index matches (synced lazily, by search)
+        self._index_sync = threading.Lock()  # one thread syncs it, outside self.mutex
+
+        self.journal = journal
+        self.compact_every = compact_every
+        self.lock = FileLock(path + ".lock")
+        self.slots = SlotLock(path + ".slots.lock")
+
+        # product_id -> times this process saw its stock change; only compared
+        # within this process, between a check and its commit
+        self.versions = {}
+        self.conflicts = 0  # commits that found a product changed since its check
+
+    def fresh(self):
+        with self.mutex:
+            if file_signature(self.path) != self._sig:
+                self.reload()
+            elif self.journal is not None and self.journal.changed():
+                deltas = self.journal.read_new()  # another process sold something
+                if deltas is None:
+                    self.reload()  # ... or compacted the journal into product.txt
+                else:
+                    self._apply(deltas)
+        return self
+
+    def reload(self):
+        with self.mutex:
+            old = {pid: row.stock for pid, row in self.by_id.items()}
+            versions = dict(self.versions)  # the journal replay below bumps self.versions
+            if self.journal is not None and os.path.exists(self.path + ".compact"):
+                with self.lock:
+                    self._recover()
+            super().reload()
+            if self.journal is not None:
+                self.journal.rewind()
+                self._apply(self.journal.read_new())
+            # a new version only for the products whose stock actually changed
+            self.versions = {pid: versions.get(pid, 0) + (old.get(pid) != row.stock)
+                             for pid, row in self.by_id.items()}
+
+    def on_reload(self):
+        self.by_id = {}
+        self.pos = {}
+        self.by_seller = {}
+        self.max_id = 0
+        for i, row in enumerate(self.rows):
+            self._track(row, i)
+
+    def on_append(self, row):
+        self._track(row, len(self.rows) - 1)
+        if self._index_gen == self.generation:
+            self.index.put(len(self.rows) - 1, row)
+
+    def on_extend(self, start):
+        synced = self._index_gen == self.generation
+        for i in range(start, len(self.rows)):
+            self._track(self.rows[i], i)
+            if synced:
+                self.index.put(i, self.rows[i])
+
+    def _track(self, row, i):
+        self.by_id[row.product_id] = row
+        self.pos[row.product_id] = i
+        self.by_seller.setdefault(row.seller_id, []).append(i)
+        try:
+            self.max_id = max(self.max_id, int(row.product_id))
+        except:
+            pass
+
+    # new rows are appended under the file lock: a stock commit or compact() in
+    # another process must not rename product.txt away from under the write
+    def append(self, row):
+        with self.mutex, self.lock:
+            super().append(row)
+
+    def extend(self, rows):
+        with self.mutex, self.lock:
+            super().extend(rows)
+
+    def products(self):
+        return self.fresh().rows
+
+    def get(self, pid):
+        return self.fresh().by_id.get(pid)
+
+    def seller_products(self, seller_id):
+        with self.mutex:
+            rows = self.fresh().rows
+            return [rows[i] for i in self.by_seller.get(seller_id, ())]
+
+    def search(self, q):
+        # matching rows in file order
+        while True:
+            with self.mutex:
+                self.fresh()
+                if self._index_gen == self.generation:
+                    rows = self.rows
+                    return [rows[i] for i in self.index.search(q)]
+            self._sync_index()
+
+    def _sync_index(self):
+        # bring the index up to the current rows without holding self.mutex, so
+        # checkout and the seller views go on meanwhile. Rows are indexed by
+        # position and only those whose searched text changed are re-indexed.
+        with self._index_sync:
+            with self.mutex:
+                if self._index_gen == self.generation:
+                    return
+                gen, rows = self.generation, list(self.rows)
+            self.index.sync(rows)
+            with self.mutex:
+                if self.generation == gen:  # else reloaded meanwhile: the caller syncs again
+                    for i in range(len(rows), len(self.rows)):  # appended meanwhile
+                        self.index.put(i, self.rows[i])
+                    self._index_gen = gen
+
+    # ---- stock ----
+    def take_stock(self, items):
+        # items: [(product_id, quantity)]; takes the stock of a whole cart or raises
+        # ValueError with a user-facing message. Returns the deltas committed.
+        need = {}
+        for pid, q in items:
+            need[pid] = need.get(pid, 0) + q
+        deltas = [(pid, -q) for pid, q in need.items()]
+
+        for attempt in range(CAS_RETRIES + 1):
+            optimistic = attempt < CAS_RETRIES
+            if optimistic:
+                with self.mutex:
+                    self.fresh()._check(need)
+                    seen = [self.versions.get(pid) for pid in need]
+            with self._committing(need):
+                self.fresh()
+                if not optimistic:
+                    self._check(need)  # out of retries: check while holding the lock
+                elif [self.versions.get(pid) for pid in need] != seen:
+                    self.conflicts += 1
+                    continue
+                self._commit(deltas)
+                break
+        self._maybe_compact()
+        return deltas
+
+    def adjust_stock(self, deltas):
+        # deltas: [(product_id, change)], e.g. [("3", 2)] to put two of product 3 back
+        with self._committing([pid for pid, _ in deltas]):
+            self.fresh()
+            self._commit(deltas)
+        self._maybe_compact()
+
+    def _check(self, need):
+        for pid, q in need.items():
+            p = self.by_id.get(pid)
+            if p is None:
+                raise ValueError(f"Product {pid} not found.")
+            if p.stock < q:
+                raise ValueError(f"Not enough stock for {p.product_name}.")
+
+    @contextlib.contextmanager
+    def _committing(self, pids):
+        # cross-process lock for changing the stock of pids (see the top of the file)
+        if self.journal is None:
+            with self.mutex, self.lock:
+                yield
+        else:
+            with self.slots.hold(pids), self.mutex:
+                yield
+
+    def _commit(self, deltas):
+        # inside _committing(), on fresh rows
+        if self.journal is None:
+            self._apply(deltas)
+            self.rewrite()
+        else:
+            self.journal.append(deltas)
+            self.fresh()  # picks up our own lines (and anyone else's) from the journal
+
+    def _maybe_compact(self):
+        if self.journal is not None and self.journal.count >= self.compact_every:
+            self.compact()
+
+    def _apply(self, deltas):
+        # stock only: the search index does not cover it
+        for pid, d in deltas:
+            row = self.by_id.get(pid)
+            if row is None:
+                continue
+            row.stock += d
+            self.versions[pid] = self.versions.get(pid, 0) + 1
+
+    def compact(self):
+        # fold the journal into product.txt: write a temp copy, rename it over
+        # product.txt, then empty the journal. "<file>.compact" marks the window
+        # between the two so a crash there is finished by _recover().
+        if self.journal is None:
+            return
+        tmp = self.path + ".compact.tmp"
+        marker = self.path + ".compact"
+        with self.slots.hold_all(), self.mutex, self.lock:  # waits for commits in flight
+            self.fresh()
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(self.header)
+                f.writelines(row.to_line() for row in self.rows)
+                f.flush()
+                os.fsync(f.fileno())
+            open(marker, "w").close()
+            os.replace(tmp, self.path)
+            self.journal.reset()
+            os.remove(marker)
+            self._sig = file_signature(self.path)
+            self.journal.read_new()
+
+    def _recover(self):
+        marker = self.path + ".compact"
+        if not os.path.exists(marker):
+            return
+        tmp = self.path + ".compact.tmp"
+        if os.path.exists(tmp):
+            os.remove(tmp)  # crashed before the rename: journal still applies
+        else:
+            self.journal.reset()  # renamed already: deltas are in product.txt
+        os.remove(marker)
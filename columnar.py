@@ -0,0 +1,213 @@
+import threading
+import warnings
+
+from analytics import admin_report, rank, write_admin_report
+from filecache import file_signature
+
+try:
+    import numpy as np
+except ImportError:  # the pure-Python column code below is used instead
+    np = None
+
+# =========================
+# Columnar analytics engine (economics.txt)
+# =========================
+# Loads the ledger into typed columns once: string keys become categorical codes
+# (numbered in order of first appearance, which keeps tie-breaking identical to
+# the dict-based reports) and prices/quantities become float/int arrays.
+# Group-by sums use np.bincount, which adds rows in file order, so the totals are
+# bit-for-bit the same as the line-by-line loops.
+
+ECON_COLS = 11
+
+
+def _factorize(values):
+    # (codes, labels) with labels in order of first appearance
+    if np is not None:
+        if len(values) == 0:
+            return np.zeros(0, dtype=np.intp), values
+        uniq, first, inverse = np.unique(values, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        pos = np.empty(len(order), dtype=np.intp)
+        pos[order] = np.arange(len(order))
+        return pos[inverse.reshape(-1)], uniq[order]
+
+    seen = {}
+    codes = [seen.setdefault(v, len(seen)) for v in values]
+    return codes, list(seen)
+
+
+def _join(*parts):
+    if np is not None:
+        out = parts[0]
+        for p in parts[1:]:
+            out = np.char.add(out, p)
+        return out
+    n = len(parts[0])
+    cols = [p if isinstance(p, list) else [p] * n for p in parts]
+    return ["".join(t) for t in zip(*cols)]
+
+
+def _number(col, kind):
+    if np is not None:
+        return np.where(col == "", "0", col).astype(kind)
+    return [kind(v) if v else kind(0) for v in col]
+
+
+class LedgerColumns:
+    def __init__(self, path):
+        c = self._read(path)
+
+        self.unit_price = _number(c[8], float)
+        self.quantity = _number(c[9], int)
+        self.total_price = _number(c[10], float)
+
+        self.codes = {}
+        self.labels = {}
+        self._add_key("seller", _join(c[4], " | ", c[5]))
+        self._add_key("product", _join(c[6], " | ", c[7], " | seller ", c[4]))
+        self._add_key("seller_id", c[4])
+        # "seller_id\n product_id | product_name": per-seller product keys
+        self._add_key("seller_product", _join(c[4], "\n", c[6], " | ", c[7]))
+
+    def _read(self, path):
+        if np is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                f.readline()
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", UserWarning)  # header-only ledger
+                    table = np.loadtxt(f, dtype=str, delimiter=",", comments=None, ndmin=2)
+            if table.size == 0:
+                table = np.empty((0, ECON_COLS), dtype=str)
+            return [table[:, i] for i in range(ECON_COLS)]
+
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.readlines()
+        rows = [line.strip().split(",") for line in lines[1:] if line.strip()]
+        if not rows:
+            return [[] for _ in range(ECON_COLS)]
+        return [list(col) for col in zip(*rows)][:ECON_COLS]
+
+    def _add_key(self, name, values):
+        self.codes[name], self.labels[name] = _factorize(values)
+
+    def __len__(self):
+        return len(self.total_price)
+
+    # ---- group-by ----
+    def sums(self, by):
+        n = len(self.labels[by])
+        if np is not None:
+            return np.bincount(self.codes[by], weights=self.total_price, minlength=n)
+        out = [0.0] * n
+        for code, total in zip(self.codes[by], self.total_price):
+            out[code] += total
+        return out
+
+    def revenue(self, by):
+        return dict(zip(self._labels(by), self._values(self.sums(by))))
+
+    def ranked(self, by):
+        # (best, lowest, all high->low) like analytics.rank(), without dict sorting
+        if np is None:
+            return rank(self.revenue(by))
+        sums = self.sums(by)
+        if len(sums) == 0:
+            return ("N/A", 0.0), ("N/A", 0.0), []
+        labels = self.labels[by]
+        asc = np.argsort(sums, kind="stable")
+        desc = np.argsort(-sums, kind="stable")
+        best = (str(labels[asc[-1]]), float(sums[asc[-1]]))
+        low = (str(labels[asc[0]]), float(sums[asc[0]]))
+        return best, low, list(zip(labels[desc].tolist(), sums[desc].tolist()))
+
+    def top_k(self, by, k):
+        return self.ranked(by)[2][:k] if np is None else self._pick(by, k, True)
+
+    def bottom_k(self, by, k):
+        if np is None:
+            return sorted(self.revenue(by).items(), key=lambda x: x[1])[:k]
+        return self._pick(by, k, False)
+
+    def _pick(self, by, k, high):
+        sums = self.sums(by)
+        k = min(k, len(sums))
+        if k <= 0:
+            return []
+        key = -sums if high else sums
+        # argpartition narrows to k rows, then a stable sort on code order keeps ties stable
+        idx = np.argpartition(key, k - 1)[:k] if k < len(sums) else np.arange(len(sums))
+        cut = key[idx].max()
+        idx = np.concatenate([np.flatnonzero(key < cut), np.flatnonzero(key == cut)])
+        idx = idx[np.argsort(key[idx], kind="stable")][:k]
+        labels = self.labels[by]
+        return list(zip(labels[idx].tolist(), sums[idx].tolist()))
+
+    def totals(self):
+        if np is not None:
+            return {"rows": len(self), "units": int(self.quantity.sum()),
+                    "revenue": float(np.bincount(np.zeros(len(self), dtype=np.intp),
+                                                 weights=self.total_price, minlength=1)[0])}
+        revenue = 0.0
+        for t in self.total_price:
+            revenue += t
+        return {"rows": len(self), "units": sum(self.quantity), "revenue": revenue}
+
+    # ---- per seller ----
+    def seller_analytics(self, seller_id):
+        # (total_rev, best, lowest) like compute_seller_analytics()
+        sid_labels = self._labels("seller_id")
+        if seller_id not in sid_labels:
+            return 0.0, ("N/A", 0.0), ("N/A", 0.0)
+        code = sid_labels.index(seller_id)
+        total_rev = self._values(self.sums("seller_id"))[code]
+
+        prefix = seller_id + "\n"
+        sp_labels = self._labels("seller_product")
+        sp_sums = self._values(self.sums("seller_product"))
+        prod_rev = {}
+        for label, v in zip(sp_labels, sp_sums):
+            if label.startswith(prefix):
+                prod_rev[label[len(prefix):]] = v
+
+        best, lowest, _ = rank(prod_rev)
+        return total_rev, best, lowest
+
+    def _labels(self, by):
+        labels = self.labels[by]
+        return labels.tolist() if np is not None else labels
+
+    def _values(self, sums):
+        return sums.tolist() if np is not None else sums
+
+
+# =========================
+# Drop-in replacements for main.compute_*
+# =========================
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load(path):
+    # columns for path, re-read only when the file changed
+    with _cache_lock:
+        sig = file_signature(path)
+        hit = _cache.get(path)
+        if hit is None or hit[0] != sig:
+            hit = (sig, LedgerColumns(path))
+            _cache[path] = hit
+    return hit[1]
+
+
+def compute_admin_analytics_text(path):
+    cols = load(path)
+    return admin_report(cols.ranked("seller"), cols.ranked("product"))
+
+
+def write_admin_analytics(out, path):
+    cols = load(path)
+    write_admin_report(out, cols.ranked("seller"), cols.ranked("product"))
+
+
+def compute_seller_analytics(path, seller_id):
+    return load(path).seller_analytics(seller_id)
@@ -0,0 +1,133 @@
+import os
+import threading
+
+import metrics
+
+# =========================
+# Cached CSV tables
+# =========================
+# Every screen used to re-open and re-split a whole .txt file. A CachedTable keeps
+# the parsed rows in memory and only re-reads the file when its stat signature
+# changes (another process wrote to it) or when this process writes through it.
+# Loads and writes hold self.mutex, so one table can be shared between threads.
+# Rows are split lists unless a record class (records.py) is given, which then
+# parses every line and writes the rows back.
+
+
+def file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class CachedTable:
+    def __init__(self, path, header, record=None):
+        self.path = path
+        self.header = header
+        self.record = record
+        self.rows = []
+        self.line_count = 0  # lines in the file, header and blank lines included
+        self.generation = 0  # bumped on every full (re)load
+        self._sig = None
+        self.mutex = threading.RLock()
+        name = os.path.basename(path)
+        self.reload_metric = f"table.reload:{name}"
+        self.rewrite_metric = f"table.rewrite:{name}"
+
+    def fresh(self):
+        with self.mutex:
+            if file_signature(self.path) != self._sig:
+                self.reload()
+        return self
+
+    def reload(self):
+        with self.mutex:
+            # take the signature first: a write racing with the read shows up as a
+            # changed signature on the next fresh() instead of being missed
+            sig = file_signature(self.path)
+            with metrics.span(self.reload_metric), open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+
+            rows = []
+            for line in lines[1:]:
+                if not line.strip():
+                    continue
+                rows.append(self.parse(line))
+
+            self.rows = rows
+            self.line_count = len(lines)
+            self._sig = sig
+            self.generation += 1
+            self.on_reload()
+
+    def append(self, row):
+        with self.mutex:
+            self.fresh()
+            if not self._append(self.format(row).encode("utf-8")):
+                self.reload()  # another process appended too: read its rows (and ours) back
+                return
+            self.rows.append(row)
+            self.line_count += 1
+            self.on_append(row)
+
+    def extend(self, rows):
+        # append many rows with one buffered write
+        with self.mutex:
+            self.fresh()
+            if not self._append("".join(self.format(row) for row in rows).encode("utf-8")):
+                self.reload()
+                return
+            start = len(self.rows)
+            self.rows.extend(rows)
+            self.line_count += len(rows)
+            self.on_extend(start)
+
+    def _append(self, data):
+        # write data at the end of the file; False unless the file was exactly
+        # what this table had loaded before the write and grew by just data
+        # after it (else another process appended in between and the cached
+        # signature must not pretend those rows were read)
+        with open(self.path, "ab") as f:
+            st = os.fstat(f.fileno())
+            f.write(data)
+        sig = file_signature(self.path)
+        if (self._sig is None or (st.st_size, st.st_ino) != self._sig[1:]
+                or sig is None or sig[1:] != (st.st_size + len(data), st.st_ino)):
+            return False
+        self._sig = sig
+        return True
+
+    def rewrite(self):
+        # write the cached rows back as the whole file (temp file + rename, so
+        # other processes never read a half-written file)
+        with self.mutex:
+            lines = [self.header]
+            for row in self.rows:
+                lines.append(self.format(row))
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with metrics.span(self.rewrite_metric):
+                with open(tmp, "w", encoding="utf-8") as f:
+                    f.writelines(lines)
+                os.replace(tmp, self.path)
+            self.line_count = len(lines)
+            self._sig = file_signature(self.path)
+
+    def parse(self, line):
+        return self.record.parse(line) if self.record else line.strip().split(",")
+
+    def format(self, row):
+        return row.to_line() if self.record else ",".join(row) + "\n"
+
+    # hooks for subclasses that keep lookup tables next to the rows
+    def on_reload(self):
+        pass
+
+    def on_append(self, row):
+        pass
+
+    def on_extend(self, start):
+        # rows[start:] were just added by extend()
+        for row in self.rows[start:]:
+            self.on_append(row)
@@ -0,0 +1,665 @@
+import os
+import tempfile
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+
+import metrics
+import reports
+from importer import summary as import_summary
+from main import market, compute_seller_range, write_admin_range_text
+from records import CartItem
+from tasks import TaskRunner
+from widgets import PagedText, VirtualTree
+
+# The Tk app; imported by main.run() when the GUI starts, so headless users of
+# main.py / marketplace.py never load tkinter.
+
+# =========================
+# UI helpers (glassy look)
+# =========================
+BG = "#0a1020"
+CARD = "#121a2b"
+ENTRY_BG = "#0e1526"
+BORDER = "#2a3553"
+TXT = "#e7ecff"
+MUTED = "#b9c2e3"
+BTN = "#1b2a55"
+BTN2 = "#143a2a"
+BTN3 = "#3a1b1b"
+
+def glass_card(parent, title):
+    card = tk.Frame(parent, bg=CARD, highlightthickness=1, highlightbackground=BORDER)
+    card.pack(fill="both", expand=True, padx=14, pady=14)
+
+    top = tk.Frame(card, bg=CARD)
+    top.pack(fill="x", padx=14, pady=(12, 6))
+
+    tk.Label(top, text=title, bg=CARD, fg=TXT, font=("Segoe UI", 14, "bold")).pack(side="left")
+
+    body = tk.Frame(card, bg=CARD)
+    body.pack(fill="both", expand=True, padx=14, pady=(6, 14))
+    return body
+
+def label(parent, t):
+    tk.Label(parent, text=t, bg=CARD, fg=TXT, font=("Segoe UI", 10, "bold")).pack(anchor="w", pady=(6, 0))
+
+def entry(parent, var, show=None):
+    e = tk.Entry(parent, textvariable=var, bg=ENTRY_BG, fg=TXT, insertbackground=TXT,
+                 relief="flat", highlightthickness=1, highlightbackground=BORDER,
+                 highlightcolor="#6f86ff", font=("Segoe UI", 11))
+    if show:
+        e.config(show=show)
+    e.pack(fill="x", pady=6)
+    return e
+
+def button(parent, t, cmd, color=BTN):
+    b = tk.Button(parent, text=t, command=cmd, bg=color, fg=TXT,
+                  activebackground=color, activeforeground="#ffffff",
+                  relief="flat", font=("Segoe UI", 11, "bold"), padx=12, pady=10)
+    b.pack(fill="x", pady=6)
+    return b
+
+def date_range_row(parent):
+    # "From [....] To [....]" (YYYY-MM-DD, blank = open-ended); returns the two StringVars
+    row = tk.Frame(parent, bg=CARD)
+    row.pack(fill="x", pady=(4, 0))
+    start, end = tk.StringVar(), tk.StringVar()
+    for text, var in (("From", start), ("To", end)):
+        tk.Label(row, text=text, bg=CARD, fg=MUTED, font=("Segoe UI", 10)).pack(side="left", padx=(0, 6))
+        tk.Entry(row, textvariable=var, width=12, bg=ENTRY_BG, fg=TXT, insertbackground=TXT,
+                 relief="flat", highlightthickness=1, highlightbackground=BORDER,
+                 highlightcolor="#6f86ff", font=("Segoe UI", 10)).pack(side="left", padx=(0, 12))
+    tk.Label(row, text="YYYY-MM-DD, blank = all time", bg=CARD, fg=MUTED,
+             font=("Segoe UI", 9)).pack(side="left")
+    return start, end
+
+def analytics_file(start, end):
+    # the admin analytics text (ECOM_ANALYTICS engine) for the date range,
+    # written straight into a temp file for PagedText
+    fd, path = tempfile.mkstemp(prefix="ecom-analytics-", suffix=".txt")
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            write_admin_range_text(f, start, end)
+        return path, reports.index_lines(path)
+    except:
+        os.remove(path)
+        raise
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def ask_report_path(parent):
+    return filedialog.asksaveasfilename(
+        parent=parent, title="Export Report", defaultextension=".csv",
+        filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Text report", "*.txt")])
+
+def debounce(widget, ms, fn):
+    # collapse a burst of calls (e.g. keystrokes) into one fn() after ms of quiet
+    job = [None]
+
+    def run():
+        job[0] = None
+        if widget.winfo_exists():
+            fn()
+
+    def call(*_):
+        if job[0] is not None:
+            widget.after_cancel(job[0])
+        job[0] = widget.after(ms, run)
+
+    return call
+
+# =========================
+# Main App
+# =========================
+class App(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("E-Commerce Marketplace (Tkinter GUI)")
+        self.geometry("980x620")
+        self.minsize(980, 620)
+        self.configure(bg=BG)
+
+        style = ttk.Style(self)
+        style.theme_use("clam")
+        style.configure("Treeview", background=ENTRY_BG, fieldbackground=ENTRY_BG,
+                        foreground=TXT, rowheight=28, bordercolor=BORDER,
+                        borderwidth=1, font=("Segoe UI", 10))
+        style.configure("Treeview.Heading", background=CARD, foreground=TXT,
+                        font=("Segoe UI", 10, "bold"))
+        style.map("Treeview", background=[("selected", "#2a3b7a")])
+
+        self.container = tk.Frame(self, bg=BG)
+        self.container.pack(fill="both", expand=True)
+
+        self.current_role = None
+        self.current_user = None
+        self.cart = []
+
+        # analytics, catalog loads and checkout run here, off the Tk thread
+        self.tasks = TaskRunner()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.poll_tasks()
+        # open the data files while the home screen is up
+        self.tasks.submit("bootstrap", market.bootstrap, keep=True)
+
+        self.show_home()
+
+    def poll_tasks(self):
+        self.tasks.poll()
+        self.after(40, self.poll_tasks)
+
+    def close(self):
+        self.tasks.shutdown()  # drops (and cleans up) results still on their way
+        self.destroy()
+
+    def clear(self):
+        self.tasks.forget()  # results for the old screen have nowhere to go
+        for w in self.container.winfo_children():
+            w.destroy()
+
+    def show_home(self):
+        self.clear()
+        body = glass_card(self.container, "Welcome — Choose Role")
+        tk.Label(body, text="Default Admin: admin / admin123",
+                 bg=CARD, fg=MUTED, font=("Segoe UI", 10)).pack(anchor="w", pady=(0, 10))
+
+        button(body, "Admin Login", self.show_admin_login)
+        button(body, "Seller (Sign up / Login)", self.show_seller_auth)
+        button(body, "Customer (Sign up / Login)", self.show_customer_auth)
+
+    # =========================
+    # Admin
+    # =========================
+    def show_admin_login(self):
+        self.clear()
+        body = glass_card(self.container, "Admin Login")
+
+        u = tk.StringVar()
+        p = tk.StringVar()
+
+        label(body, "Username")
+        entry(body, u)
+        label(body, "Password")
+        entry(body, p, show="*")
+
+        def do_login():
+            user = market.login("admin", u.get(), p.get())
+            if user:
+                self.current_role = "admin"
+                self.current_user = user
+                self.show_admin_dashboard()
+                return
+            messagebox.showerror("Login Failed", "Invalid admin credentials.")
+
+        button(body, "Login", do_login)
+        button(body, "Back", self.show_home, color=BTN3)
+
+    def show_admin_dashboard(self):
+        self.clear()
+        body = glass_card(self.container, "Admin Dashboard")
+
+        top = tk.Frame(body, bg=CARD)
+        top.pack(fill="x", pady=(0, 10))
+        tk.Button(top, text="Logout", command=self.logout,
+                  bg="#2b1630", fg="#ffd7ef", relief="flat",
+                  font=("Segoe UI", 10, "bold"), padx=10, pady=6).pack(side="right")
+        tk.Button(top, text="Diagnostics", command=self.show_diagnostics,
+                  bg=BTN, fg=TXT, relief="flat",
+                  font=("Segoe UI", 10, "bold"), padx=10, pady=6).pack(side="right", padx=(0, 8))
+
+        tk.Label(body, text="All Sellers", bg=CARD, fg=TXT, font=("Segoe UI", 11, "bold")).pack(anchor="w")
+
+        cols = ("id", "name", "email", "phone", "address", "cnic")
+        tree = VirtualTree(body, cols, height=7)
+        tree.pack(fill="x", pady=8)
+
+        def load_sellers():
+            return [(s.id, s.name, s.email, s.phone, s.address, s.cnic) for s in market.seller_rows()]
+
+        self.tasks.submit("admin_sellers", load_sellers, on_done=tree.set_rows)
+
+        tk.Label(body, text="Marketplace Analytics (from economics.txt)", bg=CARD, fg=TXT,
+                 font=("Segoe UI", 11, "bold")).pack(anchor="w", pady=(16, 0))
+        start, end = date_range_row(body)
+
+        # the analytics text is written to a temp file and paged in, a screenful
+        # at a time; "Export Report…" writes the full report
+        out = PagedText(body, height=10, bg=ENTRY_BG, fg=TXT, insertbackground=TXT,
+                        relief="flat", highlightthickness=1, highlightbackground=BORDER,
+                        font=("Consolas", 10))
+        out.pack(fill="both", expand=True, pady=8)
+
+        def refresh():
+            out.set_message("Computing analytics…")
+            self.tasks.submit("admin_analytics", analytics_file, start.get(), end.get(),
+                              on_done=lambda res: out.set_file(*res, temporary=True),
+                              on_error=lambda e: out.set_message(f"Analytics failed: {e}"),
+                              on_drop=lambda res: remove_file(res[0]))
+
+        def export():
+            path = ask_report_path(body)
+            if path:
+                self.tasks.submit("admin_export", market.export_report, path, start.get(), end.get(),
+                                  on_done=lambda n: messagebox.showinfo("Exported", f"{n} rows written to {path}"),
+                                  on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+        button(body, "Refresh Analytics", refresh)
+        button(body, "Export Report…", export)
+        refresh()
+
+    def show_diagnostics(self):
+        self.clear()
+        body = glass_card(self.container, "Diagnostics")
+        tk.Label(body, text="Time, calls and bytes per operation (ECOM_METRICS=1)", bg=CARD, fg=MUTED,
+                 font=("Segoe UI", 10)).pack(anchor="w")
+
+        out = tk.Text(body, height=16, bg=ENTRY_BG, fg=TXT, insertbackground=TXT, wrap="none",
+                      relief="flat", highlightthickness=1, highlightbackground=BORDER,
+                      font=("Consolas", 9))
+        out.pack(fill="both", expand=True, pady=8)
+
+        def refresh():
+            out.delete("1.0", "end")
+            out.insert("end", metrics.report())
+
+        def export(name):
+            path = metrics.export(os.path.join(market.data_dir, name))
+            messagebox.showinfo("Exported", f"Metrics written to {path}")
+
+        row = tk.Frame(body, bg=CARD)
+        row.pack(fill="x")
+        for text, cmd in (("Refresh", refresh), ("Export JSON", lambda: export("metrics.json")),
+                          ("Export Prometheus", lambda: export("metrics.prom")),
+                          ("Back", self.show_admin_dashboard)):
+            tk.Button(row, text=text, command=cmd, bg=BTN3 if text == "Back" else BTN, fg=TXT, relief="flat",
+                      font=("Segoe UI", 10, "bold"), padx=10, pady=6).pack(side="left", padx=(0, 8))
+        refresh()
+
+    # =========================
+    # Seller
+    # =========================
+    def show_seller_auth(self):
+        self.clear()
+        body = glass_card(self.container, "Seller — Sign up / Login")
+        button(body, "Sign up (Create Seller)", self.show_seller_signup)
+        button(body, "Login", self.show_seller_login)
+        button(body, "Back", self.show_home, color=BTN3)
+
+    def show_seller_signup(self):
+        self.clear()
+        body = glass_card(self.container, "Seller Sign Up")
+
+        name = tk.StringVar()
+        sid = tk.StringVar()
+        email = tk.StringVar()
+        address = tk.StringVar()
+        phone = tk.StringVar()
+        password = tk.StringVar()
+        cnic = tk.StringVar()
+
+        label(body, "Name"); entry(body, name)
+        label(body, "Seller ID"); entry(body, sid)
+        label(body, "Email"); entry(body, email)
+        label(body, "Address"); entry(body, address)
+        label(body, "Phone"); entry(body, phone)
+        label(body, "Password"); entry(body, password, show="*")
+        label(body, "CNIC"); entry(body, cnic)
+
+        def do_signup():
+            try:
+                market.signup("seller", {"name": name.get(), "password": password.get(), "id": sid.get(),
+                                         "email": email.get(), "address": address.get(), "phone": phone.get(),
+                                         "cnic": cnic.get()})
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+
+            messagebox.showinfo("Success", "Seller account created.")
+            self.show_seller_login()
+
+        button(body, "Create Account", do_signup, color=BTN2)
+        button(body, "Back", self.show_seller_auth, color=BTN3)
+
+    def show_seller_login(self):
+        self.clear()
+        body = glass_card(self.container, "Seller Login")
+
+        uname = tk.StringVar()
+        pwd = tk.StringVar()
+
+        label(body, "Seller Name"); entry(body, uname)
+        label(body, "Password"); entry(body, pwd, show="*")
+
+        def do_login():
+            user = market.login("seller", uname.get(), pwd.get())
+            if user:
+                self.current_role = "seller"
+                self.current_user = user
+                self.show_seller_dashboard()
+                return
+            messagebox.showerror("Login Failed", "Invalid seller credentials.")
+
+        button(body, "Login", do_login)
+        button(body, "Back", self.show_seller_auth, color=BTN3)
+
+    def show_seller_dashboard(self):
+        self.clear()
+        seller = self.current_user
+        body = glass_card(self.container, f"Seller Dashboard — {seller['name']} (ID: {seller['id']})")
+
+        top = tk.Frame(body, bg=CARD)
+        top.pack(fill="x", pady=(0, 10))
+        tk.Button(top, text="Logout", command=self.logout,
+                  bg="#2b1630", fg="#ffd7ef", relief="flat",
+                  font=("Segoe UI", 10, "bold"), padx=10, pady=6).pack(side="right")
+
+        left = tk.Frame(body, bg=CARD)
+        right = tk.Frame(body, bg=CARD)
+        left.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        right.pack(side="left", fill="both", expand=True)
+
+        tk.Label(left, text="Add Product", bg=CARD, fg=TXT, font=("Segoe UI", 11, "bold")).pack(anchor="w")
+
+        pname = tk.StringVar()
+        desc = tk.StringVar()
+        category = tk.StringVar()
+        brand = tk.StringVar()
+        price = tk.StringVar()
+        stock = tk.StringVar()
+
+        label(left, "Product Name"); entry(left, pname)
+        label(left, "Description"); entry(left, desc)
+        label(left, "Category"); entry(left, category)
+        label(left, "Brand"); entry(left, brand)
+        label(left, "Price"); entry(left, price)
+        label(left, "Stock"); entry(left, stock)
+
+        cols = ("product_id", "product_name", "price", "stock", "status")
+        tree = VirtualTree(right, cols, height=8)
+
+        tk.Label(right, text="My Products", bg=CARD, fg=TXT, font=("Segoe UI", 11, "bold")).pack(anchor="w")
+        tree.pack(fill="x", pady=8)
+
+        out = tk.Text(right, height=10, bg=ENTRY_BG, fg=TXT, insertbackground=TXT,
+                      relief="flat", highlightthickness=1, highlightbackground=BORDER,
+                      font=("Consolas", 10))
+        tk.Label(right, text="My Analytics (from economics.txt)", bg=CARD, fg=TXT,
+                 font=("Segoe UI", 11, "bold")).pack(anchor="w", pady=(10, 0))
+        start, end = date_range_row(right)
+        out.pack(fill="both", expand=True, pady=8)
+
+        def refresh_products():
+            def load():
+                return [(p.product_id, p.product_name, f"{p.price:.2f}", p.stock, p.status)
+                        for p in market.seller_products(seller["id"])]
+            self.tasks.submit("seller_products", load, on_done=tree.set_rows)
+
+        def show_analytics(res):
+            total_rev, best, lowest = res
+            out.delete("1.0", "end")
+            if isinstance(total_rev, list):  # date range: [revenue, units, orders]
+                total_rev, units, orders = total_rev
+                out.insert("end", f"Units: {units}   Orders: {orders}\n")
+            out.insert("end", f"Total Revenue: {total_rev:.2f}\n")
+            out.insert("end", f"Best Product: {best[0]} -> {best[1]:.2f}\n")
+            out.insert("end", f"Lowest Product: {lowest[0]} -> {lowest[1]:.2f}\n")
+
+        def refresh_analytics():
+            out.delete("1.0", "end")
+            out.insert("end", "Computing analytics…\n")
+            self.tasks.submit("seller_analytics", compute_seller_range, seller["id"], start.get(), end.get(),
+                              on_done=show_analytics,
+                              on_error=lambda e: (out.delete("1.0", "end"), out.insert("end", f"{e}\n")))
+
+        def add_product():
+            try:
+                pid = market.add_product(seller, pname.get(), desc.get(), category.get(), brand.get(),
+                                         price.get(), stock.get())
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            messagebox.showinfo("Success", f"Product added (ID: {pid})")
+            refresh_products()
+            refresh_analytics()
+
+        def import_products():
+            path = filedialog.askopenfilename(
+                title="Import Products",
+                filetypes=[("Product files", "*.csv *.jsonl *.json"), ("All files", "*.*")])
+            if not path or self.tasks.busy("import_products"):
+                return
+
+            def done(result):
+                import_btn.config(state="normal")
+                messagebox.showinfo("Import Products", import_summary(result))
+                refresh_products()
+
+            def failed(e):
+                import_btn.config(state="normal")
+                messagebox.showerror("Error", str(e))
+
+            import_btn.config(state="disabled")
+            self.tasks.submit("import_products", market.import_products, seller, path,
+                              on_done=done, on_error=failed)
+
+        button(left, "Add Product", add_product, color=BTN2)
+        import_btn = button(left, "Import CSV / JSONL…", import_products)
+        def export_report():
+            path = ask_report_path(right)
+            if path:
+                self.tasks.submit("seller_export", market.export_report, path, start.get(), end.get(), seller["id"],
+                                  on_done=lambda n: messagebox.showinfo("Exported", f"{n} rows written to {path}"),
+                                  on_error=lambda e: messagebox.showerror("Error", str(e)))
+
+        button(right, "Refresh", lambda: (refresh_products(), refresh_analytics()))
+        button(right, "Export Report…", export_report)
+        refresh_products()
+        refresh_analytics()
+
+    # =========================
+    # Customer
+    # =========================
+    def show_customer_auth(self):
+        self.clear()
+        body = glass_card(self.container, "Customer — Sign up / Login")
+        button(body, "Sign up (Create Customer)", self.show_customer_signup)
+        button(body, "Login", self.show_customer_login)
+        button(body, "Back", self.show_home, color=BTN3)
+
+    def show_customer_signup(self):
+        self.clear()
+        body = glass_card(self.container, "Customer Sign Up")
+
+        name = tk.StringVar()
+        cid = tk.StringVar()
+        email = tk.StringVar()
+        address = tk.StringVar()
+        phone = tk.StringVar()
+        password = tk.StringVar()
+
+        label(body, "Name"); entry(body, name)
+        label(body, "Customer ID"); entry(body, cid)
+        label(body, "Email"); entry(body, email)
+        label(body, "Address"); entry(body, address)
+        label(body, "Phone"); entry(body, phone)
+        label(body, "Password"); entry(body, password, show="*")
+
+        def do_signup():
+            try:
+                market.signup("customer", {"name": name.get(), "password": password.get(), "id": cid.get(),
+                                           "email": email.get(), "address": address.get(), "phone": phone.get()})
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+
+            messagebox.showinfo("Success", "Customer account created.")
+            self.show_customer_login()
+
+        button(body, "Create Account", do_signup, color=BTN2)
+        button(body, "Back", self.show_customer_auth, color=BTN3)
+
+    def show_customer_login(self):
+        self.clear()
+        body = glass_card(self.container, "Customer Login")
+
+        uname = tk.StringVar()
+        pwd = tk.StringVar()
+
+        label(body, "Customer Name"); entry(body, uname)
+        label(body, "Password"); entry(body, pwd, show="*")
+
+        def do_login():
+            user = market.login("customer", uname.get(), pwd.get())
+            if user:
+                self.current_role = "customer"
+                self.current_user = user
+                self.cart = []
+                self.show_customer_shop()
+                return
+            messagebox.showerror("Login Failed", "Invalid customer credentials.")
+
+        button(body, "Login", do_login)
+        button(body, "Back", self.show_customer_auth, color=BTN3)
+
+    def show_customer_shop(self):
+        self.clear()
+        cust = self.current_user
+        body = glass_card(self.container, f"Customer Shop — {cust['name']} (ID: {cust['id']})")
+
+        top = tk.Frame(body, bg=CARD)
+        top.pack(fill="x", pady=(0, 10))
+        tk.Button(top, text="Logout", command=self.logout,
+                  bg="#2b1630", fg="#ffd7ef", relief="flat",
+                  font=("Segoe UI", 10, "bold"), padx=10, pady=6).pack(side="right")
+
+        left = tk.Frame(body, bg=CARD)
+        right = tk.Frame(body, bg=CARD)
+        left.pack(side="left", fill="both", expand=True, padx=(0, 10))
+        right.pack(side="left", fill="both", expand=True)
+
+        tk.Label(left, text="Search Products", bg=CARD, fg=TXT, font=("Segoe UI", 11, "bold")).pack(anchor="w")
+        search_var = tk.StringVar()
+        entry(left, search_var)
+        status_lbl = tk.Label(left, text="", bg=CARD, fg=MUTED, font=("Segoe UI", 9))
+        status_lbl.pack(anchor="w")
+
+        pcols = ("product_id", "product_name", "price", "stock", "seller_id", "seller_name")
+        ptree = VirtualTree(left, pcols, height=12, width=130)
+        ptree.pack(fill="both", expand=True, pady=8)
+
+        tk.Label(right, text="Cart", bg=CARD, fg=TXT, font=("Segoe UI", 11, "bold")).pack(anchor="w")
+        ccols = ("product_id", "product_name", "unit_price", "quantity", "total")
+        ctree = VirtualTree(right, ccols, height=10)
+        ctree.pack(fill="x", pady=8)
+
+        qty = tk.StringVar(value="1")
+        label(right, "Quantity")
+        entry(right, qty)
+
+        total_lbl = tk.Label(right, text="Cart Total: 0.00", bg=CARD, fg=MUTED, font=("Segoe UI", 10, "bold"))
+        total_lbl.pack(anchor="w", pady=(10, 0))
+
+        def load_products(q):
+            # 0 product_id, 1 seller_id, 2 seller_name, 3 product_name, 7 price, 8 stock
+            return [(p.product_id, p.product_name, f"{p.price:.2f}", p.stock, p.seller_id, p.seller_name)
+                    for p in market.shop_products(q)]
+
+        def show_products(shown):
+            ptree.set_rows(shown)
+            status_lbl.config(text=f"{len(shown)} products")
+
+        def refresh_products():
+            status_lbl.config(text="Searching…")
+            self.tasks.submit("shop_products", load_products, search_var.get().strip().lower(),
+                              on_done=show_products)
+
+        def refresh_cart():
+            total = 0.0
+            shown = []
+            for it in self.cart:
+                shown.append((it.product_id, it.product_name, f"{it.unit_price:.2f}", it.quantity,
+                              f"{it.total_price:.2f}"))
+                total += it.total_price
+            ctree.set_rows(shown)
+            total_lbl.config(text=f"Cart Total: {total:.2f}")
+
+        def add_to_cart():
+            vals = ptree.selected_values()
+            if not vals:
+                messagebox.showerror("Error", "Select a product first.")
+                return
+            pid, pname, price, stock, sid, sname = vals
+
+            try:
+                q = int(qty.get().strip())
+                if q <= 0:
+                    raise ValueError
+            except:
+                messagebox.showerror("Error", "Quantity must be a positive integer.")
+                return
+
+            if q > int(stock):
+                messagebox.showerror("Error", "Not enough stock.")
+                return
+
+            # merge if exists
+            for it in self.cart:
+                if it.product_id == pid:
+                    new_q = it.quantity + q
+                    if new_q > int(stock):
+                        messagebox.showerror("Error", "Not enough stock for combined quantity.")
+                        return
+                    it.quantity = new_q
+                    refresh_cart()
+                    return
+
+            self.cart.append(CartItem(pid, pname, float(price), q, sid, sname))
+            refresh_cart()
+
+        def checkout():
+            if not self.cart:
+                messagebox.showerror("Error", "Cart is empty.")
+                return
+            if self.tasks.busy("checkout"):
+                return
+
+            # the outcome is shown even if the customer left this screen meanwhile
+            def done(order_id):
+                messagebox.showinfo("Success", f"Purchase successful! Order ID: {order_id}")
+                if buy_btn.winfo_exists():
+                    buy_btn.config(state="normal")
+                    self.cart = []
+                    refresh_cart()
+                    refresh_products()
+
+            def failed(e):
+                messagebox.showerror("Error", str(e))
+                if buy_btn.winfo_exists():
+                    buy_btn.config(state="normal")
+
+            buy_btn.config(state="disabled")
+            self.tasks.submit("checkout", market.place_order, cust, [it.copy() for it in self.cart],
+                              on_done=done, on_error=failed, keep=True)
+
+        def clear_cart():
+            self.cart = []
+            refresh_cart()
+
+        button(right, "Add to Cart", add_to_cart, color=BTN)
+        buy_btn = button(right, "Checkout (Buy)", checkout, color=BTN2)
+        button(right, "Clear Cart", clear_cart, color=BTN3)
+
+        search_var.trace_add("write", debounce(ptree.tree, 150, refresh_products))
+
+        refresh_products()
+        refresh_cart()
+
+    def logout(self):
+        self.current_role = None
+        self.current_user = None
+        self.cart = []
+        self.show_home()
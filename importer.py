@@ -0,0 +1,160 @@
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+
+from storage import now_str, text_fields
+
+# =========================
+# Bulk product import (CSV / JSONL)
+# =========================
+# python importer.py products.csv --seller S1001 [--data-dir .]
+#
+# A seller's products from a file of any size, in one streaming pass:
+#   read_rows()   file -> (line number, {column: text})   CSV with a header row,
+#                 or one JSON object per line for .jsonl / .json files
+#   check_rows()  -> (line number, product values, error); the same checks as
+#                 the Add Product form
+#   import_file() good rows in batches of BATCH_ROWS -> Storage.add_products()
+#                 (one block of product ids and one buffered write per batch)
+# Bad rows are reported with their line number and skipped; the rest still go
+# in. Columns: product_name (or name), description, category, brand, price,
+# stock and optionally status (default "active"). Seller columns in the file
+# are ignored: every row belongs to the importing seller.
+
+BATCH_ROWS = 5000
+MAX_REPORTED_ERRORS = 1000  # kept in the result; all of them go to on_error
+PRODUCT_STATUSES = ("active", "inactive")
+
+
+def product_values(seller, name, desc, category, brand, price, stock, status="active", created_at=None):
+    # product row without product_id (product.txt order), or ValueError
+    try:
+        p = float(str(price).strip())
+        s = int(str(stock).strip())
+        if p < 0 or s < 0 or not math.isfinite(p):
+            raise ValueError
+    except:
+        raise ValueError("Price must be number and Stock must be integer (>=0).")
+    status = str(status).strip().lower() or "active"
+    if status not in PRODUCT_STATUSES:
+        raise ValueError(f"Status must be one of: {', '.join(PRODUCT_STATUSES)}.")
+
+    fields = text_fields((name, desc, category, brand), "Product")
+    return ([seller["id"], seller["name"]] + fields +
+            [f"{p:.2f}", str(s), status, "0", created_at or now_str()])
+
+
+def read_rows(path):
+    if path.lower().endswith((".jsonl", ".json")):
+        yield from _read_jsonl(path)
+    else:
+        yield from _read_csv(path)
+
+
+def _read_csv(path):
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            if any(v for k, v in row.items() if k is not None):
+                yield reader.line_num, row
+
+
+def _read_jsonl(path):
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for n, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield n, row if isinstance(row, dict) else None
+
+
+def check_rows(rows, seller):
+    created_at = now_str()  # one timestamp for the whole import
+    for n, row in rows:
+        if row is None:
+            yield n, None, "Not a JSON object."
+            continue
+        get = lambda k: "" if row.get(k) is None else row.get(k)
+        name = str(get("product_name") or get("name")).strip()
+        if not name:
+            yield n, None, "Product name is required."
+            continue
+        try:
+            values = product_values(seller, name, get("description"), get("category"), get("brand"),
+                                    get("price"), get("stock"), get("status") or "active", created_at)
+        except ValueError as e:
+            yield n, None, str(e)
+            continue
+        yield n, values, None
+
+
+def import_file(storage, seller, path, on_error=None, batch_rows=BATCH_ROWS):
+    # {"added", "first_id", "last_id", "error_count", "errors": [[line, message]]}
+    result = {"added": 0, "first_id": None, "last_id": None, "error_count": 0, "errors": []}
+    batch = []
+
+    def flush():
+        ids = storage.add_products(batch)
+        if ids:
+            result["added"] += len(ids)
+            result["first_id"] = ids[0] if result["first_id"] is None else result["first_id"]
+            result["last_id"] = ids[-1]
+        batch.clear()
+
+    for n, values, error in check_rows(read_rows(path), seller):
+        if error is not None:
+            result["error_count"] += 1
+            if len(result["errors"]) < MAX_REPORTED_ERRORS:
+                result["errors"].append([n, error])
+            if on_error is not None:
+                on_error(n, error)
+            continue
+        batch.append(values)
+        if len(batch) >= batch_rows:
+            flush()
+    flush()
+    return result
+
+
+def summary(result):
+    # a few lines for a message box / the terminal
+    out = f"Imported {result['added']} product(s)"
+    if result["added"]:
+        out += f" (IDs {result['first_id']}–{result['last_id']})"
+    out += f".\nSkipped {result['error_count']} row(s) with errors."
+    for n, error in result["errors"][:10]:
+        out += f"\n  line {n}: {error}"
+    if result["error_count"] > 10:
+        out += "\n  …"
+    return out
+
+
+def main():
+    from marketplace import Marketplace
+
+    ap = argparse.ArgumentParser(description="Import a seller's products from a CSV or JSONL file.")
+    ap.add_argument("path")
+    ap.add_argument("--seller", required=True, help="seller ID (as in seller.txt)")
+    ap.add_argument("--data-dir", default=".")
+    args = ap.parse_args()
+    if not os.path.exists(args.path):
+        ap.error(f"no such file: {args.path}")
+
+    market = Marketplace(args.data_dir)
+    seller = next((s for s in market.seller_rows() if s.id == args.seller), None)
+    if seller is None:
+        ap.error(f"unknown seller: {args.seller}")
+    result = market.import_products(seller.user(), args.path,
+                                    on_error=lambda n, e: print(f"line {n}: {e}", file=sys.stderr))
+    print(f"Imported {result['added']} product(s), skipped {result['error_count']} row(s).")
+    sys.exit(1 if result["error_count"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+import contextlib
+import os
+import threading
+import zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# =========================
+# Cross-process file lock
+# =========================
+# Exclusive lock on a small side file (e.g. "sequences.txt.lock"). One FileLock
+# object is also a re-entrant lock between the threads of this process, so code
+# holding it may call other code that takes it again.
+
+
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self.f = None
+        self.depth = 0
+        self._thread_lock = threading.RLock()
+
+    def acquire(self):
+        self._thread_lock.acquire()
+        if self.depth == 0:
+            try:
+                self._lock_file()
+            except:
+                self._thread_lock.release()
+                raise
+        self.depth += 1
+
+    def release(self):
+        self.depth -= 1
+        try:
+            if self.depth == 0:
+                self._unlock_file()
+        finally:
+            self._thread_lock.release()
+
+    def _lock_file(self):
+        f = open(self.path, "a+b")
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:  # LK_LOCK gives up after ~10s; keep waiting
+                        pass
+        except:
+            f.close()
+            raise
+        self.f = f
+
+    def _unlock_file(self):
+        f, self.f = self.f, None
+        try:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            f.close()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+# =========================
+# Cross-process slot locks
+# =========================
+# Exclusive locks on numbered one-byte slots of a lock file (fcntl byte-range
+# locks): processes holding different slots run at once, hold_all() waits for
+# every slot. Keys are hashed to slots, so two keys may share one (they then
+# just take turns). Byte-range locks belong to the process, not the thread, and
+# POSIX drops all of them when any descriptor of the file is closed, so every
+# SlotLock on one path shares one descriptor that stays open and the threads of
+# a process take turns holding it.
+
+_slot_files = {}  # real path -> [descriptor or None, thread lock]
+_slot_files_lock = threading.Lock()
+
+
+class SlotLock:
+    def __init__(self, path, slots=1024):
+        self.path = path
+        self.slots = slots
+        with _slot_files_lock:
+            self._shared = _slot_files.setdefault(os.path.realpath(path), [None, threading.Lock()])
+
+    def slot(self, key):
+        return zlib.crc32(str(key).encode("utf-8")) % self.slots
+
+    def hold(self, keys):
+        # slots are taken in ascending order, so holders never wait on each other in a cycle
+        return self._hold([(s, 1) for s in sorted({self.slot(k) for k in keys})])
+
+    def hold_all(self):
+        return self._hold([(0, self.slots)])
+
+    @contextlib.contextmanager
+    def _hold(self, ranges):
+        with self._shared[1]:
+            if self._shared[0] is None:  # opened on first use
+                self._shared[0] = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            fd = self._shared[0]
+            held = []
+            try:
+                for start, n in ranges:
+                    _lock_range(fd, start, n)
+                    held.append((start, n))
+                yield self
+            finally:
+                for start, n in reversed(held):
+                    _unlock_range(fd, start, n)
+
+
+def _lock_range(fd, start, n):
+    if fcntl is not None:
+        fcntl.lockf(fd, fcntl.LOCK_EX, n, start, os.SEEK_SET)
+        return
+    os.lseek(fd, start, os.SEEK_SET)
+    while True:
+        try:
+            msvcrt.locking(fd, msvcrt.LK_LOCK, n)
+            return
+        except OSError:  # LK_LOCK gives up after ~10s; keep waiting
+            pass
+
+
+def _unlock_range(fd, start, n):
+    if fcntl is not None:
+        fcntl.lockf(fd, fcntl.LOCK_UN, n, start, os.SEEK_SET)
+    else:
+        os.lseek(fd, start, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, n)
+
+
+def replace_file(path, text):
+    # write text to path atomically (temp file + rename)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
@@ -0,0 +1,164 @@
+import threading
+
+import metrics
+import reports
+from importer import import_file, product_values
+from records import CartItem, Customer, Seller
+from rollups import parse_bound
+from storage import open_storage, text_fields
+
+# signup field order per role (file columns after "no")
+ACCOUNT_FIELDS = {
+    "seller": Seller.FIELDS[1:],
+    "customer": Customer.FIELDS[1:],
+}
+CONFLICT_MESSAGES = {
+    "seller": {3: "Seller ID already exists.", 4: "Email already exists.",
+               6: "Phone already exists.", 7: "CNIC already exists."},
+    "customer": {3: "Customer ID already exists.", 4: "Email already exists.",
+                 6: "Phone already exists."},
+}
+
+
+def parse_quantity(quantity):
+    # a positive whole number (1.7 is refused, not cut to 1), or ValueError
+    try:
+        q = int(quantity)
+        if q <= 0 or (isinstance(quantity, float) and q != quantity):
+            raise ValueError
+    except:
+        raise ValueError("Quantity must be a positive integer.")
+    return q
+
+
+# =========================
+# Marketplace service (no GUI)
+# =========================
+# Everything the app does, callable from the Tk screens, the HTTP API (api.py)
+# or scripts. Methods raise ValueError with a user-facing message when a
+# request can't be done; the callers decide how to show it. Data lives in a
+# storage backend (storage.py): the .txt files by default, or SQLite.
+#
+# Creating a Marketplace touches no files. The backend is opened (missing data
+# files created, admin.txt seeded) by bootstrap(), which runs on first use.
+
+
+class Marketplace:
+    def __init__(self, data_dir=".", storage=None, **options):
+        # options (analytics_engine, stock_mode, ...) go to the text backend
+        self.data_dir = data_dir
+        self.options = options
+        self._storage = metrics.instrument_storage(storage) if storage is not None else None
+        self._lock = threading.Lock()
+
+    @property
+    def storage(self):
+        if self._storage is None:
+            self.bootstrap()
+        return self._storage
+
+    def bootstrap(self):
+        with self._lock:
+            if self._storage is None:
+                self._storage = metrics.instrument_storage(open_storage(self.data_dir, **self.options))
+        return self
+
+    # ---- accounts ----
+    def login(self, role, name, password):
+        # user dict for valid credentials, else None
+        rec = self.storage.login(role, name.strip(), password.strip())
+        return rec.user() if rec is not None else None
+
+    def signup(self, role, fields):
+        values = text_fields((fields.get(k, "") for k in ACCOUNT_FIELDS[role]), "Account")
+        rec, clash = self.storage.add_account(role, values)
+        if clash is not None:
+            raise ValueError(CONFLICT_MESSAGES[role][clash])
+        return rec.user()
+
+    def seller_rows(self):
+        return self.storage.account_rows("seller")
+
+    # ---- products ----
+    def add_product(self, seller, name, desc, category, brand, price, stock):
+        return self.storage.add_product(product_values(seller, name, desc, category, brand, price, stock))
+
+    def import_products(self, seller, path, on_error=None):
+        # bulk add from a CSV / JSONL file; see importer.py for the columns and the result
+        return import_file(self.storage, seller, path, on_error)
+
+    def product(self, pid):
+        return self.storage.product(str(pid))
+
+    def seller_products(self, seller_id):
+        return self.storage.seller_products(seller_id)
+
+    def shop_products(self, q=""):
+        # active, in-stock products matching the search words
+        q = q.strip().lower()
+        rows = self.storage.search(q) if q else self.storage.products()
+        return [p for p in rows if p.on_sale]
+
+    def cart_item(self, pid, quantity):
+        # cart line for product pid at its catalog price (same shape the shop builds)
+        p = self.product(pid)
+        if p is None:
+            raise ValueError(f"Product {pid} not found.")
+        return CartItem.from_product(p, parse_quantity(quantity))
+
+    # ---- orders ----
+    def place_order(self, cust, cart):
+        # validate stock, record the order and take the stock; returns order_id
+        if not cart:
+            raise ValueError("Cart is empty.")
+        return self.storage.checkout(cust, cart)
+
+    def customer_orders(self, customer_id):
+        # order history rows (economics.txt columns), oldest first
+        return self.storage.customer_orders(customer_id)
+
+    def order_lines(self, order_id):
+        # the ledger rows of one order
+        try:
+            order_id = int(order_id)
+        except:
+            raise ValueError("Order ID must be a number.")
+        return self.storage.order_lines(order_id)
+
+    def seller_orders(self, seller_id):
+        # ledger rows of one seller's sales, oldest first
+        return self.storage.seller_orders(seller_id)
+
+    # ---- analytics (no graphs) ----
+    def admin_analytics_text(self):
+        return self.storage.admin_analytics_text()
+
+    def seller_analytics(self, seller_id):
+        # (total revenue, (best key, revenue), (lowest key, revenue))
+        return self.storage.seller_analytics(seller_id)
+
+    # ---- analytics over a date range (hour/day/month rollups) ----
+    def date_range(self, start, end):
+        # "YYYY-MM-DD"-style bounds (inclusive, blank = open) -> (start, stop) datetimes
+        start, stop = parse_bound(start), parse_bound(end, end=True)
+        if start is not None and stop is not None and start >= stop:
+            raise ValueError("The start date must be before the end date.")
+        return start, stop
+
+    def admin_range_text(self, start, end):
+        return self.storage.admin_range_text(*self.date_range(start, end))
+
+    def write_admin_analytics(self, out, start="", end=""):
+        # the admin analytics (all time unless a date is given) written to a text stream
+        if not start.strip() and not end.strip():
+            return self.storage.write_admin_analytics(out)
+        return self.storage.write_admin_range(out, *self.date_range(start, end))
+
+    def seller_range(self, seller_id, start, end):
+        # ([revenue, units, orders], (best key, revenue), (lowest key, revenue))
+        return self.storage.seller_range(seller_id, *self.date_range(start, end))
+
+    def export_report(self, path, start="", end="", seller_id=None, fmt=None, k=10):
+        # the admin (or one seller's) report as a text / CSV / JSONL file, see reports.py;
+        # returns the number of rows written
+        return reports.export(self.storage, path, fmt, *self.date_range(start, end), seller_id, k)
@@ -0,0 +1,227 @@
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# =========================
+# Instrumentation (timings, call counts, bytes read/written)
+# =========================
+# ECOM_METRICS=1 turns it on; ECOM_METRICS_FILE=path also writes the metrics
+# there at exit (Prometheus text for .prom/.txt, JSON otherwise).
+#
+# Off (the default), timed() returns the function itself and span() a shared
+# do-nothing context manager, so instrumented code runs as before.
+#
+# Per metric: calls, errors, total / max seconds, p50 / p95 / p99 over the last
+# SAMPLES calls, and the bytes the calling thread read and wrote meanwhile (from
+# /proc/thread-self/io rchar/wchar on Linux: every read()/write(), cache hits
+# included). Nested metrics each count their whole call.
+
+ENABLED = os.environ.get("ECOM_METRICS", "0") == "1"
+EXPORT_FILE = os.environ.get("ECOM_METRICS_FILE", "")
+SAMPLES = 1024
+
+# Storage methods timed by instrument_storage()
+STORAGE_OPS = ("login", "add_account", "account_rows", "product", "products", "search", "seller_products",
+               "add_product", "add_products", "checkout", "customer_orders", "order_lines", "seller_orders",
+               "admin_revenue", "seller_revenue", "rollup", "rollup_span", "admin_analytics_text",
+               "write_admin_analytics", "seller_analytics", "admin_range_text", "write_admin_range", "seller_range")
+
+_IO_PATH = next((p for p in ("/proc/thread-self/io", "/proc/self/io") if os.path.exists(p)), None)
+
+
+def _io():
+    # (rchar, wchar) of this thread so far, or None
+    if _IO_PATH is None:
+        return None
+    try:
+        with open(_IO_PATH, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    lines = data.split(b"\n")
+    return int(lines[0].split()[1]), int(lines[1].split()[1])
+
+
+def _io_cost():
+    # what reading _IO_PATH itself adds to rchar, subtracted from every sample
+    a, b = _io(), _io()
+    return 0 if a is None or b is None else b[0] - a[0]
+
+
+_IO_COST = _io_cost() if ENABLED else 0
+
+
+class Metric:
+    __slots__ = ("calls", "errors", "total", "max", "bytes_read", "bytes_written", "recent")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.recent = deque(maxlen=SAMPLES)
+
+    def percentile(self, q):
+        if not self.recent:
+            return 0.0
+        s = sorted(self.recent)
+        return s[min(len(s) - 1, int(q * len(s)))]
+
+    def as_dict(self):
+        return {"calls": self.calls, "errors": self.errors, "total_s": self.total, "max_s": self.max,
+                "p50_s": self.percentile(0.50), "p95_s": self.percentile(0.95), "p99_s": self.percentile(0.99),
+                "bytes_read": self.bytes_read, "bytes_written": self.bytes_written}
+
+
+_metrics = {}  # name -> Metric
+_lock = threading.Lock()
+
+
+def record(name, seconds, read=0, written=0, error=False):
+    with _lock:
+        m = _metrics.get(name)
+        if m is None:
+            m = _metrics[name] = Metric()
+        m.calls += 1
+        m.errors += error
+        m.total += seconds
+        m.max = max(m.max, seconds)
+        m.bytes_read += read
+        m.bytes_written += written
+        m.recent.append(seconds)
+
+
+class _Span:
+    __slots__ = ("name", "t", "io")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.io = _io()
+        self.t = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.t
+        io = _io()
+        read = written = 0
+        if io is not None and self.io is not None:
+            read = max(0, io[0] - self.io[0] - _IO_COST)
+            written = io[1] - self.io[1]
+        record(self.name, seconds, read, written, exc_type is not None)
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    # with span("catalog.reload"): ...
+    return _Span(name) if ENABLED else _NO_SPAN
+
+
+def timed(name):
+    # decorator; returns the function unchanged when instrumentation is off
+    def wrap(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def run(*args, **kwargs):
+            with _Span(name):
+                return fn(*args, **kwargs)
+        return run
+    return wrap
+
+
+def instrument_storage(storage):
+    # time the Storage methods of one backend object (calls between them included)
+    if ENABLED:
+        for op in STORAGE_OPS:
+            setattr(storage, op, timed(f"storage.{op}")(getattr(storage, op)))
+    return storage
+
+
+# =========================
+# Export
+# =========================
+def snapshot():
+    with _lock:
+        return {name: m.as_dict() for name, m in sorted(_metrics.items())}
+
+
+def reset():
+    with _lock:
+        _metrics.clear()
+
+
+def to_json(snap=None):
+    return json.dumps({"metrics": snapshot() if snap is None else snap}, indent=1)
+
+
+def to_prometheus(snap=None):
+    snap = snapshot() if snap is None else snap
+    out = ["# HELP ecom_op_seconds Time spent per operation (quantiles over recent calls).",
+           "# TYPE ecom_op_seconds summary"]
+    for name, m in snap.items():
+        for q, key in (("0.5", "p50_s"), ("0.95", "p95_s"), ("0.99", "p99_s")):
+            out.append(f'ecom_op_seconds{{op="{name}",quantile="{q}"}} {m[key]}')
+        out.append(f'ecom_op_seconds_sum{{op="{name}"}} {m["total_s"]}')
+        out.append(f'ecom_op_seconds_count{{op="{name}"}} {m["calls"]}')
+    for metric, key, kind, help_text in (
+            ("ecom_op_max_seconds", "max_s", "gauge", "Slowest call per operation."),
+            ("ecom_op_errors_total", "errors", "counter", "Calls that raised."),
+            ("ecom_op_read_bytes_total", "bytes_read", "counter", "Bytes read during calls."),
+            ("ecom_op_written_bytes_total", "bytes_written", "counter", "Bytes written during calls.")):
+        out.append(f"# HELP {metric} {help_text}")
+        out.append(f"# TYPE {metric} {kind}")
+        for name, m in snap.items():
+            out.append(f'{metric}{{op="{name}"}} {m[key]}')
+    return "\n".join(out) + "\n"
+
+
+def export(path):
+    # write the current metrics to path (Prometheus text for .prom/.txt, else JSON)
+    text = to_prometheus() if path.endswith((".prom", ".txt")) else to_json()
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+    return path
+
+
+def report():
+    # plain-text table for the admin Diagnostics panel
+    snap = snapshot()
+    if not ENABLED:
+        return "Instrumentation is off. Start the app with ECOM_METRICS=1 to collect timings.\n"
+    if not snap:
+        return "No calls recorded yet.\n"
+    out = [f"{'operation':<32}{'calls':>7}{'total ms':>11}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+           f"{'max ms':>9}{'read KB':>10}{'written KB':>12}"]
+    for name, m in sorted(snap.items(), key=lambda kv: -kv[1]["total_s"]):
+        out.append(f"{name:<32}{m['calls']:>7}{m['total_s'] * 1000:>11.1f}{m['p50_s'] * 1000:>9.2f}"
+                   f"{m['p95_s'] * 1000:>9.2f}{m['p99_s'] * 1000:>9.2f}{m['max_s'] * 1000:>9.2f}"
+                   f"{m['bytes_read'] / 1024:>10.1f}{m['bytes_written'] / 1024:>12.1f}")
+    return "\n".join(out) + "\n"
+
+
+if ENABLED and EXPORT_FILE:
+    atexit.register(export, EXPORT_FILE)
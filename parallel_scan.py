@@ -0,0 +1,129 @@
+import argparse
+import os
+import sys
+import time
+
+import analytics
+
+# =========================
+# Parallel ledger scan (economics.txt)
+# =========================
+# Full recomputation of the ledger sums (first boot, a rebuilt checkpoint,
+# ad-hoc reports) split over worker processes: the file is cut into
+# newline-aligned byte ranges, each worker aggregates its ranges with the same
+# add() as the incremental code, and the partial sums are merged in file order
+# (so keys keep their first-appearance order). Cuts never fall inside an order,
+# which keeps per-order counts (see rollups.py) right.
+#
+# python parallel_scan.py [economics.txt] [--workers N]   prints the admin report
+#
+# Sums are added per range and then merged, so the last bits of a total can
+# differ from a single line-by-line pass.
+
+WORKERS = int(os.environ.get("ECOM_SCAN_WORKERS", "0")) or os.cpu_count() or 1
+MIN_PARALLEL_BYTES = 64 * 1024 * 1024  # smaller ledgers are scanned in-process
+CHUNK_BYTES = 32 * 1024 * 1024  # upper bound on one worker task's read
+
+
+def split_ranges(path, start, end, parts):
+    # up to `parts` (start, end) byte ranges covering [start, end), cut at order boundaries
+    cuts = [start]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            pos = max(cuts[-1], start + (end - start) * i // parts)
+            if pos >= end:
+                break
+            f.seek(pos - 1)
+            f.readline()  # to the start of the next line
+            line = f.readline()
+            order_id = line.split(b",", 1)[0]
+            pos = f.tell() - len(line)
+            # move past the rest of that order
+            while line and pos < end and line.split(b",", 1)[0] == order_id:
+                pos = f.tell()
+                line = f.readline()
+            pos = min(pos, end)
+            if pos > cuts[-1]:
+                cuts.append(pos)
+    if cuts[-1] < end:
+        cuts.append(end)
+    return list(zip(cuts, cuts[1:]))
+
+
+def scan_range(cls, path, start, end):
+    # cls.FIELDS of a fresh cls aggregate over one byte range (runs in a worker)
+    part = cls.__new__(cls)
+    part.clear()
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    for line in data.decode("utf-8").splitlines():
+        line = line.strip()
+        if line:
+            part.add(line.split(","))
+    return {name: getattr(part, name) for name in cls.FIELDS}
+
+
+def merge(dst, src):
+    # add src's sums into dst: numbers add, lists add element-wise, dicts recurse
+    for k, v in src.items():
+        have = dst.get(k)
+        if have is None:
+            dst[k] = v
+        elif isinstance(v, dict):
+            merge(have, v)
+        elif isinstance(v, list):
+            for i, x in enumerate(v):
+                have[i] += x
+        else:
+            dst[k] = have + v
+    return dst
+
+
+def scan(path, cls=None, end=None, workers=None):
+    # ({field: merged value}, end offset) of a cls aggregate (default LedgerAggregates)
+    # over the rows between the header and `end` (default: the last complete line)
+    cls = cls or analytics.LedgerAggregates
+    workers = workers or WORKERS
+    with open(path, "rb") as f:
+        f.readline()
+        start = f.tell()
+        if end is None:
+            end = f.seek(0, os.SEEK_END)
+        # a half-written last row waits for the next refresh
+        f.seek(max(start, end - 65536))
+        tail = f.read(end - f.tell())
+        end = end - len(tail) + tail.rfind(b"\n") + 1 if b"\n" in tail else start
+    end = max(start, end)
+
+    if workers <= 1 or end - start < MIN_PARALLEL_BYTES:
+        return scan_range(cls, path, start, end), end
+
+    from concurrent.futures import ProcessPoolExecutor  # only big ledgers pay for multiprocessing
+
+    parts = max(workers, -(-(end - start) // CHUNK_BYTES))
+    ranges = split_ranges(path, start, end, parts)
+    state = {name: {} for name in cls.FIELDS}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(scan_range, cls, path, a, b) for a, b in ranges]
+        for fut in futures:  # in file order
+            part = fut.result()
+            for name in cls.FIELDS:
+                merge(state[name], part[name])
+    return state, end
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Recompute the admin report with a parallel ledger scan.")
+    ap.add_argument("path", nargs="?", default="economics.txt")
+    ap.add_argument("--workers", type=int, default=None)
+    args = ap.parse_args()
+
+    t = time.perf_counter()
+    state, end = scan(args.path, workers=args.workers)
+    print(analytics.admin_report(analytics.rank(state["seller_rev"]), analytics.rank(state["product_rev"])), end="")
+    print(f"scanned {end} bytes in {time.perf_counter() - t:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+import argparse
+import json
+import os
+import re
+import threading
+
+from analytics import LedgerAggregates
+from filecache import file_signature
+from ledger import append_bytes
+from locks import FileLock
+from rollups import LedgerRollups
+
+# =========================
+# Month-partitioned ledger (economics/YYYY-MM.txt)
+# =========================
+# Orders go to the file of their month, each with the economics.txt header.
+# economics/manifest.json records per partition: rows, bytes, order_id range
+# and first/last date_time. Queries pick partitions from the manifest (a date
+# range opens only the months it overlaps, an order_id lookup only the files
+# whose id range holds it). Revenue sums and rollups are checkpointed per
+# partition, so closed months are never parsed again.
+#
+# The manifest is rewritten after every append without fsync: a partition whose
+# size does not match it (crash in between, or a file the manifest never saw)
+# is rescanned at startup, or before the next append to it.
+#
+# python partitions.py split [--data-dir .]   economics.txt -> economics/
+# python partitions.py join [--data-dir .]    economics/ -> economics.txt
+
+MONTH_RE = re.compile(r"\d{4}-\d{2}$")
+UNDATED = "undated"  # rows whose date_time does not start with YYYY-MM
+
+
+def partition_of(date_time):
+    key = date_time[:7]
+    return key if MONTH_RE.match(key) else UNDATED
+
+
+def _track(info, c):
+    try:
+        oid = int(c[0])
+        info["min_id"] = oid if info["min_id"] is None else min(info["min_id"], oid)
+        info["max_id"] = oid if info["max_id"] is None else max(info["max_id"], oid)
+    except ValueError:
+        pass
+    dt = c[1] if len(c) > 1 else ""
+    info["first"] = dt if info["first"] is None else min(info["first"], dt)
+    info["last"] = dt if info["last"] is None else max(info["last"], dt)
+    info["rows"] += 1
+
+
+def _empty():
+    return {"rows": 0, "bytes": 0, "min_id": None, "max_id": None, "first": None, "last": None}
+
+
+class PartitionedLedger:
+    def __init__(self, root, header, fsync=False):
+        self.root = root
+        self.header = header
+        self.fsync = fsync
+        self.manifest_path = os.path.join(root, "manifest.json")
+        self.lock = FileLock(os.path.join(root, "manifest.lock"))
+        self.mutex = threading.RLock()
+        self.parts = {}  # name -> manifest entry
+        self._sig = None
+        self._stats = {}  # name -> (LedgerAggregates, LedgerRollups)
+        os.makedirs(root, exist_ok=True)
+        self.repair()
+
+    def path(self, name):
+        return os.path.join(self.root, name + ".txt")
+
+    # ---- manifest ----
+    def refresh(self):
+        # pick up manifest changes made by other processes
+        with self.mutex, self.lock:
+            self._load()
+        return self
+
+    def repair(self):
+        # make the manifest match the partition files on disk
+        with self.mutex, self.lock:
+            self._load()
+            changed = False
+            on_disk = {f[:-4] for f in os.listdir(self.root)
+                       if f.endswith(".txt") and (MONTH_RE.match(f[:-4]) or f[:-4] == UNDATED)}
+            for name in sorted(on_disk | set(self.parts)):
+                if self._check(name):
+                    changed = True
+            if changed:
+                self._save()
+        return self
+
+    def _check(self, name):
+        # rescan one partition if its size is not what the manifest says; True if it changed
+        sig = file_signature(self.path(name))
+        info = self.parts.get(name)
+        if sig is None:
+            if info is None:
+                return False
+            del self.parts[name]
+            return True
+        if info is not None and info["bytes"] == sig[1]:
+            return False
+        self.parts[name] = self._scan(name)
+        return True
+
+    def _load(self):
+        sig = file_signature(self.manifest_path)
+        if sig == self._sig:
+            return
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                self.parts = json.load(f)["partitions"]
+        except (OSError, ValueError, KeyError, TypeError):
+            self.parts = {}
+        self._sig = sig
+
+    def _save(self):
+        tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"partitions": dict(sorted(self.parts.items()))}, f, indent=1)
+        os.replace(tmp, self.manifest_path)
+        self._sig = file_signature(self.manifest_path)
+
+    def _scan(self, name):
+        info = _empty()
+        with open(self.path(name), "rb") as f:
+            f.readline()
+            for line in f:
+                if line.endswith(b"\n") and line.strip():
+                    _track(info, line.decode("utf-8").strip().split(","))
+            info["bytes"] = f.tell()
+        return info
+
+    def names(self, start=None, stop=None):
+        # partitions overlapping [start, stop) (datetimes, None = open), oldest first
+        self.refresh()
+        lo = start.strftime("%Y-%m-%d %H:%M:%S") if start else None
+        hi = stop.strftime("%Y-%m-%d %H:%M:%S") if stop else None
+        out = []
+        for name, info in sorted(self.parts.items()):
+            if not info["rows"]:
+                continue
+            if (lo or hi) and name == UNDATED:
+                continue
+            if (hi is None or info["first"] < hi) and (lo is None or info["last"] >= lo):
+                out.append(name)
+        return out
+
+    # ---- writes ----
+    def append(self, rows):
+        # rows: economics.txt lines (one order, so normally one partition)
+        groups = {}
+        for line in rows:
+            groups.setdefault(partition_of(line.split(",", 2)[1]), []).append(line)
+        with self.mutex, self.lock:
+            self._load()
+            for name, lines in groups.items():
+                path = self.path(name)
+                self._check(name)
+                info = self.parts.get(name)
+                if info is None:
+                    info = self.parts[name] = _empty()
+                    if not os.path.exists(path):
+                        append_bytes(path, self.header.encode("utf-8"), self.fsync)
+                append_bytes(path, "".join(lines).encode("utf-8"), self.fsync)
+                for line in lines:
+                    _track(info, line.rstrip("\n").split(","))
+                info["bytes"] = os.path.getsize(path)
+            self._save()
+
+    # ---- reads ----
+    def _read(self, name):
+        with open(self.path(name), "r", encoding="utf-8") as f:
+            f.readline()
+            return [c for c in (line.strip().split(",") for line in f if line.strip())]
+
+    def iter_rows(self):
+        # all rows, oldest partition first, read line by line
+        for name in self.names():
+            with open(self.path(name), "r", encoding="utf-8") as f:
+                f.readline()
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        yield line.split(",")
+
+    def max_order_id(self):
+        self.refresh()
+        return max((info["max_id"] or 0 for info in self.parts.values()), default=0)
+
+    def customer_orders(self, customer_id):
+        return [c for name in self.names() for c in self._read(name) if len(c) > 2 and c[2] == customer_id]
+
+    def seller_orders(self, seller_id):
+        return [c for c in self.iter_rows() if len(c) > 4 and c[4] == seller_id]
+
+    def order_lines(self, order_id):
+        oid = int(order_id)
+        out = []
+        for name in self.names():
+            info = self.parts[name]
+            if info["min_id"] is not None and info["min_id"] <= oid <= info["max_id"]:
+                out += [c for c in self._read(name) if c[0] == str(oid)]
+        return out
+
+    # ---- analytics ----
+    def _stats_for(self, name):
+        st = self._stats.get(name)
+        if st is None:
+            st = self._stats[name] = (LedgerAggregates(self.path(name)), LedgerRollups(self.path(name)))
+        return st
+
+    def revenue(self):
+        seller_rev, product_rev = {}, {}
+        with self.mutex:
+            for name in self.names():
+                agg = self._stats_for(name)[0].refresh()
+                for k, v in agg.seller_rev.items():
+                    seller_rev[k] = seller_rev.get(k, 0.0) + v
+                for k, v in agg.product_rev.items():
+                    product_rev[k] = product_rev.get(k, 0.0) + v
+        return seller_rev, product_rev
+
+    def seller_revenue(self, seller_id):
+        total, prods = 0.0, {}
+        with self.mutex:
+            for name in self.names():
+                agg = self._stats_for(name)[0].refresh()
+                total += agg.seller_total.get(seller_id, 0.0)
+                for k, v in agg.seller_products.get(seller_id, {}).items():
+                    prods[k] = prods.get(k, 0.0) + v
+        return total, prods
+
+    def rollup(self, start, stop, seller_id=None):
+        overall, sellers, products = [0.0, 0, 0], {}, {}
+        with self.mutex:
+            for name in self.names(start, stop):
+                o, s, p = self._stats_for(name)[1].refresh().select(start, stop, seller_id)
+                for i in range(3):
+                    overall[i] += o[i]
+                _add_lists(sellers, s)
+                if seller_id is None:
+                    for sid, prods in p.items():
+                        _add_lists(products.setdefault(sid, {}), prods)
+                else:
+                    _add_lists(products, p)
+        return overall, sellers, products
+
+    def rollup_span(self):
+        first = last = None
+        with self.mutex:
+            for name in self.names():
+                a, b = self._stats_for(name)[1].refresh().span()
+                if a is not None:
+                    first = a if first is None else min(first, a)
+                    last = b if last is None else max(last, b)
+        return first, last
+
+
+def _add_lists(dst, src):
+    for k, v in src.items():
+        have = dst.get(k)
+        if have is None:
+            dst[k] = list(v)
+        else:
+            for i, x in enumerate(v):
+                have[i] += x
+
+
+# =========================
+# Migration
+# =========================
+def split_ledger(src, root, header):
+    # economics.txt -> root/YYYY-MM.txt + manifest; returns {partition: rows}
+    os.makedirs(root, exist_ok=True)
+    ledger = PartitionedLedger(root, header)
+    if any(info["rows"] for info in ledger.parts.values()):
+        raise ValueError(f"{root} already holds ledger partitions.")
+
+    files = {}
+    try:
+        with open(src, "r", encoding="utf-8") as f:
+            f.readline()
+            for line in f:
+                if not line.strip():
+                    continue
+                c = line.strip().split(",")
+                name = partition_of(c[1] if len(c) > 1 else "")
+                out = files.get(name)
+                if out is None:
+                    out = files[name] = open(ledger.path(name), "w", encoding="utf-8")
+                    out.write(header)
+                out.write(line if line.endswith("\n") else line + "\n")
+    finally:
+        for out in files.values():
+            out.close()
+    ledger.repair()
+    return {name: ledger.parts[name]["rows"] for name in sorted(files)}
+
+
+def join_ledger(root, dst, header):
+    # root/*.txt (oldest first) -> one economics.txt; returns rows written
+    ledger = PartitionedLedger(root, header)
+    rows = 0
+    tmp = dst + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as out:
+        out.write(header)
+        for name in ledger.names():
+            with open(ledger.path(name), "r", encoding="utf-8") as f:
+                f.readline()
+                for line in f:
+                    if line.strip():
+                        out.write(line if line.endswith("\n") else line + "\n")
+                        rows += 1
+    os.replace(tmp, dst)
+    return rows
+
+
+def main():
+    from storage import ECON_FILE, ECON_HEADER, ECON_PARTITION_DIR
+
+    ap = argparse.ArgumentParser(description="Split economics.txt into monthly partitions, or join them back.")
+    ap.add_argument("action", choices=("split", "join"))
+    ap.add_argument("--data-dir", default=".")
+    args = ap.parse_args()
+
+    src = os.path.join(args.data_dir, ECON_FILE)
+    root = os.path.join(args.data_dir, ECON_PARTITION_DIR)
+    if args.action == "split":
+        for name, rows in split_ledger(src, root, ECON_HEADER).items():
+            print(f"{name}: {rows} rows")
+    else:
+        print(f"{join_ledger(root, src, ECON_HEADER)} rows -> {src}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# =========================
+# Typed records (one parser and one serializer per file)
+# =========================
+# product.txt -> Product, economics.txt -> OrderLine, seller.txt -> Seller,
+# customer.txt -> Customer, admin.txt -> Admin; the shop cart holds CartItems.
+# parse() reads one file line, from_row() takes the split columns (file order),
+# to_row() / to_line() write them back. Numeric fields are parsed once, when
+# the line is read (a malformed number reads as 0), and written with the same
+# formatting the app has always used (two decimals for money).
+
+
+def _int(s):
+    try:
+        return int(s)
+    except ValueError:
+        return 0
+
+
+def _float(s):
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def _fit(c, n):
+    return c if len(c) >= n else c + [""] * (n - len(c))
+
+
+class Record:
+    __slots__ = ()
+    FIELDS = ()  # attribute per file column, in file order
+
+    @classmethod
+    def parse(cls, line):
+        return cls.from_row(line.strip().split(","))
+
+    def to_line(self):
+        return ",".join(self.to_row()) + "\n"
+
+    def __eq__(self, other):
+        return type(other) is type(self) and self.to_row() == other.to_row()
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(self.to_row())})"
+
+
+class Product(Record):
+    __slots__ = FIELDS = ("product_id", "seller_id", "seller_name", "product_name", "description", "category",
+                          "brand", "price", "stock", "status", "rating", "created_at")
+
+    def __init__(self, product_id, seller_id, seller_name, product_name, description, category, brand,
+                 price, stock, status, rating, created_at):
+        self.product_id = product_id
+        self.seller_id = seller_id
+        self.seller_name = seller_name
+        self.product_name = product_name
+        self.description = description
+        self.category = category
+        self.brand = brand
+        self.price = price        # float
+        self.stock = stock        # int
+        self.status = status
+        self.rating = rating      # kept as written ("0", "4.5")
+        self.created_at = created_at
+
+    @classmethod
+    def from_row(cls, c):
+        c = _fit(c, 12)
+        return cls(c[0], c[1], c[2], c[3], c[4], c[5], c[6], _float(c[7]), _int(c[8]), c[9], c[10], c[11])
+
+    def to_row(self):
+        return [self.product_id, self.seller_id, self.seller_name, self.product_name, self.description,
+                self.category, self.brand, f"{self.price:.2f}", str(self.stock), self.status, self.rating,
+                self.created_at]
+
+    @property
+    def on_sale(self):
+        # shown in the shop: active and in stock
+        return self.status.lower() == "active" and self.stock > 0
+
+
+class OrderLine(Record):
+    __slots__ = FIELDS = ("order_id", "date_time", "customer_id", "customer_name", "seller_id", "seller_name",
+                          "product_id", "product_name", "unit_price", "quantity", "total_price")
+
+    def __init__(self, order_id, date_time, customer_id, customer_name, seller_id, seller_name,
+                 product_id, product_name, unit_price, quantity, total_price):
+        self.order_id = order_id        # int
+        self.date_time = date_time
+        self.customer_id = customer_id
+        self.customer_name = customer_name
+        self.seller_id = seller_id
+        self.seller_name = seller_name
+        self.product_id = product_id
+        self.product_name = product_name
+        self.unit_price = unit_price    # float
+        self.quantity = quantity        # int
+        self.total_price = total_price  # float
+
+    @classmethod
+    def from_row(cls, c):
+        c = _fit(c, 11)
+        return cls(_int(c[0]), c[1], c[2], c[3], c[4], c[5], c[6], c[7], _float(c[8]), _int(c[9]), _float(c[10]))
+
+    def to_row(self):
+        return [str(self.order_id), self.date_time, self.customer_id, self.customer_name, self.seller_id,
+                self.seller_name, self.product_id, self.product_name, f"{self.unit_price:.2f}",
+                str(self.quantity), f"{self.total_price:.2f}"]
+
+
+class Admin(Record):
+    __slots__ = FIELDS = ("no", "username", "password")
+
+    def __init__(self, no, username, password):
+        self.no = no  # int
+        self.username = username
+        self.password = password
+
+    @classmethod
+    def from_row(cls, c):
+        c = _fit(c, 3)
+        return cls(_int(c[0]), c[1], c[2])
+
+    def to_row(self):
+        return [str(self.no), self.username, self.password]
+
+    def user(self):
+        return {"username": self.username}
+
+
+class Customer(Record):
+    __slots__ = FIELDS = ("no", "name", "password", "id", "email", "address", "phone")
+
+    def __init__(self, no, name, password, id, email, address, phone):
+        self.no = no  # int
+        self.name = name
+        self.password = password
+        self.id = id
+        self.email = email
+        self.address = address
+        self.phone = phone
+
+    @classmethod
+    def from_row(cls, c):
+        c = _fit(c, 7)
+        return cls(_int(c[0]), *c[1:7])
+
+    def to_row(self):
+        return [str(self.no), self.name, self.password, self.id, self.email, self.address, self.phone]
+
+    def user(self):
+        # the logged-in user dict the screens and the API pass around
+        return {k: getattr(self, k) for k in self.FIELDS[1:]}
+
+
+class Seller(Customer):
+    __slots__ = ("cnic",)
+    FIELDS = Customer.FIELDS + ("cnic",)
+
+    def __init__(self, no, name, password, id, email, address, phone, cnic):
+        super().__init__(no, name, password, id, email, address, phone)
+        self.cnic = cnic
+
+    @classmethod
+    def from_row(cls, c):
+        c = _fit(c, 8)
+        return cls(_int(c[0]), *c[1:8])
+
+    def to_row(self):
+        return super().to_row() + [self.cnic]
+
+
+class CartItem:
+    __slots__ = ("product_id", "product_name", "unit_price", "quantity", "seller_id", "seller_name")
+
+    def __init__(self, product_id, product_name, unit_price, quantity, seller_id, seller_name):
+        self.product_id = product_id
+        self.product_name = product_name
+        self.unit_price = unit_price  # float
+        self.quantity = quantity      # int
+        self.seller_id = seller_id
+        self.seller_name = seller_name
+
+    @classmethod
+    def from_product(cls, p, quantity):
+        return cls(p.product_id, p.product_name, p.price, quantity, p.seller_id, p.seller_name)
+
+    @property
+    def total_price(self):
+        return self.unit_price * self.quantity
+
+    def copy(self):
+        return CartItem(self.product_id, self.product_name, self.unit_price, self.quantity,
+                        self.seller_id, self.seller_name)
+
+    def order_line(self, order_id, date_time, cust):
+        return OrderLine(order_id, date_time, cust["id"], cust["name"], self.seller_id, self.seller_name,
+                         self.product_id, self.product_name, self.unit_price, self.quantity,
+                         float(f"{self.total_price:.2f}"))
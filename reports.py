@@ -0,0 +1,240 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from array import array
+from datetime import timedelta
+
+from rollups import next_month, range_label
+
+# =========================
+# Report export (CSV / JSONL / text)
+# =========================
+# python reports.py [--format text|csv|jsonl] [--start 2026-01] [--end 2026-03]
+#                   [--seller S1001] [--k 10] [--out report.csv]
+#
+# Admin (or one seller's) analytics written straight to a file handle: rows
+# come from a generator over the rollups (rollups.py) and are written in
+# chunks of CHUNK_LINES, so no report is ever built up as one string.
+#
+# Every row is (section, rank, key, revenue, units, orders), in this order:
+#   total        the whole range (key: the range label)
+#   period       one per month (or day) of the range, oldest first
+#   top_seller   best K sellers       (admin report only)
+#   top_product  best K products
+#   seller       every seller, best first (admin report only)
+#   product      every product, best first
+# CSV and JSONL carry the rows as they are; the text report lays them out in
+# fixed-width columns under one heading per section.
+#
+# index_lines() maps a written report to line offsets, so the dashboard viewer
+# (widgets.PagedText) reads back only the lines on screen.
+
+CHUNK_LINES = 1000
+COLUMNS = ("section", "rank", "key", "revenue", "units", "orders")
+FORMATS = ("text", "csv", "jsonl")
+PERIOD_GRAINS = ("month", "day")
+
+
+def report_rows(storage, start=None, stop=None, seller_id=None, k=10, grain="month"):
+    overall, sellers, products = storage.rollup(start, stop, seller_id)
+    if seller_id is None:
+        products = {f"{key} | seller {sid}": v for sid, prods in products.items() for key, v in prods.items()}
+
+    yield ("total", "", range_label(start, stop), *overall)
+    for key, v in periods(storage, start, stop, seller_id, grain):
+        yield ("period", "", key, *v)
+
+    # best first, ties by key (the same order on every backend); the top K are
+    # the head of the full ranking
+    best_first = lambda kv: (-kv[1][0], kv[0])
+    sellers = sorted(sellers.items(), key=best_first) if seller_id is None else []
+    products = sorted(products.items(), key=best_first)
+    for section, items in (("top_seller", sellers[:k]), ("top_product", products[:k]),
+                           ("seller", sellers), ("product", products)):
+        for i, (key, v) in enumerate(items, 1):
+            yield (section, i, key, *v)
+
+
+def periods(storage, start, stop, seller_id=None, grain="month"):
+    # (bucket key, [revenue, units, orders]) per month / day of [start, stop)
+    if start is None or stop is None:
+        first, last = storage.rollup_span()
+        if first is None:
+            return
+        start = start or first
+        stop = stop or last
+    t = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    if grain == "month":
+        t = t.replace(day=1)
+    while t < stop:
+        nxt = next_month(t) if grain == "month" else t + timedelta(days=1)
+        overall = storage.rollup(max(t, start), min(nxt, stop), seller_id)[0]
+        yield t.strftime("%Y-%m" if grain == "month" else "%Y-%m-%d"), overall
+        t = nxt
+
+
+# =========================
+# Writers
+# =========================
+def write_report(out, rows, fmt="text", title="Marketplace report"):
+    # rows from report_rows(); returns the number of rows written
+    if fmt == "csv":
+        return write_csv(out, rows)
+    if fmt == "jsonl":
+        return write_jsonl(out, rows)
+    if fmt == "text":
+        return write_text(out, rows, title)
+    raise ValueError(f"Unknown report format: {fmt}")
+
+
+def _write_chunked(out, lines):
+    buf = []
+    for line in lines:
+        buf.append(line)
+        if len(buf) >= CHUNK_LINES:
+            out.write("".join(buf))
+            buf.clear()
+    out.write("".join(buf))
+
+
+def write_csv(out, rows):
+    n = 0
+    buf = io.StringIO()
+    w = csv.writer(buf, lineterminator="\n")
+    w.writerow(COLUMNS)
+    for section, rank, key, revenue, units, orders in rows:
+        w.writerow((section, rank, key, f"{revenue:.2f}", units, orders))
+        n += 1
+        if n % CHUNK_LINES == 0:
+            out.write(buf.getvalue())
+            buf.seek(0)
+            buf.truncate()
+    out.write(buf.getvalue())
+    return n
+
+
+def write_jsonl(out, rows):
+    n = 0
+
+    def lines():
+        nonlocal n
+        for section, rank, key, revenue, units, orders in rows:
+            n += 1
+            rec = {"section": section, "key": key, "revenue": round(revenue, 2), "units": units, "orders": orders}
+            if rank != "":
+                rec["rank"] = rank
+            yield json.dumps(rec) + "\n"
+    _write_chunked(out, lines())
+    return n
+
+
+SECTION_TITLES = {
+    "period": "By {grain}",
+    "top_seller": "Top Sellers",
+    "top_product": "Top Products",
+    "seller": "Revenue by Seller",
+    "product": "Revenue by Product",
+}
+TEXT_ROW = "{:>6}  {:<44}  {:>14}  {:>8}  {:>8}\n"
+
+
+def write_text(out, rows, title="Marketplace report"):
+    n = 0
+
+    def lines():
+        nonlocal n
+        section = None
+        for sec, rank, key, revenue, units, orders in rows:
+            n += 1
+            if sec == "total":
+                yield f"{title} — {key}\n"
+                yield f"Revenue: {revenue:.2f}   Units: {units}   Orders: {orders}\n"
+                continue
+            if sec != section:
+                section = sec
+                grain = "Day" if sec == "period" and len(key) == 10 else "Month"
+                yield f"\n{SECTION_TITLES[sec].format(grain=grain)}\n"
+                yield TEXT_ROW.format("rank", grain.lower() if sec == "period" else sec.split("_")[-1],
+                                      "revenue", "units", "orders")
+            yield TEXT_ROW.format(rank, key, f"{revenue:.2f}", units, orders)
+    _write_chunked(out, lines())
+    return n
+
+
+def export(storage, path, fmt=None, start=None, stop=None, seller_id=None, k=10, grain="month", title=None):
+    # write a report file; the format follows the extension unless given
+    fmt = fmt or format_for(path)
+    title = title or (f"Seller {seller_id} report" if seller_id else "Marketplace report")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        return write_report(f, report_rows(storage, start, stop, seller_id, k, grain), fmt, title)
+
+
+def format_for(path):
+    ext = path.lower().rsplit(".", 1)[-1]
+    return ext if ext in ("csv", "jsonl") else "text"
+
+
+# =========================
+# Reading back
+# =========================
+def index_lines(path, chunk=1 << 20):
+    # byte offset of every line start, plus the file size at the end
+    offsets = array("q", [0])
+    pos = 0
+    with open(path, "rb") as f:
+        while True:
+            data = f.read(chunk)
+            if not data:
+                break
+            i = data.find(b"\n")
+            while i != -1:
+                offsets.append(pos + i + 1)
+                i = data.find(b"\n", i + 1)
+            pos += len(data)
+    if offsets[-1] != pos:
+        offsets.append(pos)  # last line without a newline
+    return offsets
+
+
+def read_lines(path, offsets, first, count):
+    # lines [first, first + count) of a file indexed by index_lines()
+    first = max(0, min(first, len(offsets) - 1))
+    last = max(first, min(first + count, len(offsets) - 1))
+    with open(path, "rb") as f:
+        f.seek(offsets[first])
+        data = f.read(offsets[last] - offsets[first])
+    return data.decode("utf-8", errors="replace").splitlines()
+
+
+def main():
+    from marketplace import Marketplace
+
+    ap = argparse.ArgumentParser(description="Write the admin or a seller's analytics as text, CSV or JSONL.")
+    ap.add_argument("--format", choices=FORMATS, default=None, help="default: from --out, else text")
+    ap.add_argument("--start", default="", help="YYYY-MM-DD, YYYY-MM or YYYY (inclusive)")
+    ap.add_argument("--end", default="", help="same forms (inclusive)")
+    ap.add_argument("--seller", default=None, help="one seller's report")
+    ap.add_argument("--k", type=int, default=10)
+    ap.add_argument("--by", choices=PERIOD_GRAINS, default="month")
+    ap.add_argument("--out", default=None, help="file to write (default: stdout)")
+    ap.add_argument("--data-dir", default=".")
+    args = ap.parse_args()
+
+    market = Marketplace(args.data_dir)
+    try:
+        start, stop = market.date_range(args.start, args.end)
+    except ValueError as e:
+        ap.error(str(e))
+    if args.out:
+        n = export(market.storage, args.out, args.format, start, stop, args.seller, args.k, args.by)
+        print(f"{n} rows written to {args.out}", file=sys.stderr)
+    else:
+        title = f"Seller {args.seller} report" if args.seller else "Marketplace report"
+        write_report(sys.stdout, report_rows(market.storage, start, stop, args.seller, args.k, args.by),
+                     args.format or "text", title)
+
+
+if __name__ == "__main__":
+    main()
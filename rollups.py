@@ -0,0 +1,205 @@
+import os
+import threading
+from datetime import datetime, timedelta
+
+from analytics import LedgerAggregates, rank, write_admin_report
+
+# =========================
+# Time-bucketed revenue rollups
+# =========================
+# Revenue, units and order count per seller and per product, bucketed by hour,
+# day and month ("YYYY-MM-DD HH", "YYYY-MM-DD", "YYYY-MM": prefixes of the
+# ledger's date_time). A date range is answered by walking the fewest buckets
+# that tile it (whole months, then whole days, then hours at the edges), so the
+# cost depends on the length of the range, not on the number of orders.
+#
+# buckets[grain][bucket] = {
+#     "all": [revenue, units, orders],
+#     "sellers": {"seller_id | seller_name": [revenue, units, orders]},
+#     "products": {seller_id: {"product_id | product_name": [revenue, units, orders]}},
+# }
+
+GRAINS = ("hour", "day", "month")
+KEY_LEN = {"hour": 13, "day": 10, "month": 7}
+BOUND_FORMATS = (("%Y-%m-%d %H", "hour"), ("%Y-%m-%d", "day"), ("%Y-%m", "month"), ("%Y", "year"))
+
+
+def next_month(t):
+    return t.replace(year=t.year + t.month // 12, month=t.month % 12 + 1)
+
+
+def parse_bound(s, end=False):
+    # "YYYY[-MM[-DD[ HH]]]" -> datetime, or None when blank.
+    # An end bound is exclusive and covers its whole unit ("2024-05" -> 2024-06-01 00:00).
+    s = (s or "").strip()
+    if not s:
+        return None
+    for fmt, unit in BOUND_FORMATS:
+        try:
+            t = datetime.strptime(s, fmt)
+        except ValueError:
+            continue
+        if not end:
+            return t
+        if unit == "hour":
+            return t + timedelta(hours=1)
+        if unit == "day":
+            return t + timedelta(days=1)
+        if unit == "month":
+            return next_month(t)
+        return t.replace(year=t.year + 1)
+    raise ValueError("Dates must look like YYYY-MM-DD (or YYYY-MM, or YYYY-MM-DD HH).")
+
+
+def cover(start, stop):
+    # (grain, bucket) pairs tiling [start, stop), oldest first; both hour-aligned
+    t = start
+    while t < stop:
+        if t.day == 1 and t.hour == 0 and next_month(t) <= stop:
+            yield "month", t.strftime("%Y-%m")
+            t = next_month(t)
+        elif t.hour == 0 and t + timedelta(days=1) <= stop:
+            yield "day", t.strftime("%Y-%m-%d")
+            t += timedelta(days=1)
+        else:
+            yield "hour", t.strftime("%Y-%m-%d %H")
+            t += timedelta(hours=1)
+
+
+def _bump(d, key, revenue, units, orders):
+    v = d.get(key)
+    if v is None:
+        d[key] = [revenue, units, orders]
+    else:
+        v[0] += revenue
+        v[1] += units
+        v[2] += orders
+
+
+class Rollups:
+    FIELDS = ("buckets",)
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.buckets = {g: {} for g in GRAINS}
+        self._order = None  # current order_id and the sellers already counted for it
+        self._order_sellers = set()
+
+    def add(self, c):
+        total = float(c[10]) if c[10] else 0.0
+        units = int(c[9]) if c[9] else 0
+        seller_key = f"{c[4]} | {c[5]}"
+        prod_key = f"{c[6]} | {c[7]}"
+
+        # the rows of one order are written together, so order counts go up on
+        # the first row of each order (per seller: its first row in the order)
+        new_order = 0
+        if c[0] != self._order:
+            self._order = c[0]
+            self._order_sellers = set()
+            new_order = 1
+        new_seller_order = 0 if seller_key in self._order_sellers else 1
+        self._order_sellers.add(seller_key)
+
+        for g in GRAINS:
+            b = self.buckets[g].get(c[1][:KEY_LEN[g]])
+            if b is None:
+                b = self.buckets[g][c[1][:KEY_LEN[g]]] = {"all": [0.0, 0, 0], "sellers": {}, "products": {}}
+            _bump(b, "all", total, units, new_order)
+            _bump(b["sellers"], seller_key, total, units, new_seller_order)
+            _bump(b["products"].setdefault(c[4], {}), prod_key, total, units, 1)
+
+    def span(self):
+        # [first month start, end of last month) holding any data, or (None, None)
+        months = [k for k in self.buckets["month"] if len(k) == 7]
+        if not months:
+            return None, None
+        try:
+            return datetime.strptime(min(months), "%Y-%m"), next_month(datetime.strptime(max(months), "%Y-%m"))
+        except ValueError:
+            return None, None
+
+    def select(self, start, stop, seller_id=None):
+        # ([revenue, units, orders], sellers, products) summed over [start, stop);
+        # None means open-ended. products is {seller_id: {...}}, or only that
+        # seller's dict when seller_id is given (and the totals are that seller's).
+        first, last = self.span()
+        start = start or first
+        stop = stop or last
+        overall = {}
+        sellers = {}
+        products = {}
+        if start is not None and stop is not None:
+            for g, key in cover(start, stop):
+                b = self.buckets[g].get(key)
+                if b is not None:
+                    self._merge(b, seller_id, overall, sellers, products)
+        if seller_id is not None:
+            overall = {"all": [sum(v[i] for v in sellers.values()) for i in range(3)]} if sellers else {}
+        return overall.get("all", [0.0, 0, 0]), sellers, products
+
+    def _merge(self, b, seller_id, overall, sellers, products):
+        if seller_id is None:
+            _bump(overall, "all", *b["all"])
+            for k, v in b["sellers"].items():
+                _bump(sellers, k, *v)
+            for sid, prods in b["products"].items():
+                out = products.setdefault(sid, {})
+                for k, v in prods.items():
+                    _bump(out, k, *v)
+        else:
+            for k, v in b["sellers"].items():
+                if k.split(" | ", 1)[0] == seller_id:
+                    _bump(sellers, k, *v)
+            for k, v in b["products"].get(seller_id, {}).items():
+                _bump(products, k, *v)
+
+
+class LedgerRollups(Rollups, LedgerAggregates):
+    # rollups over economics.txt, checkpointed like LedgerAggregates
+    def __init__(self, path, state_path=None):
+        LedgerAggregates.__init__(self, path, state_path or os.path.splitext(path)[0] + ".rollup.json")
+
+
+class BinaryRollups(Rollups):
+    # rollups over a BinaryLedger, folded in by record count (kept in memory)
+    def __init__(self, ledger):
+        super().__init__()
+        self.ledger = ledger
+        self.done = 0
+        self.lock = threading.RLock()
+
+    def refresh(self):
+        with self.lock:
+            n = len(self.ledger)
+            if n < self.done:
+                self.clear()
+                self.done = 0
+            for c in self.ledger.rows(self.done, n):
+                self.add(c)
+            self.done = n
+        return self
+
+
+# =========================
+# Range reports
+# =========================
+def range_label(start, stop):
+    if start is None and stop is None:
+        return "all time"
+    a = start.strftime("%Y-%m-%d %H:00") if start else "start"
+    b = stop.strftime("%Y-%m-%d %H:00") if stop else "now"
+    return f"{a} to {b}"
+
+
+def write_range_report(out, start, stop, overall, sellers, products):
+    # admin text for one range, written to a text stream: totals, then the usual revenue rankings
+    revenue, units, orders = overall
+    seller_rev = {k: v[0] for k, v in sellers.items()}
+    product_rev = {f"{k} | seller {sid}": v[0] for sid, prods in products.items() for k, v in prods.items()}
+
+    out.write(f"Range: {range_label(start, stop)}\n")
+    out.write(f"Revenue: {revenue:.2f}   Units: {units}   Orders: {orders}\n\n")
+    write_admin_report(out, rank(seller_rev), rank(product_rev))
@@ -0,0 +1,122 @@
+# =========================
+# Product search index
+# =========================
+# Searched fields of a Product: product_name, description, category, brand.
+# Each query word must appear (as a substring) in one of them. A query word has
+# no whitespace, so it can only sit inside one whitespace-free word of a field:
+#   words: word -> set(doc)     every distinct word of the searched fields
+#   grams: trigram -> set(word) narrows a query word to the few words holding it
+# A query word matches the docs of the words containing it (words are few next
+# to docs, so they are confirmed with a plain substring test), and results are
+# exactly what a full scan would return.
+#
+# Docs are numbered by the caller (CatalogStore uses positions in product.txt),
+# so search() hands back matches already in file order.
+
+SEP = "\n"  # joins the searched columns; whitespace, so never part of a query word
+
+
+def haystack(p):
+    return SEP.join((p.product_name, p.description, p.category, p.brand)).lower()
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class SearchIndex:
+    def __init__(self):
+        self.docs = []  # doc -> haystack (None: no document)
+        self.words = {}
+        self.grams = {}
+
+    def sync(self, rows):
+        # make docs 0..len(rows)-1 the given rows; unchanged text is not re-indexed
+        # (e.g. a reload after checkout only changed the stock column)
+        for i, row in enumerate(rows):
+            self.put(i, row)
+        for i in range(len(rows), len(self.docs)):
+            self.remove(i)
+        del self.docs[len(rows):]
+
+    def put(self, i, row):
+        hay = haystack(row)
+        docs = self.docs
+        if i < len(docs):
+            if docs[i] == hay:
+                return
+            self.remove(i)
+        else:
+            docs.extend([None] * (i + 1 - len(docs)))
+        docs[i] = hay
+        for w in set(hay.split()):
+            s = self.words.get(w)
+            if s is None:
+                s = self.words[w] = set()
+                for g in trigrams(w):
+                    self.grams.setdefault(g, set()).add(w)
+            s.add(i)
+
+    def remove(self, i):
+        if i >= len(self.docs) or self.docs[i] is None:
+            return
+        hay, self.docs[i] = self.docs[i], None
+        for w in set(hay.split()):
+            s = self.words.get(w)
+            if s is None:
+                continue
+            s.discard(i)
+            if s:
+                continue
+            del self.words[w]
+            for g in trigrams(w):
+                gs = self.grams.get(g)
+                if gs is not None:
+                    gs.discard(w)
+                    if not gs:
+                        del self.grams[g]
+
+    def search(self, q):
+        # sorted list of matching docs
+        terms = set(q.lower().split())
+        if not terms:
+            return [i for i, hay in enumerate(self.docs) if hay is not None]
+
+        found = []
+        for t in terms:
+            words = self._words(t)
+            if not words:
+                return []
+            if len(words) == 1:
+                found.append(self.words[words[0]])
+            else:
+                found.append(set().union(*(self.words[w] for w in words)))
+
+        # intersect the smallest sets first
+        found.sort(key=len)
+        out = found[0]
+        for s in found[1:]:
+            out = out & s
+            if not out:
+                return []
+        return sorted(out)
+
+    def _words(self, t):
+        # indexed words containing t
+        if len(t) < 3:
+            return [w for w in self.words if t in w]
+        postings = []
+        for g in trigrams(t):
+            s = self.grams.get(g)
+            if s is None:
+                return []
+            postings.append(s)
+        postings.sort(key=len)
+        cand = postings[0]
+        for s in postings[1:]:
+            cand = cand & s
+            if not cand:
+                return []
+        if len(t) == 3:
+            return list(cand)  # a single trigram is an exact match
+        return [w for w in cand if t in w]
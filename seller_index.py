@@ -0,0 +1,134 @@
+import os
+
+from analytics import LedgerAggregates
+from locks import replace_file
+
+# =========================
+# Per-seller ledger index (economics.txt)
+# =========================
+# seller_id -> byte offsets of that seller's economics.txt lines, in file order.
+# Only rows appended since the last refresh are read (a rewritten ledger is
+# indexed again), and a seller's orders are then read with one seek + readline
+# per line instead of a pass over the whole ledger. The product side lives in
+# CatalogStore.by_seller.
+#
+# The index is kept in an append-only log next to the ledger (economics.sellers.log):
+#   seller_id,offset offset ...   offsets of that seller's rows in a batch
+#   #,ledger_offset,tail          after each batch: the ledger bytes covered so far
+# A refresh appends its new rows and one marker, so saving costs as much as the
+# new rows; once the log has COMPACT_LINES more lines than there are sellers it
+# is rewritten with one line per seller. Lines after the last marker (an
+# interrupted write) are ignored and cut off by the next append. Processes
+# sharing the ledger first read what the others appended (under the file lock),
+# and a rebuilt index replaces the log.
+
+COMPACT_LINES = 10000  # rewrite the log once it has this many lines more than sellers
+
+
+def _lines(offsets):
+    return "".join(f"{sid},{' '.join(map(str, offs))}\n" for sid, offs in offsets.items())
+
+
+class SellerLedgerIndex(LedgerAggregates):
+    FIELDS = ("offsets",)
+    PARALLEL = False  # offsets need one pass in file order (it is a cheap pass)
+
+    def __init__(self, path, state_path=None):
+        super().__init__(path, state_path or os.path.splitext(path)[0] + ".sellers.log")
+
+    def clear(self):
+        self.offsets = {}    # seller_id -> [byte offset of each of its lines]
+        self.new = []        # (seller_id, offset) indexed since the last save
+        self.rewrite = True  # the log does not hold self.offsets: write it whole
+        self.log_pos = 0     # log bytes applied (up to the last marker)
+        self.log_ino = None
+        self.log_lines = 0
+
+    def load(self):
+        self.reset()
+        self._read_log()
+
+    def _read_log(self):
+        # apply the log lines appended since log_pos; start over if the log was replaced
+        try:
+            with open(self.state_path, "rb") as f:
+                st = os.fstat(f.fileno())
+                if self.log_ino is not None and (st.st_ino != self.log_ino or st.st_size < self.log_pos):
+                    self.reset()
+                f.seek(self.log_pos)
+                data = f.read()
+        except OSError:
+            return
+        batch, pos, applied = [], 0, 0
+        lines = data.split(b"\n")
+        lines.pop()  # after the last newline: empty, or an interrupted write
+        try:
+            for line in lines:
+                pos += len(line) + 1
+                sid, _, rest = line.partition(b",")
+                if sid == b"#":
+                    offset, tail = rest.split(b",")
+                    for sid, offs in batch:
+                        self.offsets.setdefault(sid, []).extend(offs)
+                    batch = []
+                    self.offset = self.saved_offset = int(offset)
+                    self.tail = tail.decode("ascii")
+                    applied = pos
+                else:
+                    batch.append((sid.decode("utf-8"), [int(x) for x in rest.split()]))
+        except (ValueError, UnicodeDecodeError):
+            pass  # an interrupted write: the rest is cut off by the next save
+        if applied:
+            self.log_pos += applied
+            self.log_ino = st.st_ino
+            self.log_lines += data.count(b"\n", 0, applied)
+            self.rewrite = self.log_lines > len(self.offsets) + COMPACT_LINES
+
+    def save(self):
+        if self.rewrite or not os.path.exists(self.state_path):
+            replace_file(self.state_path, _lines(self.offsets) + f"#,{self.offset},{self.tail}\n")
+            self.log_lines = len(self.offsets) + 1
+        else:
+            new = {}
+            for sid, off in self.new:
+                new.setdefault(sid, []).append(off)
+            with open(self.state_path, "r+b") as f:
+                f.truncate(self.log_pos)
+                f.seek(self.log_pos)
+                f.write((_lines(new) + f"#,{self.offset},{self.tail}\n").encode("utf-8"))
+            self.log_lines += len(new) + 1
+        st = os.stat(self.state_path)
+        self.log_ino, self.log_pos = st.st_ino, st.st_size
+        self.new = []
+        self.rewrite = self.log_lines > len(self.offsets) + COMPACT_LINES
+        self.saved_offset = self.offset
+
+    def checkpoint(self):
+        self.save()  # an append of the new rows: cheap enough for every refresh
+
+    def refresh(self):
+        with self.lock, self.file_lock:
+            self._read_log()  # rows other processes indexed (and logged) first
+            return self._refresh()
+
+    def add_chunk(self, data, start):
+        pos = data.find(b"\n") + 1 if start == 0 else 0  # header
+        while pos < len(data):
+            nl = data.find(b"\n", pos)
+            c = data[pos:nl].split(b",", 5)
+            if len(c) > 4:
+                sid = c[4].decode("utf-8")
+                self.offsets.setdefault(sid, []).append(start + pos)
+                self.new.append((sid, start + pos))
+            pos = nl + 1
+
+    def rows(self, seller_id):
+        # economics.txt rows of one seller, oldest first
+        with self.lock:
+            offsets = list(self.refresh().offsets.get(seller_id, ()))
+        out = []
+        with open(self.path, "rb") as f:
+            for off in offsets:
+                f.seek(off)
+                out.append(f.readline().decode("utf-8").strip().split(","))
+        return out
@@ -0,0 +1,73 @@
+from locks import FileLock, replace_file
+
+# =========================
+# Persistent id sequences (sequences.txt)
+# =========================
+# name,value  -> value is the last id handed out. Every allocation is a tiny
+# read-modify-write under a cross-process lock, so two app instances never get
+# the same id. A missing sequence is rebuilt from its seed function (usually the
+# max id found in the data file).
+
+SEQ_HEADER = "name,value\n"
+
+
+def max_id_in(path):
+    # largest integer in the first column of a CSV .txt file
+    mx = 0
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                mx = max(mx, int(line.split(",", 1)[0]))
+            except:
+                pass
+    return mx
+
+
+class SequenceStore:
+    def __init__(self, path, seeds):
+        self.path = path
+        self.seeds = seeds  # name -> callable returning the current max id
+        self.lock = FileLock(path + ".lock")
+
+    def _read(self):
+        values = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return values
+        for line in lines[1:]:
+            if not line.strip():
+                continue
+            c = line.strip().split(",")
+            try:
+                values[c[0]] = int(c[1])
+            except:
+                pass
+        return values
+
+    def _write(self, values):
+        text = SEQ_HEADER + "".join(f"{k},{v}\n" for k, v in values.items())
+        replace_file(self.path, text)
+
+    def reserve(self, name, n=1, floor=0):
+        # block of n fresh ids, as a range; floor = highest id known to be used
+        with self.lock:
+            values = self._read()
+            if name not in values:
+                values[name] = self.seeds[name]()
+            first = max(values[name], floor) + 1
+            values[name] = first + n - 1
+            self._write(values)
+        return range(first, first + n)
+
+    def next(self, name, floor=0):
+        return self.reserve(name, 1, floor)[0]
+
+    def rebuild(self):
+        # re-seed every sequence from the data files
+        with self.lock:
+            self._write({name: seed() for name, seed in self.seeds.items()})
@@ -0,0 +1,465 @@
+import argparse
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from rollups import GRAINS, KEY_LEN, cover, next_month
+from records import Product
+from storage import (Storage, ACCOUNT_RECORDS, UNIQUE_COLS, now_str, order_rows, DB_FILE,
+                     SELLER_FILE, CUSTOMER_FILE, ADMIN_FILE, PRODUCT_FILE, ECON_FILE,
+                     SELLER_HEADER, CUSTOMER_HEADER, ADMIN_HEADER, PRODUCT_HEADER, ECON_HEADER)
+
+# =========================
+# SQLite storage backend (marketplace.db)
+# =========================
+# Same tables and columns as the .txt files, plus:
+#   - indexes on ids, names, seller_id, date_time
+#   - product_fts: FTS5 trigram index for substring search (LIKE-style scan if
+#     this SQLite has no FTS5)
+#   - seller_revenue / product_revenue: running sums updated inside checkout
+#   - rollup_all / seller_rollup / product_rollup: the same per hour/day/month
+#     bucket (see rollups.py), also updated inside checkout
+# WAL mode lets readers run while a checkout commits. Each thread gets its own
+# connection.
+#
+# python sqlite_storage.py import [--data-dir .]   .txt files -> marketplace.db
+# python sqlite_storage.py export [--data-dir .]   marketplace.db -> .txt files
+
+TABLES = {
+    "admin": ("admins", ADMIN_FILE, ADMIN_HEADER),
+    "seller": ("sellers", SELLER_FILE, SELLER_HEADER),
+    "customer": ("customers", CUSTOMER_FILE, CUSTOMER_HEADER),
+    "product": ("products", PRODUCT_FILE, PRODUCT_HEADER),
+    "order": ("orders", ECON_FILE, ECON_HEADER),
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS admins (no TEXT, username TEXT, password TEXT);
+CREATE INDEX IF NOT EXISTS admins_username ON admins(username);
+
+CREATE TABLE IF NOT EXISTS sellers (no TEXT, name TEXT, password TEXT, id TEXT, email TEXT,
+                                    address TEXT, phone TEXT, cnic TEXT);
+CREATE INDEX IF NOT EXISTS sellers_name ON sellers(name);
+CREATE INDEX IF NOT EXISTS sellers_id ON sellers(id);
+CREATE INDEX IF NOT EXISTS sellers_email ON sellers(email);
+CREATE INDEX IF NOT EXISTS sellers_phone ON sellers(phone);
+CREATE INDEX IF NOT EXISTS sellers_cnic ON sellers(cnic);
+
+CREATE TABLE IF NOT EXISTS customers (no TEXT, name TEXT, password TEXT, id TEXT, email TEXT,
+                                      address TEXT, phone TEXT);
+CREATE INDEX IF NOT EXISTS customers_name ON customers(name);
+CREATE INDEX IF NOT EXISTS customers_id ON customers(id);
+CREATE INDEX IF NOT EXISTS customers_email ON customers(email);
+CREATE INDEX IF NOT EXISTS customers_phone ON customers(phone);
+
+CREATE TABLE IF NOT EXISTS products (product_id INTEGER PRIMARY KEY, seller_id TEXT, seller_name TEXT,
+                                     product_name TEXT, description TEXT, category TEXT, brand TEXT,
+                                     price TEXT, stock INTEGER, status TEXT, rating TEXT, created_at TEXT);
+CREATE INDEX IF NOT EXISTS products_seller ON products(seller_id);
+CREATE INDEX IF NOT EXISTS products_name ON products(product_name);
+
+CREATE TABLE IF NOT EXISTS orders (order_id INTEGER, date_time TEXT, customer_id TEXT, customer_name TEXT,
+                                   seller_id TEXT, seller_name TEXT, product_id TEXT, product_name TEXT,
+                                   unit_price TEXT, quantity INTEGER, total_price TEXT);
+CREATE INDEX IF NOT EXISTS orders_order_id ON orders(order_id);
+CREATE INDEX IF NOT EXISTS orders_seller ON orders(seller_id);
+CREATE INDEX IF NOT EXISTS orders_customer ON orders(customer_id);
+CREATE INDEX IF NOT EXISTS orders_date_time ON orders(date_time);
+
+CREATE TABLE IF NOT EXISTS seller_revenue (seller_id TEXT, seller_name TEXT, revenue REAL, first_row INTEGER,
+                                           PRIMARY KEY (seller_id, seller_name));
+CREATE TABLE IF NOT EXISTS product_revenue (product_id TEXT, product_name TEXT, seller_id TEXT, revenue REAL,
+                                            first_row INTEGER, PRIMARY KEY (product_id, product_name, seller_id));
+CREATE INDEX IF NOT EXISTS product_revenue_seller ON product_revenue(seller_id);
+
+CREATE TABLE IF NOT EXISTS rollup_all (grain TEXT, bucket TEXT, revenue REAL, units INTEGER, orders INTEGER,
+                                       PRIMARY KEY (grain, bucket));
+CREATE TABLE IF NOT EXISTS seller_rollup (grain TEXT, bucket TEXT, seller_id TEXT, seller_name TEXT, revenue REAL,
+                                          units INTEGER, orders INTEGER, first_row INTEGER,
+                                          PRIMARY KEY (grain, bucket, seller_id, seller_name));
+CREATE TABLE IF NOT EXISTS product_rollup (grain TEXT, bucket TEXT, seller_id TEXT, product_id TEXT,
+                                           product_name TEXT, revenue REAL, units INTEGER, orders INTEGER,
+                                           first_row INTEGER,
+                                           PRIMARY KEY (grain, bucket, seller_id, product_id, product_name));
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS product_fts USING fts5(product_name, description, category, brand,
+                                                          tokenize='trigram');
+"""
+
+TOTAL = "CASE WHEN total_price = '' THEN 0.0 ELSE CAST(total_price AS REAL) END"
+HAYSTACK = "lower(product_name || char(0) || description || char(0) || category || char(0) || brand)"
+
+
+def _cols(header):
+    return header.strip().split(",")
+
+
+def _insert_sql(table, header, verb="INSERT"):
+    cols = _cols(header)
+    return f"{verb} INTO {table} ({','.join(cols)}) VALUES ({','.join('?' * len(cols))})"
+
+
+class SqliteStorage(Storage):
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self.local = threading.local()
+        db = self.db()
+        db.executescript(SCHEMA)
+        try:
+            db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:  # built without FTS5
+            self.fts = False
+        with self.tx() as db:
+            if db.execute("SELECT 1 FROM admins LIMIT 1").fetchone() is None:
+                db.execute("INSERT INTO admins VALUES ('1', 'admin', 'admin123')")
+            # databases from before the rollup tables existed
+            if (db.execute("SELECT 1 FROM rollup_all LIMIT 1").fetchone() is None
+                    and db.execute("SELECT 1 FROM orders LIMIT 1").fetchone() is not None):
+                self._rebuild_rollups(db)
+
+    def db(self):
+        conn = getattr(self.local, "conn", None)
+        if conn is None:
+            # autocommit; writes use explicit BEGIN IMMEDIATE in tx()
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self.local.conn = conn
+        return conn
+
+    def tx(self):
+        return _Transaction(self.db())
+
+    def _rows(self, cur):
+        return [["" if v is None else str(v) for v in row] for row in cur]
+
+    def _records(self, record, cur):
+        return [record.from_row(c) for c in self._rows(cur)]
+
+    # ---- accounts ----
+    def login(self, role, name, password):
+        table = TABLES[role][0]
+        rows = self._records(ACCOUNT_RECORDS[role], self.db().execute(
+            f"SELECT * FROM {table} WHERE {'username' if role == 'admin' else 'name'} = ? AND password = ? "
+            f"ORDER BY rowid LIMIT 1", (name, password)))
+        return rows[0] if rows else None
+
+    def add_account(self, role, values):
+        table, _, header = TABLES[role]
+        cols = _cols(header)
+        with self.tx() as db:
+            # the clash a top-to-bottom scan would hit first
+            best = None
+            for order, col in enumerate(UNIQUE_COLS[role]):
+                hit = db.execute(f"SELECT rowid FROM {table} WHERE {cols[col]} = ? ORDER BY rowid LIMIT 1",
+                                 (values[col - 1],)).fetchone()
+                if hit is not None and (best is None or (hit[0], order) < best[:2]):
+                    best = (hit[0], order, col)
+            if best is not None:
+                return None, best[2]
+            no = db.execute(f"SELECT COALESCE(MAX(rowid), 0) + 1 FROM {table}").fetchone()[0]
+            row = [str(no)] + list(values)
+            db.execute(_insert_sql(table, header), row)
+        return ACCOUNT_RECORDS[role].from_row(row), None
+
+    def account_rows(self, role):
+        return self._records(ACCOUNT_RECORDS[role],
+                             self.db().execute(f"SELECT * FROM {TABLES[role][0]} ORDER BY rowid"))
+
+    # ---- products ----
+    def product(self, pid):
+        rows = self._records(Product, self.db().execute("SELECT * FROM products WHERE product_id = ?", (pid,)))
+        return rows[0] if rows else None
+
+    def products(self):
+        return self._records(Product, self.db().execute("SELECT * FROM products ORDER BY product_id"))
+
+    def seller_products(self, seller_id):
+        return self._records(Product, self.db().execute(
+            "SELECT * FROM products WHERE seller_id = ? ORDER BY product_id", (seller_id,)))
+
+    def search(self, q):
+        words = q.lower().split()
+        where = []
+        args = []
+        if self.fts:
+            long_words = [w for w in words if len(w) >= 3]
+            words = [w for w in words if len(w) < 3]
+            if long_words:
+                where.append("product_id IN (SELECT rowid FROM product_fts WHERE product_fts MATCH ?)")
+                args.append(" AND ".join('"' + w.replace('"', '""') + '"' for w in long_words))
+        for w in words:
+            where.append(f"instr({HAYSTACK}, ?) > 0")
+            args.append(w)
+        sql = "SELECT * FROM products"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        return self._records(Product, self.db().execute(sql + " ORDER BY product_id", args))
+
+    def add_product(self, values):
+        with self.tx() as db:
+            return self._insert_product(db, values)
+
+    def add_products(self, rows):
+        # one transaction for the whole batch
+        with self.tx() as db:
+            return [self._insert_product(db, values) for values in rows]
+
+    def _insert_product(self, db, values):
+        cols = _cols(PRODUCT_HEADER)[1:]
+        cur = db.execute(f"INSERT INTO products ({','.join(cols)}) VALUES ({','.join('?' * len(cols))})",
+                         list(values))
+        pid = cur.lastrowid
+        if self.fts:
+            db.execute("INSERT INTO product_fts (rowid, product_name, description, category, brand) "
+                       "VALUES (?, ?, ?, ?, ?)", (pid, values[2], values[3], values[4], values[5]))
+        return pid
+
+    # ---- orders ----
+    def checkout(self, cust, cart):
+        # several lines of one product draw on the same stock
+        need = {}
+        for it in cart:
+            need[it.product_id] = need.get(it.product_id, 0) + it.quantity
+        with self.tx() as db:
+            # validate stock
+            for pid, q in need.items():
+                hit = db.execute("SELECT stock, product_name FROM products WHERE product_id = ?", (pid,)).fetchone()
+                if hit is None:
+                    raise ValueError(f"Product {pid} not found.")
+                if int(hit[0]) < q:
+                    raise ValueError(f"Not enough stock for {hit[1]}.")
+
+            # next order_id
+            order_id = db.execute("SELECT COALESCE(MAX(order_id), 0) + 1 FROM orders").fetchone()[0]
+
+            for pid, q in need.items():
+                cur = db.execute("UPDATE products SET stock = stock - ? WHERE product_id = ? AND stock >= ?",
+                                 (q, pid, q))
+                if cur.rowcount != 1:  # rolls the whole order back
+                    raise ValueError(f"Not enough stock for product {pid}.")
+            sellers = set()
+            for line in order_rows(order_id, now_str(), cust, cart):
+                c = line.rstrip("\n").split(",")
+                rowid = db.execute(_insert_sql("orders", ECON_HEADER), c).lastrowid
+                self._add_revenue(db, c, rowid)
+                self._add_rollup(db, c, rowid, not sellers, (c[4], c[5]) not in sellers)
+                sellers.add((c[4], c[5]))
+        return order_id
+
+    def customer_orders(self, customer_id):
+        return self._rows(self.db().execute(
+            "SELECT * FROM orders WHERE customer_id = ? ORDER BY rowid", (customer_id,)))
+
+    def order_lines(self, order_id):
+        return self._rows(self.db().execute(
+            "SELECT * FROM orders WHERE order_id = ? ORDER BY rowid", (order_id,)))
+
+    def seller_orders(self, seller_id):
+        return self._rows(self.db().execute(
+            "SELECT * FROM orders WHERE seller_id = ? ORDER BY rowid", (seller_id,)))
+
+    def _add_revenue(self, db, c, rowid):
+        total = float(c[10]) if c[10] else 0.0
+        db.execute("INSERT INTO seller_revenue VALUES (?, ?, ?, ?) ON CONFLICT (seller_id, seller_name) "
+                   "DO UPDATE SET revenue = revenue + excluded.revenue", (c[4], c[5], total, rowid))
+        db.execute("INSERT INTO product_revenue VALUES (?, ?, ?, ?, ?) "
+                   "ON CONFLICT (product_id, product_name, seller_id) "
+                   "DO UPDATE SET revenue = revenue + excluded.revenue", (c[6], c[7], c[4], total, rowid))
+
+    def _add_rollup(self, db, c, rowid, new_order, new_seller_order):
+        total = float(c[10]) if c[10] else 0.0
+        units = int(c[9]) if c[9] else 0
+        for g in GRAINS:
+            bucket = c[1][:KEY_LEN[g]]
+            db.execute("INSERT INTO rollup_all VALUES (?, ?, ?, ?, ?) ON CONFLICT (grain, bucket) DO UPDATE SET "
+                       "revenue = revenue + excluded.revenue, units = units + excluded.units, "
+                       "orders = orders + excluded.orders", (g, bucket, total, units, int(new_order)))
+            db.execute("INSERT INTO seller_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                       "ON CONFLICT (grain, bucket, seller_id, seller_name) DO UPDATE SET "
+                       "revenue = revenue + excluded.revenue, units = units + excluded.units, "
+                       "orders = orders + excluded.orders",
+                       (g, bucket, c[4], c[5], total, units, int(new_seller_order), rowid))
+            db.execute("INSERT INTO product_rollup VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                       "ON CONFLICT (grain, bucket, seller_id, product_id, product_name) DO UPDATE SET "
+                       "revenue = revenue + excluded.revenue, units = units + excluded.units, "
+                       "orders = orders + excluded.orders",
+                       (g, bucket, c[4], c[6], c[7], total, units, 1, rowid))
+
+    # ---- analytics ----
+    def admin_revenue(self):
+        db = self.db()
+        seller_rev = {f"{s} | {n}": v for s, n, v in db.execute(
+            "SELECT seller_id, seller_name, revenue FROM seller_revenue ORDER BY first_row")}
+        product_rev = {f"{p} | {n} | seller {s}": v for p, n, s, v in db.execute(
+            "SELECT product_id, product_name, seller_id, revenue FROM product_revenue ORDER BY first_row")}
+        return seller_rev, product_rev
+
+    def seller_revenue(self, seller_id):
+        db = self.db()
+        total = db.execute("SELECT COALESCE(SUM(revenue), 0.0) FROM seller_revenue WHERE seller_id = ?",
+                           (seller_id,)).fetchone()[0]
+        prod_rev = {}
+        for p, n, v in db.execute("SELECT product_id, product_name, revenue FROM product_revenue "
+                                  "WHERE seller_id = ? ORDER BY first_row", (seller_id,)):
+            key = f"{p} | {n}"
+            prod_rev[key] = prod_rev.get(key, 0.0) + v
+        return float(total), prod_rev
+
+    def _rebuild_rollups(self, db):
+        for table in ("rollup_all", "seller_rollup", "product_rollup"):
+            db.execute(f"DELETE FROM {table}")
+        for g in GRAINS:
+            bucket = f"substr(date_time, 1, {KEY_LEN[g]})"
+            db.execute(f"INSERT INTO rollup_all SELECT '{g}', {bucket}, SUM({TOTAL}), SUM(quantity), "
+                       f"COUNT(DISTINCT order_id) FROM orders GROUP BY 2")
+            db.execute(f"INSERT INTO seller_rollup SELECT '{g}', {bucket}, seller_id, seller_name, "
+                       f"SUM({TOTAL}), SUM(quantity), COUNT(DISTINCT order_id), MIN(rowid) "
+                       f"FROM orders GROUP BY 2, 3, 4")
+            db.execute(f"INSERT INTO product_rollup SELECT '{g}', {bucket}, seller_id, product_id, "
+                       f"product_name, SUM({TOTAL}), SUM(quantity), COUNT(*), MIN(rowid) "
+                       f"FROM orders GROUP BY 2, 3, 4, 5")
+
+    def rollup(self, start, stop, seller_id=None):
+        db = self.db()
+        if start is None or stop is None:
+            first, last = self.rollup_span()
+            if first is None:  # no orders yet
+                return [0.0, 0, 0], {}, {}
+            start = start or first
+            stop = stop or last
+
+        picked = {g: [] for g in GRAINS}
+        for g, key in cover(start, stop):
+            picked[g].append(key)
+        where = " OR ".join(f"(grain = '{g}' AND bucket IN ({','.join('?' * len(keys))}))"
+                            for g, keys in picked.items() if keys) or "0"
+        args = [k for keys in picked.values() for k in keys]
+        by_seller = ""
+        if seller_id is not None:
+            by_seller = " AND seller_id = ?"
+            args.append(seller_id)
+
+        sellers = {f"{sid} | {name}": [rev, units, orders] for sid, name, rev, units, orders in db.execute(
+            f"SELECT seller_id, seller_name, SUM(revenue), SUM(units), SUM(orders) FROM seller_rollup "
+            f"WHERE ({where}){by_seller} GROUP BY seller_id, seller_name ORDER BY MIN(first_row)", args)}
+        products = {}
+        for sid, pid, name, rev, units, orders in db.execute(
+                f"SELECT seller_id, product_id, product_name, SUM(revenue), SUM(units), SUM(orders) "
+                f"FROM product_rollup WHERE ({where}){by_seller} "
+                f"GROUP BY seller_id, product_id, product_name ORDER BY MIN(first_row)", args):
+            products.setdefault(sid, {})[f"{pid} | {name}"] = [rev, units, orders]
+
+        if seller_id is not None:
+            overall = [sum(v[i] for v in sellers.values()) for i in range(3)] if sellers else [0.0, 0, 0]
+            return overall, sellers, products.get(seller_id, {})
+        row = db.execute(f"SELECT SUM(revenue), SUM(units), SUM(orders) FROM rollup_all WHERE {where}",
+                         args).fetchone()
+        overall = [row[0] or 0.0, row[1] or 0, row[2] or 0]
+        return overall, sellers, products
+
+    def rollup_span(self):
+        lo, hi = self.db().execute("SELECT MIN(bucket), MAX(bucket) FROM rollup_all WHERE grain = 'month'").fetchone()
+        try:
+            return datetime.strptime(lo, "%Y-%m"), next_month(datetime.strptime(hi, "%Y-%m"))
+        except (TypeError, ValueError):  # no orders yet
+            return None, None
+
+    # ---- import / export ----
+    def import_text(self, data_dir="."):
+        # replace the database contents with the .txt files in data_dir
+        counts = {}
+        with self.tx() as db:
+            for kind, (table, name, header) in TABLES.items():
+                db.execute(f"DELETE FROM {table}")
+                n = len(_cols(header))
+                verb = "INSERT OR REPLACE" if kind == "product" else "INSERT"  # duplicate ids: last wins
+                path = os.path.join(data_dir, name)
+                if not os.path.exists(path):
+                    counts[kind] = 0
+                    continue
+                with open(path, "r", encoding="utf-8") as f:
+                    f.readline()
+                    rows = (_fit(line.strip().split(","), n) for line in f if line.strip())
+                    before = db.total_changes
+                    db.executemany(_insert_sql(table, header, verb), rows)
+                    counts[kind] = db.total_changes - before
+
+            db.execute("DELETE FROM seller_revenue")
+            db.execute("DELETE FROM product_revenue")
+            db.execute(f"INSERT INTO seller_revenue SELECT seller_id, seller_name, SUM({TOTAL}), MIN(rowid) "
+                       f"FROM orders GROUP BY seller_id, seller_name")
+            db.execute(f"INSERT INTO product_revenue SELECT product_id, product_name, seller_id, SUM({TOTAL}), "
+                       f"MIN(rowid) FROM orders GROUP BY product_id, product_name, seller_id")
+            self._rebuild_rollups(db)
+            if self.fts:
+                db.execute("DELETE FROM product_fts")
+                db.execute("INSERT INTO product_fts (rowid, product_name, description, category, brand) "
+                           "SELECT product_id, product_name, description, category, brand FROM products")
+            if db.execute("SELECT 1 FROM admins LIMIT 1").fetchone() is None:
+                db.execute("INSERT INTO admins VALUES ('1', 'admin', 'admin123')")
+        return counts
+
+    def export_text(self, data_dir="."):
+        # write every table back as its .txt file (header + rows, original column order)
+        counts = {}
+        db = self.db()
+        for kind, (table, name, header) in TABLES.items():
+            order = "product_id" if kind == "product" else "rowid"
+            tmp = os.path.join(data_dir, name + ".tmp")
+            n = 0
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(header)
+                cur = db.execute(f"SELECT * FROM {table} ORDER BY {order}")
+                while True:
+                    batch = cur.fetchmany(10000)
+                    if not batch:
+                        break
+                    f.write("".join(",".join("" if v is None else str(v) for v in row) + "\n" for row in batch))
+                    n += len(batch)
+            os.replace(tmp, os.path.join(data_dir, name))
+            counts[kind] = n
+        return counts
+
+
+def _fit(c, n):
+    # pad short rows / drop extra columns so every row has the table's width
+    return (c + [""] * n)[:n]
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.db.execute("COMMIT")
+        else:
+            self.db.execute("ROLLBACK")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Move marketplace data between the .txt files and SQLite.")
+    ap.add_argument("action", choices=("import", "export"))
+    ap.add_argument("--data-dir", default=".")
+    ap.add_argument("--db", default=None, help=f"database file (default: <data-dir>/{DB_FILE})")
+    args = ap.parse_args()
+
+    store = SqliteStorage(args.db or os.path.join(args.data_dir, DB_FILE))
+    if args.action == "import":
+        counts = store.import_text(args.data_dir)
+    else:
+        counts = store.export_text(args.data_dir)
+    print(", ".join(f"{k}: {v}" for k, v in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import os
+
+from filecache import file_signature
+from locks import replace_file
+
+# =========================
+# Stock delta journal (stock_journal.txt)
+# =========================
+# In "journal" stock mode checkout does not rewrite product.txt. It appends one
+# "product_id,delta" line per cart item here; the catalog applies the deltas on
+# top of product.txt when loading and periodically compacts them back into it.
+# Emptying the journal swaps in a new file, so a process that still holds deltas
+# from the old one notices (read_new() returns None) and reloads product.txt.
+# A missing journal is created with link(), which fails if another process got
+# there first, so starting up never replaces a journal others are appending to.
+
+JOURNAL_HEADER = "product_id,delta\n"
+
+
+class StockJournal:
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0  # bytes already applied
+        self.count = 0   # entries in the file
+        self._sig = None
+        self._ino = None  # inode of the file the offset belongs to
+        if not os.path.exists(path):
+            self.create()
+
+    def changed(self):
+        return file_signature(self.path) != self._sig
+
+    def rewind(self):
+        self.offset = 0
+        self.count = 0
+        self._ino = None
+
+    def read_new(self):
+        # (product_id, delta) entries appended since the last call, or None when
+        # another process has emptied the journal since (compacted into product.txt)
+        sig = file_signature(self.path)
+        try:
+            with open(self.path, "rb") as f:
+                ino = os.fstat(f.fileno()).st_ino
+                if self._ino is not None and ino != self._ino:
+                    return None
+                self._ino = ino
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return []
+        end = data.rfind(b"\n") + 1
+        lines = data[:end].decode("utf-8").splitlines()
+        if self.offset == 0:
+            lines = lines[1:]
+        self.offset += end
+        self._sig = sig
+
+        out = []
+        for line in lines:
+            if not line.strip():
+                continue
+            c = line.strip().split(",")
+            try:
+                out.append((c[0], int(c[1])))
+            except:
+                pass
+        self.count += len(out)
+        return out
+
+    def append(self, deltas):
+        # one O_APPEND write, so lines from concurrent processes never interleave
+        data = "".join(f"{pid},{d}\n" for pid, d in deltas).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+
+    def create(self):
+        # the header and the file appear together, and only if there is no journal yet
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(JOURNAL_HEADER)
+        try:
+            os.link(tmp, self.path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+
+    def reset(self):
+        replace_file(self.path, JOURNAL_HEADER)
+        self.rewind()
+        self._sig = None
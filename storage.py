@@ -0,0 +1,427 @@
+import io
+import os
+from datetime import datetime
+
+from accounts import AccountStore
+from analytics import LedgerAggregates, rank, write_admin_report
+from catalog import CatalogStore
+from ledger import LedgerWriter
+from records import Admin, Customer, Product, Seller
+from rollups import LedgerRollups, write_range_report
+from seller_index import SellerLedgerIndex
+from sequences import SequenceStore, max_id_in
+from stock_journal import StockJournal
+
+# =========================
+# Files
+# =========================
+SELLER_FILE = "seller.txt"
+CUSTOMER_FILE = "customer.txt"
+ADMIN_FILE = "admin.txt"
+PRODUCT_FILE = "product.txt"
+ECON_FILE = "economics.txt"
+ECON_BIN_FILE = "economics.bin"  # + economics.strings, see binledger.py
+ECON_PARTITION_DIR = "economics"  # economics/YYYY-MM.txt + manifest.json, see partitions.py
+SEQ_FILE = "sequences.txt"
+STOCK_JOURNAL_FILE = "stock_journal.txt"
+DB_FILE = "marketplace.db"
+
+# "text" (the .txt files above) or "sqlite" (DB_FILE, see sqlite_storage.py)
+STORAGE = os.environ.get("ECOM_STORAGE", "text")
+# "incremental" (checkpointed sums), "columnar" (full typed-column scan) or
+# "streaming" (one bounded-memory pass with top-K heaps and sketches, see streaming.py)
+ANALYTICS_ENGINE = os.environ.get("ECOM_ANALYTICS", "incremental")
+# "text" (economics.txt), "binary" (ECON_BIN_FILE) or "partitioned" (ECON_PARTITION_DIR);
+# the binary and partitioned ledgers are created from economics.txt on first use
+LEDGER_FORMAT = os.environ.get("ECOM_LEDGER_FORMAT", "text")
+# ledger durability: fsync every order, and/or batch concurrent orders into one write+fsync
+LEDGER_FSYNC = os.environ.get("ECOM_LEDGER_FSYNC", "0") == "1"
+LEDGER_GROUP_COMMIT = os.environ.get("ECOM_GROUP_COMMIT", "0") == "1"
+# "rewrite": checkout rewrites product.txt; "journal": checkout appends stock deltas
+# to stock_journal.txt, compacted back into product.txt every STOCK_COMPACT_EVERY entries
+STOCK_MODE = os.environ.get("ECOM_STOCK_MODE", "rewrite")
+STOCK_COMPACT_EVERY = int(os.environ.get("ECOM_STOCK_COMPACT_EVERY", "5000"))
+
+# =========================
+# Headers (manual, no helper funcs)
+# =========================
+SELLER_HEADER = "no,name,password,id,email,address,phone,cnic\n"
+CUSTOMER_HEADER = "no,name,password,id,email,address,phone\n"
+ADMIN_HEADER = "no,username,password\n"
+
+PRODUCT_HEADER = "product_id,seller_id,seller_name,product_name,description,category,brand,price,stock,status,rating,created_at\n"
+ECON_HEADER = "order_id,date_time,customer_id,customer_name,seller_id,seller_name,product_id,product_name,unit_price,quantity,total_price\n"
+
+# unique columns checked at signup, in the order their messages take priority
+UNIQUE_COLS = {"admin": (), "seller": (3, 4, 6, 7), "customer": (3, 4, 6)}  # id, email, phone(, cnic)
+
+
+def now_str():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def text_fields(values, what):
+    # stripped values for one row of a .txt file, or ValueError: a comma or a
+    # line break would split the row
+    values = [str(v).strip() for v in values]
+    if any("," in v or "\n" in v or "\r" in v for v in values):
+        raise ValueError(f"{what} fields cannot contain commas or line breaks.")
+    return values
+
+
+def order_rows(order_id, dt, cust, cart):
+    # economics.txt lines for one order (cart: CartItems)
+    return [it.order_line(order_id, dt, cust).to_line() for it in cart]
+
+
+# =========================
+# Storage interface
+# =========================
+# Accounts and products come out as records (records.py: Admin / Seller /
+# Customer, Product) and go in as lists of strings in the column order of the
+# .txt headers above; carts are lists of CartItems. Ledger rows stay lists of
+# strings (economics.txt columns): the aggregators read the few columns they
+# need straight from the split line. Roles are "admin", "seller" and "customer".
+
+ACCOUNT_RECORDS = {"admin": Admin, "seller": Seller, "customer": Customer}
+
+
+class Storage:
+    def login(self, role, name, password):
+        # account row or None
+        raise NotImplementedError
+
+    def add_account(self, role, values):
+        # append [name, password, id, ...] unless a unique column clashes;
+        # returns (row, None) or (None, clashing column index)
+        raise NotImplementedError
+
+    def account_rows(self, role):
+        raise NotImplementedError
+
+    def product(self, pid):
+        raise NotImplementedError
+
+    def products(self):
+        raise NotImplementedError
+
+    def search(self, q):
+        # products matching every word of q (substring of name/description/category/brand)
+        raise NotImplementedError
+
+    def seller_products(self, seller_id):
+        return [p for p in self.products() if p.seller_id == seller_id]
+
+    def add_product(self, values):
+        # values: product row without product_id; returns the new product_id
+        raise NotImplementedError
+
+    def add_products(self, rows):
+        # many add_product() rows at once; returns the new product_ids in order
+        return [self.add_product(values) for values in rows]
+
+    def checkout(self, cust, cart):
+        # validate stock, take it and record the order atomically; returns order_id.
+        # Raises ValueError with a user-facing message.
+        raise NotImplementedError
+
+    def customer_orders(self, customer_id):
+        # economics.txt rows of one customer, oldest first
+        raise NotImplementedError
+
+    def order_lines(self, order_id):
+        # economics.txt rows of one order
+        raise NotImplementedError
+
+    def seller_orders(self, seller_id):
+        # economics.txt rows of one seller, oldest first
+        raise NotImplementedError
+
+    def admin_revenue(self):
+        # ({"seller_id | seller_name": revenue}, {"product_id | product_name | seller seller_id": revenue}),
+        # keys in order of first sale
+        raise NotImplementedError
+
+    def seller_revenue(self, seller_id):
+        # (total revenue, {"product_id | product_name": revenue})
+        raise NotImplementedError
+
+    def rollup(self, start, stop, seller_id=None):
+        # revenue/units/orders over [start, stop) from the time-bucketed rollups,
+        # see Rollups.select() in rollups.py
+        raise NotImplementedError
+
+    def rollup_span(self):
+        # (first month start, end of last month) holding any orders, or (None, None)
+        raise NotImplementedError
+
+    def admin_analytics_text(self):
+        out = io.StringIO()
+        self.write_admin_analytics(out)
+        return out.getvalue()
+
+    def write_admin_analytics(self, out):
+        # the admin report written line by line to a text stream (e.g. a file)
+        seller_rev, product_rev = self.admin_revenue()
+        write_admin_report(out, rank(seller_rev), rank(product_rev))
+
+    def seller_analytics(self, seller_id):
+        total_rev, prod_rev = self.seller_revenue(seller_id)
+        return (total_rev,) + best_and_lowest(prod_rev)
+
+    def admin_range_text(self, start, stop):
+        out = io.StringIO()
+        self.write_admin_range(out, start, stop)
+        return out.getvalue()
+
+    def write_admin_range(self, out, start, stop):
+        write_range_report(out, start, stop, *self.rollup(start, stop))
+
+    def seller_range(self, seller_id, start, stop):
+        # ([revenue, units, orders], best, lowest) for one seller over [start, stop)
+        overall, _, products = self.rollup(start, stop, seller_id)
+        return (overall,) + best_and_lowest({k: v[0] for k, v in products.items()})
+
+
+def best_and_lowest(prod_rev):
+    if prod_rev:
+        items = sorted(prod_rev.items(), key=lambda x: x[1])
+        lowest = items[0]
+        best = items[-1]
+    else:
+        best = ("N/A", 0.0)
+        lowest = ("N/A", 0.0)
+    return best, lowest
+
+
+# =========================
+# Text files (the original CSV .txt layout)
+# =========================
+class TextStorage(Storage):
+    def __init__(self, data_dir=".", analytics_engine=None, stock_mode=None,
+                 ledger_fsync=None, group_commit=None, ledger_format=None):
+        self.data_dir = data_dir
+        self.analytics_engine = analytics_engine or ANALYTICS_ENGINE
+        self.ledger_format = ledger_format or LEDGER_FORMAT
+        ledger_fsync = LEDGER_FSYNC if ledger_fsync is None else ledger_fsync
+        stock_mode = stock_mode or STOCK_MODE
+        self.ensure_files()
+
+        # account rows with hash indexes for login / signup checks
+        self.accounts = {
+            "admin": AccountStore(self.path(ADMIN_FILE), ADMIN_HEADER, Admin),
+            "seller": AccountStore(self.path(SELLER_FILE), SELLER_HEADER, Seller, unique=UNIQUE_COLS["seller"]),
+            "customer": AccountStore(self.path(CUSTOMER_FILE), CUSTOMER_HEADER, Customer,
+                                     unique=UNIQUE_COLS["customer"]),
+        }
+
+        # parsed product.txt shared by the shop and the seller dashboard
+        journal = StockJournal(self.path(STOCK_JOURNAL_FILE)) if stock_mode == "journal" else None
+        self.catalog = CatalogStore(self.path(PRODUCT_FILE), PRODUCT_HEADER,
+                                    journal=journal, compact_every=STOCK_COMPACT_EVERY)
+        self.econ_file = self.path(ECON_FILE)
+        if self.ledger_format == "text":
+            # revenue sums and rollups over economics.txt, checkpointed next to it
+            self.ledger_stats = LedgerAggregates(self.econ_file)
+            self.rollups = LedgerRollups(self.econ_file)
+            self.seller_index = SellerLedgerIndex(self.econ_file)
+            self.ledger = LedgerWriter(self.econ_file, fsync=ledger_fsync,
+                                       group_commit=LEDGER_GROUP_COMMIT if group_commit is None else group_commit)
+            max_order_id = lambda: max_id_in(self.econ_file)
+        else:
+            # the ledger object answers the revenue / history queries itself;
+            # economics.txt is no longer written
+            self.ledger = self.open_ledger(ledger_fsync)
+            max_order_id = self.ledger.max_order_id
+        # last used order_id / product_id; seeded from the data files when missing
+        self.ids = SequenceStore(self.path(SEQ_FILE), {
+            "order_id": max_order_id,
+            "product_id": lambda: self.catalog.fresh().max_id,
+        })
+
+    def path(self, name):
+        return os.path.join(self.data_dir, name)
+
+    def open_ledger(self, fsync):
+        # the other formats (and numpy, for binary) are imported only when used
+        if self.ledger_format == "binary":
+            from binledger import BinaryLedger, csv_to_binary
+            path = self.path(ECON_BIN_FILE)
+            if not os.path.exists(path):
+                csv_to_binary(self.econ_file, path)
+            return BinaryLedger(path, fsync=fsync)
+        if self.ledger_format == "partitioned":
+            from partitions import PartitionedLedger, split_ledger
+            root = self.path(ECON_PARTITION_DIR)
+            if not os.path.isdir(root):
+                split_ledger(self.econ_file, root, ECON_HEADER)
+            return PartitionedLedger(root, ECON_HEADER, fsync=fsync)
+        raise ValueError(f"Unknown ledger format: {self.ledger_format}")
+
+    def ensure_files(self):
+        for name, header in ((SELLER_FILE, SELLER_HEADER), (CUSTOMER_FILE, CUSTOMER_HEADER),
+                             (PRODUCT_FILE, PRODUCT_HEADER), (ECON_FILE, ECON_HEADER),
+                             (ADMIN_FILE, ADMIN_HEADER)):
+            if not os.path.exists(self.path(name)):
+                with open(self.path(name), "w", encoding="utf-8") as f:
+                    f.write(header)
+
+        # Ensure at least 1 admin
+        with open(self.path(ADMIN_FILE), "r", encoding="utf-8") as f:
+            admin_lines = f.readlines()
+        if len(admin_lines) <= 1:
+            with open(self.path(ADMIN_FILE), "a", encoding="utf-8") as f:
+                f.write("1,admin,admin123\n")
+
+    # ---- accounts ----
+    def login(self, role, name, password):
+        return self.accounts[role].login(name, password)
+
+    def add_account(self, role, values):
+        store = self.accounts[role]
+        with store.mutex:  # check + append as one step
+            row = store.record.from_row([str(store.next_no())] + list(values))
+            clash = store.conflict(row)
+            if clash is not None:
+                return None, clash
+            store.append(row)
+        return row, None
+
+    def account_rows(self, role):
+        return self.accounts[role].fresh().rows
+
+    # ---- products ----
+    def product(self, pid):
+        return self.catalog.get(pid)
+
+    def products(self):
+        return self.catalog.products()
+
+    def search(self, q):
+        return self.catalog.search(q)
+
+    def seller_products(self, seller_id):
+        return self.catalog.seller_products(seller_id)
+
+    def add_product(self, values):
+        catalog = self.catalog
+        with catalog.mutex:
+            # next product_id
+            pid = self.ids.next("product_id", floor=catalog.fresh().max_id)
+            catalog.append(Product.from_row([str(pid)] + list(values)))
+        return pid
+
+    def add_products(self, rows):
+        # one block of ids from sequences.txt and one write to product.txt
+        if not rows:
+            return []
+        catalog = self.catalog
+        with catalog.mutex:
+            ids = self.ids.reserve("product_id", len(rows), floor=catalog.fresh().max_id)
+            catalog.extend([Product.from_row([str(pid)] + list(values)) for pid, values in zip(ids, rows)])
+        return list(ids)
+
+    # ---- orders ----
+    def checkout(self, cust, cart):
+        catalog = self.catalog
+        # check and take the stock (rewrite or journal, see STOCK_MODE); other
+        # processes only make this wait or retry when they sell the same products
+        deltas = catalog.take_stock([(it.product_id, it.quantity) for it in cart])
+
+        # the order_id (sequences.txt) and one ledger write for the whole order,
+        # outside the stock lock so concurrent orders can share a group commit
+        try:
+            order_id = self.ids.next("order_id")
+            self.ledger.append(order_rows(order_id, now_str(), cust, cart))
+        except:
+            catalog.adjust_stock([(pid, -d) for pid, d in deltas])  # give the stock back
+            raise
+        return order_id
+
+    def customer_orders(self, customer_id):
+        if self.ledger_format != "text":
+            return self.ledger.customer_orders(customer_id)
+        with open(self.econ_file, "r", encoding="utf-8") as f:
+            f.readline()
+            return [c for c in (line.strip().split(",") for line in f) if len(c) > 2 and c[2] == customer_id]
+
+    def order_lines(self, order_id):
+        if self.ledger_format != "text":
+            return self.ledger.order_lines(order_id)
+        with open(self.econ_file, "r", encoding="utf-8") as f:
+            f.readline()
+            return [c for c in (line.strip().split(",") for line in f) if c[0] == str(order_id)]
+
+    def seller_orders(self, seller_id):
+        if self.ledger_format != "text":
+            return self.ledger.seller_orders(seller_id)
+        return self.seller_index.rows(seller_id)
+
+    # ---- analytics ----
+    def ledger_rows(self):
+        # every order row, oldest first, as a generator
+        if self.ledger_format != "text":
+            return self.ledger.iter_rows()
+        import streaming
+        return streaming.iter_rows(self.econ_file)
+
+    def admin_revenue(self):
+        if self.ledger_format != "text":
+            return self.ledger.revenue()
+        if self.analytics_engine == "columnar":
+            import columnar
+            cols = columnar.load(self.econ_file)
+            return cols.revenue("seller"), cols.revenue("product")
+        with self.ledger_stats.lock:
+            agg = self.ledger_stats.refresh()
+            return dict(agg.seller_rev), dict(agg.product_rev)
+
+    def seller_revenue(self, seller_id):
+        if self.analytics_engine == "streaming":
+            import streaming
+            return streaming.seller_revenue(self.seller_orders(seller_id), seller_id)
+        if self.ledger_format != "text":
+            return self.ledger.seller_revenue(seller_id)
+        with self.ledger_stats.lock:
+            agg = self.ledger_stats.refresh()
+            return agg.seller_total.get(seller_id, 0.0), dict(agg.seller_products.get(seller_id, {}))
+
+    def rollup(self, start, stop, seller_id=None):
+        if self.ledger_format != "text":
+            return self.ledger.rollup(start, stop, seller_id)
+        with self.rollups.lock:
+            return self.rollups.refresh().select(start, stop, seller_id)
+
+    def rollup_span(self):
+        if self.ledger_format != "text":
+            return self.ledger.rollup_span()
+        with self.rollups.lock:
+            return self.rollups.refresh().span()
+
+    def write_admin_analytics(self, out):
+        if self.analytics_engine == "streaming":
+            import streaming
+            streaming.write_report(out, streaming.StreamStats().consume(self.ledger_rows()))
+            return
+        if self.ledger_format != "text":
+            return super().write_admin_analytics(out)
+        if self.analytics_engine == "columnar":
+            import columnar
+            return columnar.write_admin_analytics(out, self.econ_file)
+        with self.ledger_stats.lock:
+            agg = self.ledger_stats.refresh()
+            write_admin_report(out, rank(agg.seller_rev), rank(agg.product_rev))
+
+    def seller_analytics(self, seller_id):
+        if self.analytics_engine == "columnar" and self.ledger_format == "text":
+            import columnar
+            return columnar.compute_seller_analytics(self.econ_file, seller_id)
+        return super().seller_analytics(seller_id)
+
+
+def open_storage(data_dir=".", kind=None, **options):
+    kind = kind or STORAGE
+    if kind == "sqlite":
+        from sqlite_storage import SqliteStorage
+        return SqliteStorage(os.path.join(data_dir, DB_FILE))
+    return TextStorage(data_dir, **options)
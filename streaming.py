@@ -0,0 +1,191 @@
+import argparse
+import hashlib
+import heapq
+import math
+import sys
+from array import array
+
+# =========================
+# Streaming ledger analytics (bounded memory)
+# =========================
+# One pass over the ledger rows (a generator, nothing is kept per row) into
+# fixed-size summaries:
+#   - exact totals: rows, orders, units, revenue
+#   - exact revenue per seller, ranked with heaps (best / lowest K)
+#   - product revenue in a Count-Min sketch, with at most 2*K candidate keys
+#     kept for the heavy hitters (top K products, estimated)
+#   - distinct customers and products with HyperLogLog
+# Memory does not grow with the number of products or customers. A sketch can
+# only tell which keys are large, so there is no "lowest product" here.
+#
+# python streaming.py [economics.txt] [--k 10]   writes the report to stdout
+
+
+def iter_rows(path):
+    # economics.txt rows as lists, read line by line
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            line = line.strip()
+            if line:
+                yield line.split(",")
+
+
+def _hash(key):
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+class CountMinSketch:
+    # estimates never undercount; overcount <= total * e / width with
+    # probability 1 - exp(-depth) (for non-negative amounts)
+    def __init__(self, width=2048, depth=4):
+        self.width = width
+        self.depth = depth
+        self.total = 0.0
+        self.rows = [array("d", bytes(8 * width)) for _ in range(depth)]
+
+    def _cells(self, key):
+        h = _hash(key)
+        h1, h2 = h & 0xFFFFFFFF, h >> 32
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, amount=1.0):
+        # adds amount to key and returns its new estimate
+        self.total += amount
+        est = None
+        for row, j in zip(self.rows, self._cells(key)):
+            row[j] += amount
+            est = row[j] if est is None else min(est, row[j])
+        return est
+
+    def estimate(self, key):
+        return min(row[j] for row, j in zip(self.rows, self._cells(key)))
+
+    def error(self):
+        # the additive error bound for one estimate
+        return self.total * math.e / self.width
+
+
+class HyperLogLog:
+    # distinct count with ~1.04 / sqrt(2**p) relative error (1.6% at p=12)
+    def __init__(self, p=12):
+        self.p = p
+        self.m = 1 << p
+        self.registers = bytearray(self.m)
+
+    def add(self, key):
+        h = _hash(key)
+        i = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[i]:
+            self.registers[i] = rank
+
+    def count(self):
+        m = self.m
+        est = (0.7213 / (1 + 1.079 / m)) * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if est <= 2.5 * m and zeros:
+            est = m * math.log(m / zeros)  # small-range correction
+        return int(round(est))
+
+
+class StreamStats:
+    def __init__(self, k=10):
+        self.k = k
+        self.rows = 0
+        self.orders = 0
+        self.units = 0
+        self.revenue = 0.0
+        self.seller_rev = {}  # "seller_id | seller_name" -> revenue (sellers are few)
+        self.products = CountMinSketch()
+        self.candidates = {}  # product key -> estimate, pruned to the top k
+        self.customers = HyperLogLog()
+        self.product_ids = HyperLogLog()
+        self._order = None
+
+    def add(self, c):
+        total = float(c[10]) if c[10] else 0.0
+        self.rows += 1
+        if c[0] != self._order:  # the rows of one order are written together
+            self._order = c[0]
+            self.orders += 1
+        self.units += int(c[9]) if c[9] else 0
+        self.revenue += total
+
+        seller_key = f"{c[4]} | {c[5]}"
+        self.seller_rev[seller_key] = self.seller_rev.get(seller_key, 0.0) + total
+
+        prod_key = f"{c[6]} | {c[7]} | seller {c[4]}"
+        self.candidates[prod_key] = self.products.add(prod_key, total)
+        if len(self.candidates) > 2 * self.k:
+            self.candidates = dict(heapq.nlargest(self.k, self.candidates.items(), key=lambda kv: kv[1]))
+
+        self.customers.add(c[2])
+        self.product_ids.add(f"{c[6]} | {c[4]}")
+
+    def consume(self, rows):
+        for c in rows:
+            self.add(c)
+        return self
+
+    def best_sellers(self):
+        return heapq.nlargest(self.k, self.seller_rev.items(), key=lambda kv: kv[1])
+
+    def lowest_sellers(self):
+        return heapq.nsmallest(self.k, self.seller_rev.items(), key=lambda kv: kv[1])
+
+    def top_products(self):
+        # (key, estimated revenue), best first; estimates re-read from the sketch
+        est = ((key, self.products.estimate(key)) for key in self.candidates)
+        return heapq.nlargest(self.k, est, key=lambda kv: kv[1])
+
+
+def write_report(out, stats):
+    # the streaming admin report, written line by line to a text stream
+    k = stats.k
+    out.write(f"Rows: {stats.rows}   Orders: {stats.orders}   Units: {stats.units}   Revenue: {stats.revenue:.2f}\n")
+    out.write(f"Customers (approx.): {stats.customers.count()}   Products (approx.): {stats.product_ids.count()}\n\n")
+
+    best, lowest = stats.best_sellers(), stats.lowest_sellers()
+    top = stats.top_products()
+    if best:
+        out.write(f"Best Seller (Revenue): {best[0][0]} -> {best[0][1]:.2f}\n")
+        out.write(f"Lowest Seller (Revenue): {lowest[0][0]} -> {lowest[0][1]:.2f}\n")
+        out.write(f"Best Product (Revenue, approx.): {top[0][0]} -> {top[0][1]:.2f}\n")
+    else:
+        out.write("No orders yet.\n")
+
+    out.write(f"\nTop {k} Sellers:\n")
+    for key, v in best:
+        out.write(f"  {key} -> {v:.2f}\n")
+    out.write(f"\nLowest {k} Sellers:\n")
+    for key, v in lowest:
+        out.write(f"  {key} -> {v:.2f}\n")
+    out.write(f"\nTop {k} Products (approx., within +{stats.products.error():.2f}):\n")
+    for key, v in top:
+        out.write(f"  {key} -> {v:.2f}\n")
+
+
+def seller_revenue(rows, seller_id):
+    # (total, {"product_id | product_name": revenue}) of one seller, in one pass
+    total, prods = 0.0, {}
+    for c in rows:
+        if c[4] == seller_id:
+            v = float(c[10]) if c[10] else 0.0
+            total += v
+            key = f"{c[6]} | {c[7]}"
+            prods[key] = prods.get(key, 0.0) + v
+    return total, prods
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Admin report from one bounded-memory pass over the ledger.")
+    ap.add_argument("path", nargs="?", default="economics.txt")
+    ap.add_argument("--k", type=int, default=10)
+    args = ap.parse_args()
+    write_report(sys.stdout, StreamStats(args.k).consume(iter_rows(args.path)))
+
+
+if __name__ == "__main__":
+    main()
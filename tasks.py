@@ -0,0 +1,106 @@
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+# =========================
+# Background tasks for the Tk app
+# =========================
+# Work runs on a small thread pool; results come back through a queue that the
+# Tk thread drains with poll() (App calls it from an after() loop), so widget
+# callbacks always run on the UI thread.
+#
+# Tasks are keyed ("admin_analytics", "shop_products", ...). Submitting a key
+# again supersedes the previous task: it is cancelled if it has not started
+# and its result is dropped if it has. forget() does the same for every task
+# except those submitted with keep=True (bootstrap, checkout), whose outcome
+# matters whichever screen is up when they finish.
+#
+# A task whose result holds something to clean up (e.g. a temp file) passes
+# on_drop: it gets the result instead when the result is dropped, on the Tk
+# thread, or on the worker thread once the runner is shut down.
+
+
+class TaskRunner:
+    def __init__(self, workers=2):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="app-task")
+        self.results = queue.Queue()
+        self.latest = {}  # key -> (token, future, keep)
+        self.lock = threading.RLock()  # cancel() runs done callbacks (_finished) right away
+        self.closed = False
+
+    def submit(self, key, fn, *args, on_done=None, on_error=None, on_drop=None, keep=False):
+        token = object()
+        with self.lock:
+            old = self.latest.get(key)
+            if old is not None:
+                old[1].cancel()
+            fut = self.pool.submit(metrics.timed(f"task.{key}")(fn), *args)
+            self.latest[key] = (token, fut, keep)
+        fut.add_done_callback(lambda f: self._finished((key, token, f, on_done, on_error, on_drop)))
+        return fut
+
+    def _finished(self, item):
+        with self.lock:
+            if not self.closed:
+                self.results.put(item)
+                return
+        self._drop(item[2], item[5])
+
+    def _drop(self, fut, on_drop):
+        if on_drop is not None and not fut.cancelled() and fut.exception() is None:
+            on_drop(fut.result())
+
+    def busy(self, key):
+        with self.lock:
+            cur = self.latest.get(key)
+        return cur is not None and not cur[1].done()
+
+    def forget(self):
+        # drop the callbacks of everything in flight (e.g. the screen they update
+        # is gone), except the keep=True tasks
+        with self.lock:
+            for token, fut, keep in self.latest.values():
+                if not keep:
+                    fut.cancel()
+            self.latest = {k: v for k, v in self.latest.items() if v[2]}
+
+    def poll(self):
+        # run finished callbacks; call from the Tk thread only
+        while True:
+            try:
+                key, token, fut, on_done, on_error, on_drop = self.results.get_nowait()
+            except queue.Empty:
+                return
+            with self.lock:
+                cur = self.latest.get(key)
+                dropped = cur is None or cur[0] is not token  # superseded or forgotten
+                if not dropped:
+                    del self.latest[key]
+            if dropped:
+                self._drop(fut, on_drop)
+                continue
+            if fut.cancelled():
+                continue
+            err = fut.exception()
+            with metrics.span(f"ui.{key}"):  # the widget update
+                if err is not None:
+                    if on_error is not None:
+                        on_error(err)
+                    continue
+                if on_done is not None:
+                    on_done(fut.result())
+
+    def shutdown(self):
+        with self.lock:
+            self.closed = True
+            for token, fut, keep in self.latest.values():
+                fut.cancel()
+            self.latest = {}
+            pending = []
+            while not self.results.empty():
+                pending.append(self.results.get_nowait())
+        for item in pending:
+            self._drop(item[2], item[5])
+        self.pool.shutdown(wait=False, cancel_futures=True)
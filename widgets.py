@@ -0,0 +1,259 @@
+import os
+import tkinter as tk
+from array import array
+from tkinter import font as tkfont
+from tkinter import ttk
+
+import metrics
+from reports import read_lines
+
+# =========================
+# Virtualized Treeview
+# =========================
+# Holds any number of rows but only keeps one Treeview item per visible line.
+# Scrolling (scrollbar, mouse wheel, arrow/page keys) just re-fills those items,
+# and set_rows() only touches items whose values actually changed.
+
+
+class VirtualTree:
+    def __init__(self, parent, columns, height=10, width=140):
+        self.frame = tk.Frame(parent, bg=parent["bg"])
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=height, selectmode="browse")
+        for c in columns:
+            self.tree.heading(c, text=c)
+            self.tree.column(c, width=width, anchor="w")
+        self.bar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_bar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.bar.pack(side="right", fill="y")
+
+        self.rows = []
+        self.top = 0
+        self.visible = height
+        self.slots = []        # item ids, one per visible line
+        self.slot_values = []  # values currently shown in each slot
+        self.selected = None   # absolute index of the selected row
+        self._syncing = False
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1, "units"))
+        self.tree.bind("<Up>", lambda e: self._step(-1))
+        self.tree.bind("<Down>", lambda e: self._step(1))
+        self.tree.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.tree.bind("<Next>", lambda e: self.scroll(1, "pages"))
+
+    def pack(self, **kw):
+        self.frame.pack(**kw)
+
+    def set_rows(self, rows):
+        # rows: list of value tuples; the selection follows its row when it survives
+        sel = self.selected_values()
+        self.rows = rows
+        self.selected = None
+        if sel is not None:
+            lo, hi = self.top, min(len(rows), self.top + self.visible)
+            for i in range(lo, hi):
+                if tuple(rows[i]) == sel:
+                    self.selected = i
+                    break
+        self.top = max(0, min(self.top, len(rows) - self.visible))
+        self.render()
+
+    def selected_values(self):
+        if self.selected is None or self.selected >= len(self.rows):
+            return None
+        return tuple(self.rows[self.selected])
+
+    def scroll(self, n, what="units"):
+        step = self.visible if what == "pages" else 1
+        self.goto(self.top + n * step)
+        return "break"
+
+    def goto(self, top):
+        top = max(0, min(int(top), len(self.rows) - self.visible))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    @metrics.timed("ui.tree_render")
+    def render(self):
+        want = self.rows[self.top:self.top + self.visible]
+        for i, values in enumerate(want):
+            values = tuple(values)
+            if i < len(self.slots):
+                if self.slot_values[i] != values:
+                    self.tree.item(self.slots[i], values=values)
+                    self.slot_values[i] = values
+            else:
+                self.slots.append(self.tree.insert("", "end", values=values))
+                self.slot_values.append(values)
+        while len(self.slots) > len(want):
+            self.tree.delete(self.slots.pop())
+            self.slot_values.pop()
+
+        self._syncing = True
+        try:
+            if self.selected is not None and self.top <= self.selected < self.top + len(want):
+                self.tree.selection_set(self.slots[self.selected - self.top])
+            else:
+                self.tree.selection_set(())
+        finally:
+            self.tree.after_idle(self._done_syncing)
+
+        n = len(self.rows)
+        if n <= self.visible:
+            self.bar.set(0.0, 1.0)
+        else:
+            self.bar.set(self.top / n, (self.top + self.visible) / n)
+
+    def _done_syncing(self):
+        self._syncing = False
+
+    def _on_select(self, _):
+        if self._syncing:
+            return
+        sel = self.tree.selection()
+        if sel and sel[0] in self.slots:
+            self.selected = self.top + self.slots.index(sel[0])
+        else:
+            self.selected = None
+
+    def _on_bar(self, *args):
+        if args[0] == "moveto":
+            self.goto(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+    def _step(self, n):
+        # arrow keys: move the selection, scrolling when it leaves the window
+        if not self.rows:
+            return "break"
+        i = self.top if self.selected is None else max(0, min(len(self.rows) - 1, self.selected + n))
+        self.selected = i
+        if i < self.top:
+            self.top = i
+        elif i >= self.top + self.visible:
+            self.top = i - self.visible + 1
+        self.render()
+        return "break"
+
+    def _on_resize(self, e):
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible = max(1, e.height // rowheight - 1)  # minus the heading line
+        if visible != self.visible:
+            self.visible = visible
+            self.top = max(0, min(self.top, len(self.rows) - self.visible))
+            self.render()
+
+
+# =========================
+# Paged text viewer
+# =========================
+# Shows a text file of any size (a report from reports.py) through a Text
+# widget that only holds the lines on screen: the file is indexed once
+# (reports.index_lines) and scrolling reads back just the visible lines. A
+# temporary file handed to set_file() is deleted when it is replaced or the
+# viewer goes away.
+
+
+class PagedText:
+    def __init__(self, parent, height=10, **text_options):
+        self.frame = tk.Frame(parent, bg=parent["bg"])
+        self.text = tk.Text(self.frame, height=height, wrap="none", **text_options)
+        self.bar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_bar)
+        self.text.pack(side="left", fill="both", expand=True)
+        self.bar.pack(side="right", fill="y")
+
+        self.path = None
+        self.offsets = array("q", [0])
+        self.temporary = False
+        self.top = 0
+        self.visible = height
+
+        self.text.bind("<Configure>", self._on_resize)
+        self.text.bind("<Destroy>", lambda e: self._drop_file())
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+        self.text.bind("<Up>", lambda e: self.scroll(-1))
+        self.text.bind("<Down>", lambda e: self.scroll(1))
+        self.text.bind("<Prior>", lambda e: self.scroll(-1, "pages"))
+        self.text.bind("<Next>", lambda e: self.scroll(1, "pages"))
+        self.text.bind("<Home>", lambda e: self.goto(0) or "break")
+        self.text.bind("<End>", lambda e: self.goto(self.line_count()) or "break")
+        self.text.config(state="disabled")
+
+    def pack(self, **kw):
+        self.frame.pack(**kw)
+
+    def line_count(self):
+        return len(self.offsets) - 1
+
+    def set_message(self, message):
+        self._drop_file()
+        self._fill(message)
+        self.bar.set(0.0, 1.0)
+
+    def set_file(self, path, offsets, temporary=False):
+        # offsets from reports.index_lines(path)
+        self._drop_file()
+        self.path, self.offsets, self.temporary = path, offsets, temporary
+        self.top = 0
+        self.render()
+
+    def scroll(self, n, what="units"):
+        step = self.visible if what == "pages" else 1
+        self.goto(self.top + n * step)
+        return "break"
+
+    def goto(self, top):
+        top = max(0, min(int(top), self.line_count() - self.visible))
+        if top != self.top:
+            self.top = top
+            self.render()
+
+    @metrics.timed("ui.page_render")
+    def render(self):
+        if self.path is None:
+            return
+        try:
+            lines = read_lines(self.path, self.offsets, self.top, self.visible)
+        except OSError as e:
+            lines = [f"Cannot read {self.path}: {e}"]
+        self._fill("\n".join(lines))
+        n = self.line_count()
+        if n <= self.visible:
+            self.bar.set(0.0, 1.0)
+        else:
+            self.bar.set(self.top / n, (self.top + self.visible) / n)
+
+    def _fill(self, text):
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", text)
+        self.text.config(state="disabled")
+
+    def _drop_file(self):
+        if self.temporary and self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+        self.path, self.offsets, self.temporary = None, array("q", [0]), False
+        self.top = 0
+
+    def _on_bar(self, *args):
+        if args[0] == "moveto":
+            self.goto(float(args[1]) * self.line_count())
+        elif args[0] == "scroll":
+            self.scroll(int(args[1]), args[2])
+
+    def _on_resize(self, e):
+        linespace = tkfont.Font(font=self.text["font"]).metrics("linespace") or 16
+        visible = max(1, e.height // linespace)
+        if visible != self.visible:
+            self.visible = visible
+            self.top = max(0, min(self.top, self.line_count() - self.visible))
+            self.render()